@@ -0,0 +1,141 @@
+from typing import Iterable, List, Set
+from ahuora_compounds.PropertyPackage import PropertyPackage
+
+
+class CompatibilityMatrix:
+    """
+    Dense compound x package support matrix, built once when the registry is loaded.
+
+    Each compound row is stored as an int bitset over packages, and each package
+    column as an int bitset over compounds, so support queries reduce to bitwise
+    AND/OR over a few integers.
+    """
+
+    def __init__(self, compounds: List[str], packages: List[PropertyPackage]):
+        """
+        Args:
+            compounds (List[str]): Compound names, in registration order.
+            packages (List[PropertyPackage]): Registered property packages.
+        """
+        self.__compounds = list(compounds)
+        self.__packages = [package.name for package in packages]
+        self.__compound_ids = {name: i for i, name in enumerate(self.__compounds)}
+        self.__package_ids = {name: j for j, name in enumerate(self.__packages)}
+
+        # rows[i]: packages supporting compound i, columns[j]: compounds supported by package j
+        self.__rows = [0] * len(self.__compounds)
+        self.__columns = [0] * len(self.__packages)
+        for j, package in enumerate(packages):
+            column = 0
+            for i, compound in enumerate(self.__compounds):
+                if package.check_supported_compound(compound):
+                    self.__rows[i] |= 1 << j
+                    column |= 1 << i
+            self.__columns[j] = column
+
+    @property
+    def compounds(self) -> List[str]:
+        return self.__compounds
+
+    @property
+    def packages(self) -> List[str]:
+        return self.__packages
+
+    def package_mask(self, compounds: Iterable[str], strict: bool = True) -> int | None:
+        """
+        Bitset of packages supporting the given compounds.
+
+        Args:
+            compounds (Iterable[str]): Compound names.
+            strict (bool): If True, packages must support every compound.
+                           If False, packages must support at least one compound.
+
+        Returns:
+            int | None: Bitset over packages, or None if a compound is not in the matrix.
+        """
+        mask = (1 << len(self.__packages)) - 1 if strict else 0
+        for compound in compounds:
+            i = self.__compound_ids.get(compound, None)
+            if i is None:
+                return None
+            if strict:
+                mask &= self.__rows[i]
+            else:
+                mask |= self.__rows[i]
+        return mask
+
+    def compound_mask(self, packages: Iterable[str], strict: bool = True) -> int:
+        """
+        Bitset of compounds supported by the given packages.
+
+        Args:
+            packages (Iterable[str]): Package names.
+            strict (bool): If True, compounds must be supported by every package.
+                           If False, compounds must be supported by at least one package.
+
+        Raises:
+            ValueError: If a package is not registered.
+        """
+        mask = None
+        for package in packages:
+            j = self.__package_ids.get(package, None)
+            if j is None:
+                raise ValueError(f"Package {package} is not registered.")
+            if mask is None:
+                mask = self.__columns[j]
+            elif strict:
+                mask &= self.__columns[j]
+            else:
+                mask |= self.__columns[j]
+        return mask or 0
+
+    def supported_packages(self, compounds: Iterable[str], strict: bool = True) -> Set[str] | None:
+        """
+        Set of package names supporting the given compounds, or None if a compound is not in the matrix.
+        """
+        mask = self.package_mask(compounds, strict)
+        if mask is None:
+            return None
+        return {self.__packages[j] for j in bits(mask)}
+
+    def supported_packages_batch(self, compound_lists: Iterable[Iterable[str]], strict: bool = True) -> List[Set[str] | None]:
+        """
+        supported_packages of each compound list, in one pass over the lists.
+
+        Each list is reduced to a package bitset, and each distinct bitset is only
+        converted to package names once, as picker lists often share their support.
+        """
+        rows, compound_ids, packages = self.__rows, self.__compound_ids, self.__packages
+        start = (1 << len(packages)) - 1 if strict else 0
+        names = {}
+        results = []
+        for compounds in compound_lists:
+            mask = start
+            for compound in compounds:
+                i = compound_ids.get(compound, None)
+                if i is None:
+                    mask = None
+                    break
+                mask = mask & rows[i] if strict else mask | rows[i]
+            if mask is None:
+                results.append(None)
+                continue
+            if mask not in names:
+                names[mask] = frozenset(packages[j] for j in bits(mask))
+            # A new set for each list, so that callers can change them
+            results.append(set(names[mask]))
+        return results
+
+    def supported_compounds(self, packages: Iterable[str], strict: bool = True) -> Set[str]:
+        """
+        Set of compound names supported by the given packages.
+        """
+        return {self.__compounds[i] for i in bits(self.compound_mask(packages, strict))}
+
+
+def bits(mask: int):
+    # Yields the index of each set bit, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
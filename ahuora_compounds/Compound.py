@@ -1,10 +1,13 @@
-from typing import Dict, Set
+import threading
+from typing import Callable, Dict, Set
 
 class Compound:
     def __init__(self, name: str):
         self.__name = name
         self.__sources: Dict[str, dict] = {}
+        self.__lazy_sources: Dict[str, Callable[[], dict]] = {}  # sources loaded on first access
         self.__packages: Set[str] = set()  # supported packages
+        self.__lock = threading.Lock()
 
     # Read only properties
     @property
@@ -13,6 +16,9 @@ class Compound:
 
     @property
     def sources(self):
+        # Make sure every source is available before exposing them all
+        for source_name in list(self.__lazy_sources):
+            self.__load_source(source_name)
         return self.__sources
 
     @property
@@ -22,19 +28,42 @@ class Compound:
     def get_source(self, source_name: str) -> dict:
         """
         Get the data from a specific source.
-        
+        Lazy sources are loaded the first time they are requested.
+
         Args:
             source_name (str): Name of the source to retrieve data from.
-        
+
         Returns:
             dict: Data associated with the source if it exists, otherwise None.
         """
-        return self.sources.get(source_name, None)
+        if source_name in self.__lazy_sources:
+            self.__load_source(source_name)
+        return self.__sources.get(source_name, None)
 
     def add_source(self, source_name: str, data: dict):
-        if source_name in self.sources:
+        if source_name in self.__sources or source_name in self.__lazy_sources:
             raise ValueError(f"Source {source_name} already exists for compound {self.name}.")
-        self.sources[source_name] = data
+        self.__sources[source_name] = data
+
+    def add_lazy_source(self, source_name: str, load: Callable[[], dict]):
+        """
+        Add a source whose data is only loaded when it is first requested.
+
+        Args:
+            source_name (str): Name of the source.
+            load (Callable[[], dict]): Returns the source data, called at most once.
+        """
+        if source_name in self.__sources or source_name in self.__lazy_sources:
+            raise ValueError(f"Source {source_name} already exists for compound {self.name}.")
+        self.__lazy_sources[source_name] = load
+
+    def __load_source(self, source_name: str):
+        with self.__lock:
+            # Another thread may have loaded the source while we were waiting
+            load = self.__lazy_sources.get(source_name, None)
+            if load is not None:
+                self.__sources[source_name] = load()
+                del self.__lazy_sources[source_name]
 
     def add_package(self, package_name: str):
         self.packages.add(package_name)
@@ -1,3 +1,4 @@
+import os
 from ahuora_compounds import deprecated
 from ahuora_compounds.CompoundRegistry import CompoundRegistry
 from ahuora_compounds.Compound import Compound
@@ -6,7 +7,8 @@ from ahuora_compounds.RegistrySearch import RegistrySearch
 __author__ = "Mahaki Leach"
 
 # Main registry instance
-_registry = CompoundRegistry()
+# Set AHUORA_COMPOUNDS_LAZY=1 to only load compound data when it is first accessed
+_registry = CompoundRegistry(lazy=os.environ.get("AHUORA_COMPOUNDS_LAZY", "0") == "1")
 
 # Frontend registry view
 db = RegistrySearch(_registry)
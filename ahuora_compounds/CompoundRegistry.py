@@ -1,63 +1,140 @@
-from typing import Dict, Set
+from functools import wraps
+from typing import Callable, Dict, List, Set
 import ahuora_compounds.loaders as loaders
 import pkgutil
 import importlib
+import threading
 from ahuora_compounds.Compound import Compound
 from ahuora_compounds.PropertyPackage import PropertyPackage
 from ahuora_compounds.RegistryLoader import RegistryLoader
+from ahuora_compounds.SearchIndex import SearchIndex, compound_synonyms
+from ahuora_compounds.CompatibilityMatrix import CompatibilityMatrix
+
+
+def built(method):
+    """
+    Makes sure the registry has been built before a public accessor runs, see
+    RegistrySearch.built.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._built:
+            self._build()
+        return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class CompoundRegistry:
 
-    def __init__(self):
+    def __init__(self, lazy: bool = False, loaders: List[Callable] = None):
+        """
+        Args:
+            lazy (bool): If True, loaders only register compound names and bindings,
+                         and defer loading source data until it is first accessed.
+            loaders (List[Callable], optional): Loaders from other packages, run after the
+                         loaders in ahuora_compounds.loaders, e.g. the Helmholtz bindings
+                         of ahuora_property_packages.helmholtz.parameters.load_compounds.
+        """
         self.__compounds: Dict[str, Compound] = {}
         self.__packages: Dict[str, PropertyPackage] = {}
-        self.__queue: Dict[str, list] = {"compounds": [], "packages": [], "bindings": [], "dynamic_bindings": []}
+        self.__queue: Dict[str, list] = {"compounds": [], "lazy_compounds": [], "packages": [], "bindings": [], "dynamic_bindings": []}
         self._built: bool = False
+        self._build_lock = threading.Lock()
+        self.__search_index: SearchIndex | None = None
+        # Synonyms given with lazy compounds, searchable without loading them
+        self.__lazy_synonyms: Dict[str, List[str]] = {}
+        self.__matrix: CompatibilityMatrix | None = None
+        self.lazy: bool = lazy
+        self._extra_loaders: List[Callable] = list(loaders or [])
 
     @property
+    @built
     def compounds(self):
         return self.__compounds
 
     @property
+    @built
     def packages(self):
         return self.__packages
 
     def _build(self):
-        if not self._built:
-            from ahuora_compounds.loaders import loaders_list
+        """
+        Runs all loaders and builds the registry. Only the first call does any work,
+        and concurrent callers wait until the build has finished.
+        """
+        if self._built:
+            return
+
+        with self._build_lock:
+            if self._built:
+                # Built by another thread while we were waiting
+                return
+
+            # Items queued before the build, rather than by the loaders during it
+            queued = {name: list(queue) for name, queue in self.__queue.items()}
+            try:
+                self._run_loaders()
+            except Exception:
+                # Start the next build from scratch, so that it raises the same
+                # error rather than one about packages registered by this build
+                self._reset(queued)
+                raise
 
             self._built = True
-
-            # Import all loaders
-            for loader in loaders_list:
-                loader(RegistryLoader(self))
-
-            # Building packages
-            for package in self.__queue["packages"]:
-                if isinstance(package, PropertyPackage):
-                    self._register_package(package)
-                else:
-                    raise TypeError(f"Expected PropertyPackage, got {type(package)}")
-
-            # Building compounds    
-            for compound_name, sources, data in self.__queue["compounds"]:
-                self._register_compound(compound_name, sources, data)
-
-            # Building bindings
-            for compound_name, package_name in self.__queue["bindings"]:
-                if compound_name in self.compounds and package_name in self.packages:
-                    self._bind(compound_name, package_name)
-                else:
-                    raise ValueError(f"Compound {compound_name} or Package {package_name} is not registered.")
-
-            # Building dynamic bindings
-            for package_name in self.__queue["dynamic_bindings"]:
-                if package_name in self.packages:
-                    self._dynamic_bind(package_name)
-                else:
-                    raise ValueError(f"Package {package_name} is not registered.")
     
+    def _run_loaders(self):
+        """Runs all loaders and registers what they queued."""
+        from ahuora_compounds.loaders import loaders_list
+
+        # Import all loaders
+        for loader in [*loaders_list, *self._extra_loaders]:
+            loader(RegistryLoader(self))
+
+        # Building packages
+        for package in self.__queue["packages"]:
+            if isinstance(package, PropertyPackage):
+                self._register_package(package)
+            else:
+                raise TypeError(f"Expected PropertyPackage, got {type(package)}")
+
+        # Building compounds    
+        for compound_name, sources, data in self.__queue["compounds"]:
+            self._register_compound(compound_name, sources, data)
+
+        for compound_name, source, load, synonyms in self.__queue["lazy_compounds"]:
+            self._register_lazy_compound(compound_name, source, load, synonyms)
+
+        # Building bindings
+        for compound_name, package_name in self.__queue["bindings"]:
+            if compound_name in self.__compounds and package_name in self.__packages:
+                self._bind(compound_name, package_name)
+            else:
+                raise ValueError(f"Compound {compound_name} or Package {package_name} is not registered.")
+
+        # Building dynamic bindings
+        for package_name in self.__queue["dynamic_bindings"]:
+            if package_name in self.__packages:
+                self._dynamic_bind(package_name)
+            else:
+                raise ValueError(f"Package {package_name} is not registered.")
+
+        # Compound x package support, used for all support queries
+        self.__matrix = CompatibilityMatrix(list(self.__compounds.keys()), list(self.__packages.values()))
+
+    def _reset(self, queued: Dict[str, list]):
+        """
+        Clears everything registered by a failed build, and puts the queues back to
+        the items queued before it. The loaders queue their items again on the next build.
+        """
+        for name, queue in self.__queue.items():
+            queue[:] = queued[name]
+        self.__compounds.clear()
+        self.__lazy_synonyms.clear()
+        self.__packages.clear()
+        self.__search_index = None
+        self.__matrix = None
+
     def _discover_loaders(self):
         # Todo: THis is a very hacky way of dynamically loading all modules in the loaders package. 
         # Is dynamic loading even necessary? Can we just import all loaders in the __init__.py file of the loaders package?
@@ -77,6 +154,20 @@ class CompoundRegistry:
         """
         self.__queue["compounds"].append((compound_name, source, data))
 
+    def queue_lazy_compound(self, compound_name: str, source: str, load: Callable[[], dict],
+                            synonyms: List[str] = None):
+        """
+        Queue a compound whose source data is loaded on first access.
+        
+        Args:
+            compound_name (str): Name of the compound to queue.
+            source (str): Name of the source providing the compound data.
+            load (Callable[[], dict]): Returns the data associated with the compound from the source.
+            synonyms (List[str], optional): The compound's synonyms from the source, see
+                SearchIndex.SYNONYM_FIELDS, so that they can be searched before it is loaded.
+        """
+        self.__queue["lazy_compounds"].append((compound_name, source, load, list(synonyms or [])))
+
     def queue_package(self, package: PropertyPackage):
         """
         Queue a property package to be registered later.
@@ -112,7 +203,7 @@ class CompoundRegistry:
         Args:
             package (PropertyPackage): The property package to register.
         """
-        if package.name in self.packages:
+        if package.name in self.__packages:
             raise ValueError(f"Package {package.name} is already registered.")
         self.__packages[package.name] = package
 
@@ -138,7 +229,7 @@ class CompoundRegistry:
             data (dict): Data associated with the compound from the source.
         """
 
-        if compound not in self.compounds:
+        if compound not in self.__compounds:
 
             # Create a new compound if it doesn't exist
             self.__compounds[compound] = Compound(compound)
@@ -146,6 +237,24 @@ class CompoundRegistry:
         # Adding additional source to existing compound
         self.__compounds[compound].add_source(source, data)
 
+    def _register_lazy_compound(self, compound: str, source: str, load: Callable[[], dict],
+                                synonyms: List[str] = None):
+        """
+        Register a compound in the registry without loading its source data.
+        
+        Args:
+            compound (str): Name of the compound to register.
+            source (str): Name of the source providing the compound data.
+            load (Callable[[], dict]): Returns the data associated with the compound from the source.
+            synonyms (List[str], optional): The compound's synonyms from the source.
+        """
+
+        if compound not in self.__compounds:
+            self.__compounds[compound] = Compound(compound)
+
+        self.__compounds[compound].add_lazy_source(source, load)
+        self.__lazy_synonyms.setdefault(compound, []).extend(synonyms or [])
+
     def _get_compound(self, compound_name: str) -> Compound:
         """
         Get a compound by its name.
@@ -171,10 +280,10 @@ class CompoundRegistry:
         Raises:
             ValueError: If either the compound or package is not registered.
         """
-        if compound_name not in self.compounds:
+        if compound_name not in self.__compounds:
             raise ValueError(f"Compound {compound_name} is not registered.")
 
-        if package_name not in self.packages:
+        if package_name not in self.__packages:
             raise ValueError(f"Package {package_name} is not registered.")
 
         # Add the package to the compound's list of supported packages
@@ -187,11 +296,11 @@ class CompoundRegistry:
         """
         Binds all compounds to a package dynamically. (based on package check_supported_compounds implementation)
         """
-        if package_name not in self.packages:
+        if package_name not in self.__packages:
             raise ValueError(f"Package {package_name} is not registered.")
 
         # Loop through all compounds
-        for compound_name in self.compounds:
+        for compound_name in self.__compounds:
             # Check if compound is supported by package
             if self.__packages[package_name].check_supported_compound(compound_name):
                 # Bind compound to package
@@ -210,6 +319,11 @@ class CompoundRegistry:
             Set[str]: Set of package names that support the given compounds.
         """
 
+        supported_packages = self.__matrix.supported_packages(compounds, strict)
+        if supported_packages is not None:
+            return supported_packages
+
+        # Unregistered compounds are not in the matrix, so ask each package directly
         supported_packages = set()
 
         # Looping through all registered packages
@@ -221,6 +335,26 @@ class CompoundRegistry:
 
         return supported_packages
 
+    def _get_supported_packages_batch(self, compound_lists: List[Set[str]], strict=True) -> List[Set[str]]:
+        """
+        Get the supported property packages for many sets of compounds at once.
+        
+        Args:
+            compound_lists (List[Set[str]]): Sets of compound names to check.
+            strict (bool): If True, all compounds in a set must be supported by a package.
+                           If False, at least one compound must be supported.
+        
+        Returns:
+            List[Set[str]]: Supported package names for each set of compounds, in the same order.
+        """
+        compound_lists = list(compound_lists)
+        results = self.__matrix.supported_packages_batch(compound_lists, strict)
+        # Lists with unregistered compounds are answered by each package directly
+        return [
+            self._get_supported_packages(compounds, strict) if supported is None else supported
+            for compounds, supported in zip(compound_lists, results)
+        ]
+
     def _get_supported_compounds(self, packages: Set[str], strict=True) -> Set[str]:
         """
         Get a set of compounds that are supported by the given property packages.
@@ -233,55 +367,50 @@ class CompoundRegistry:
         Returns:
             Set[str]: Set of compound names that are supported by the given packages.
         """
+        return self.__matrix.supported_compounds(packages, strict)
 
-        supported_compounds = set()
-
-        # Looping through all registered compounds
-        for package in packages:
-            p = self._get_package(package)
-            if p is None:
-                raise ValueError(f"Package {package} is not registered.")
-            else:
-                if strict:
-                    if len(supported_compounds) == 0:
-                        supported_compounds = p.compounds
+    def _get_search_index(self) -> SearchIndex:
+        """
+        Returns the search index, building it on first use.
+        In lazy mode the synonyms given by the loaders are indexed, as reading them
+        from the compounds would load every compound.
+        """
+        if self.__search_index is None:
+            with self._build_lock:
+                if self.__search_index is None:
+                    if self.lazy:
+                        synonyms = self.__lazy_synonyms
                     else:
-                        supported_compounds = supported_compounds.intersection(p.compounds)     
-                else:
-                    supported_compounds = supported_compounds.union(p.compounds)
-        
-        return supported_compounds
+                        synonyms = {
+                            compound.name: compound_synonyms(compound) for compound in self.__compounds.values()
+                        }
+                    self.__search_index = SearchIndex(self.__matrix, synonyms)
+        return self.__search_index
 
     def _search_compounds(self,
                           query: str,
                           package_filters: Set[str] = None,
-                          filter_strict: bool = False
-                          ) -> set:
+                          filter_strict: bool = False,
+                          limit: int = None
+                          ) -> List[str]:
 
         """
         Searches for compounds based on the query.
 
         Args:
-            query (str): The search query.
+            query (str): The search query. Matches compound names, CAS numbers and structure formulas.
             package_filters (Dict[str], optional): Filters to apply on the compounds.
                 If provided, only supported compounds from these packages will be considered.
             filter_strict (bool, optional): Only applies if package_filters is provided.
                                             If True, all packages must support all compounds.
                                             If False, at least one package must support each compound.
+            limit (int, optional): Maximum number of results to return.
         
         Returns:
-            list: List of compound names that match the query.
+            list: List of compound names that match the query, best matches first.
         
         """
-
-        # Retrieving compounds by name
-        filtered_compounds = [name for name in self.__compounds.keys() if query.lower() in name.lower()]
-
-        if package_filters is not None:
-            filtered_compounds = self._get_supported_compounds(package_filters, strict=filter_strict) \
-                .intersection(filtered_compounds)
-
-        return filtered_compounds
+        return self._get_search_index().search(query, package_filters, filter_strict, limit)
 
     def _get_compound_names(self) -> list:
         """
@@ -291,17 +420,3 @@ class CompoundRegistry:
             list: List of compound names.
         """
         return list(self.__compounds.keys())
-
-    # To force build module on import
-    # https://stackoverflow.com/questions/77186124/run-a-function-every-time-a-method-in-a-class-is-called
-    def __getattribute__(self, attr):
-        # Retrieve the attribute
-        attr = super().__getattribute__(attr)
-        # Check if attribute is a method
-        if callable(attr):
-            # Ensure build is after discovery
-            if not attr.__name__ == '_discover_loaders':
-                super().__getattribute__('_build')()
-        return attr
-
-        
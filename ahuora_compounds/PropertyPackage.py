@@ -53,14 +53,12 @@ class PropertyPackage(ABC):
             bool: True if the compounds are supported, False otherwise.
         """
 
-        num_supported = len([c for c in compounds if self.check_supported_compound(c)])
-
         if strict:
             # Checks all compounds are supported
-            return num_supported == len(compounds)
+            return all(self.check_supported_compound(c) for c in compounds)
         else:
             # Checks at least one is supported
-            return num_supported > 0
+            return any(self.check_supported_compound(c) for c in compounds)
 
     @abstractmethod
     def check_supported_compound(self, compound: str, strict: bool = True) -> bool:
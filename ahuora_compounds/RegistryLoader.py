@@ -3,12 +3,20 @@ class RegistryLoader:
     def __init__(self, compound_registry):
         self._registry = compound_registry
 
+    @property
+    def lazy(self):
+        # Loaders should use register_lazy_compound where possible when this is set
+        return self._registry.lazy
+
     def register_package(self, pkg):
         self._registry.queue_package(pkg)
 
     def register_compound(self, name, source, data):
         self._registry.queue_compound(name, source, data)
 
+    def register_lazy_compound(self, name, source, load, synonyms=None):
+        self._registry.queue_lazy_compound(name, source, load, synonyms)
+
     def bind(self, compound_name, package_name):
         self._registry.queue_binding(compound_name, package_name)
     
@@ -1,22 +1,48 @@
+from functools import wraps
 from ahuora_compounds.CompoundRegistry import CompoundRegistry
 # Simplified wrapper for front-end integration
 
+
+def built(method):
+    """
+    Makes sure the registry has been built before a front-end query runs.
+    After the first build this is a single flag check, so the registry's own
+    query methods can stay plain dictionary operations.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._registry._built:
+            self._registry._build()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class RegistrySearch:
 
     def __init__(self, compound_registry: CompoundRegistry):
         self._registry = compound_registry
 
-    def search_compounds(self, query, package_filters=None, filter_strict=False):
-        return self._registry._search_compounds(query, package_filters, filter_strict)
+    @built
+    def search_compounds(self, query, package_filters=None, filter_strict=False, limit=None):
+        return self._registry._search_compounds(query, package_filters, filter_strict, limit)
 
+    @built
     def get_compound_names(self):
         return self._registry._get_compound_names()
 
+    @built
     def get_compound(self, name):
         return self._registry._get_compound(name)
 
+    @built
     def get_supported_packages(self, compounds, strict=True):
         return self._registry._get_supported_packages(compounds, strict)
 
+    @built
+    def get_supported_packages_batch(self, compound_lists, strict=True):
+        return self._registry._get_supported_packages_batch(compound_lists, strict)
+
+    @built
     def get_supported_compounds(self, packages, strict=True):
-        return self._registry._get_supported_compounds(packages, strict)
\ No newline at end of file
+        return self._registry._get_supported_compounds(packages, strict)
@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, List, Set
+from ahuora_compounds.CompatibilityMatrix import CompatibilityMatrix, bits
+from ahuora_compounds.Compound import Compound
+
+# Fields of each source that are searchable as synonyms of the compound name.
+# Loaders of lazy compounds pass these to register_lazy_compound, e.g. the chemsep
+# loader reads them from its compiled index, or they cannot be searched in lazy mode.
+SYNONYM_FIELDS = {
+    "chemsep": ["CAS", "StructureFormula"],
+}
+
+# Longest n-gram stored in the index, longer queries are split into n-grams of this length
+MAX_NGRAM = 3
+
+# Ranks, lower is better
+EXACT_NAME, NAME_PREFIX, WORD_PREFIX, NAME_SUBSTRING, EXACT_SYNONYM, SYNONYM_SUBSTRING = range(6)
+
+
+class SearchIndex:
+    """
+    Prebuilt n-gram index over compound names and their synonyms.
+
+    Compounds are numbered as in the registry's CompatibilityMatrix, and n-gram
+    postings are stored as int bitsets over compounds, so that matching and
+    package filtering are a handful of bitwise operations regardless of the
+    number of compounds.
+    """
+
+    def __init__(self, matrix: CompatibilityMatrix, synonyms: Dict[str, List[str]]):
+        """
+        Args:
+            matrix (CompatibilityMatrix): Registry support matrix, which also fixes the compound numbering.
+            synonyms (Dict[str, List[str]]): Other searchable strings for each compound.
+        """
+        self.__matrix = matrix
+        self.__names = matrix.compounds
+        self.__keys: List[List[str]] = []  # lowercased name, then lowercased synonyms
+        self.__ngrams: Dict[str, int] = {}
+        self.__all = (1 << len(self.__names)) - 1
+
+        for i, name in enumerate(self.__names):
+            keys = [name.lower()] + [str(s).lower() for s in synonyms.get(name, []) if s]
+            self.__keys.append(keys)
+            bit = 1 << i
+            for gram in {gram for key in keys for gram in _ngrams(key)}:
+                self.__ngrams[gram] = self.__ngrams.get(gram, 0) | bit
+
+    def search(self,
+               query: str,
+               package_filters: Iterable[str] = None,
+               filter_strict: bool = False,
+               limit: int = None
+               ) -> List[str]:
+        """
+        Searches compound names and synonyms for a substring.
+
+        Args:
+            query (str): The search query, case insensitive.
+            package_filters (Iterable[str], optional): Only return compounds supported by these packages.
+            filter_strict (bool, optional): If True, all packages must support the compound,
+                                            otherwise at least one must.
+            limit (int, optional): Maximum number of results to return.
+
+        Returns:
+            List[str]: Matching compound names, best matches first. Exact and prefix
+                       name matches rank above substring matches, which rank above synonym matches.
+        """
+        query = query.lower()
+
+        mask = self.__all
+        for gram in _query_ngrams(query):
+            mask &= self.__ngrams.get(gram, 0)
+            if not mask:
+                return []
+
+        if package_filters is not None:
+            mask &= self.__matrix.compound_mask(package_filters, filter_strict)
+
+        # n-grams only narrow down candidates, check the full query against each
+        results = []
+        for i in bits(mask):
+            rank = _rank(self.__keys[i], query)
+            if rank is not None:
+                name = self.__names[i]
+                results.append((rank, len(name), name))
+        results.sort()
+
+        if limit is not None:
+            results = results[:limit]
+        return [name for _, _, name in results]
+
+
+def compound_synonyms(compound: Compound) -> List[str]:
+    """
+    Returns the synonyms of a compound listed in SYNONYM_FIELDS, e.g. its CAS number.
+    """
+    synonyms = []
+    for source, fields in SYNONYM_FIELDS.items():
+        data = compound.get_source(source)
+        if not data:
+            continue
+        for field in fields:
+            if data.get(field) is not None and data[field].value is not None:
+                synonyms.append(data[field].value)
+    return synonyms
+
+
+def _ngrams(key: str) -> Set[str]:
+    return {key[i:i + n] for n in range(1, MAX_NGRAM + 1) for i in range(len(key) - n + 1)}
+
+
+def _query_ngrams(query: str) -> List[str]:
+    if len(query) <= MAX_NGRAM:
+        return [query] if query else []
+    return [query[i:i + MAX_NGRAM] for i in range(len(query) - MAX_NGRAM + 1)]
+
+
+def _rank(keys: List[str], query: str) -> int | None:
+    name = keys[0]
+    position = name.find(query)
+    if position == 0:
+        return EXACT_NAME if name == query else NAME_PREFIX
+    if position > 0:
+        # Matches at the start of a word, e.g. "dioxide" in "carbon dioxide"
+        while position > 0:
+            if not name[position - 1].isalnum():
+                return WORD_PREFIX
+            position = name.find(query, position + 1)
+        return NAME_SUBSTRING
+    if query in keys[1:]:
+        return EXACT_SYNONYM
+    if any(query in synonym for synonym in keys[1:]):
+        return SYNONYM_SUBSTRING
+    return None
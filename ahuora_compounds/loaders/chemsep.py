@@ -1,21 +1,42 @@
 from ahuora_compounds.loaders import loader
 import xml.etree.ElementTree as ET
-from pydantic import BaseModel
-from typing import Dict
+from pydantic import BaseModel, TypeAdapter
+from typing import Dict, List
+from functools import partial
 from ahuora_compounds.PropertyPackage import DefaultPropertyPackage
+from ahuora_compounds.SearchIndex import SYNONYM_FIELDS
+import hashlib
+import json
 import os
+import pathlib
+import sqlite3
+
+CHEMSEP_DIR = os.path.join(os.path.dirname(__file__), "data", "chemsep")
+
+# Precompiled index of the ChemSep XML files, see compile_index()
+INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "chemsep.sqlite")
+
+# Bump whenever the index layout or compound_template changes.
+# Compounds are stored as JSON and validated when they are loaded.
+INDEX_VERSION = "5"
+
 
 @loader("chemsep")
 def load(registry):
     
     registry.register_package(DefaultPropertyPackage("peng-robinson"))
 
-    for file in os.listdir(os.path.dirname(__file__) + "/data/chemsep/"):
-        if file.endswith(".xml"):
-            compound_name = file[:-4]
-            compound = load_compound(compound_name)
-            registry.register_compound(compound_name, "chemsep", compound)
+    if registry.lazy:
+        # Only record names and synonyms, each compound is loaded the first time its data is requested
+        for compound_name, synonyms in load_synonyms().items():
+            registry.register_lazy_compound(compound_name, "chemsep", partial(load_indexed_compound, compound_name),
+                                            synonyms)
             registry.bind(compound_name, "peng-robinson")
+        return
+
+    for compound_name, compound in load_compounds().items():
+        registry.register_compound(compound_name, "chemsep", compound)
+        registry.bind(compound_name, "peng-robinson")
 
 
 def convert_string_to_float(string: str) -> float | str:
@@ -56,6 +77,7 @@ def parse_coeff(element: ET.Element) -> Coefficients:
 compound_template = {
     'LibraryIndex': parse_element,
     'CompoundID': parse_element,
+    'CAS': parse_element,
     'StructureFormula': parse_element,
     'Family': parse_element,
     'CriticalTemperature': parse_element,
@@ -101,6 +123,12 @@ compound_template = {
 
 Compound = Dict
 
+# Validate the JSON of each attribute of an indexed compound
+_adapters = {
+    parse_element: TypeAdapter(UnitValuePair | None),
+    parse_coeff: TypeAdapter(Coefficients | None),
+}
+
 
 def load_compound(name: str) -> Compound:
     """
@@ -110,16 +138,238 @@ def load_compound(name: str) -> Compound:
         name (str): The XML data as a string.
     """
     self = {}
-    with open(os.path.dirname(__file__) + "/data/chemsep/" + name.lower() + ".xml", 'r') as file:
-        file = ''.join(file.readlines())
-
-    root = ET.fromstring(file)
+    root = ET.parse(os.path.join(CHEMSEP_DIR, name.lower() + ".xml")).getroot()
 
     # Iterating over all attributes in the template
     # and parsing the corresponding XML elements
     for attr in compound_template:
-        if root.find(attr) is not None:
-            self[attr] = compound_template[attr](root.find(attr))
+        element = root.find(attr)
+        if element is not None:
+            self[attr] = compound_template[attr](element)
         else:
             self[attr] = None
     return self
+
+
+def _source_files() -> Dict[str, os.DirEntry]:
+    """
+    Returns the ChemSep XML files keyed by compound name.
+    """
+    return {
+        entry.name[:-4]: entry
+        for entry in os.scandir(CHEMSEP_DIR)
+        if entry.name.endswith(".xml")
+    }
+
+
+def _digest(compound_name: str) -> str:
+    """
+    Returns the hash of a compound's XML file, which its index entry is checked
+    against when the file's size or time has changed, e.g. after a git checkout.
+    """
+    with open(os.path.join(CHEMSEP_DIR, compound_name + ".xml"), "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _synonyms(compound: Compound) -> List[str]:
+    # Same as SearchIndex.compound_synonyms for the chemsep source
+    return [
+        compound[field].value
+        for field in SYNONYM_FIELDS["chemsep"]
+        if compound.get(field) is not None and compound[field].value is not None
+    ]
+
+
+def _encode(compound: Compound) -> str:
+    return json.dumps({
+        attr: value.model_dump() if isinstance(value, BaseModel) else value
+        for attr, value in compound.items()
+    })
+
+
+def _decode(data: str) -> Compound:
+    return {
+        attr: _adapters[compound_template[attr]].validate_python(value)
+        for attr, value in json.loads(data).items()
+    }
+
+
+def compile_index(path: str | None = None, trusted: bool = False) -> int:
+    """
+    Compiles every ChemSep XML file into a single sqlite index, so that
+    the loader does not need to parse the XML files on every import.
+
+    The wheel build runs this through the hatch build hook in hatch_build.py
+    and ships the index. Rebuild it after changing the XML files with
+    ``python -m ahuora_compounds.loaders.chemsep``.
+
+    Args:
+        path (str, optional): Where to write the index, defaults to INDEX_PATH.
+        trusted (bool): Load the index without checking it against the XML files,
+            for an index built into a wheel with them.
+
+    Returns:
+        int: Number of compounds written to the index.
+    """
+    path = path or INDEX_PATH
+    rows = []
+    for compound_name, entry in sorted(_source_files().items()):
+        stat = entry.stat()
+        compound = load_compound(compound_name)
+        rows.append((compound_name, stat.st_size, stat.st_mtime_ns, _digest(compound_name),
+                     json.dumps(_synonyms(compound)), _encode(compound)))
+
+    # Write to a temporary file first so readers never see a half written index
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        with connection:
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.execute(
+                "CREATE TABLE compounds "
+                "(name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT, synonyms TEXT, data TEXT)"
+            )
+            connection.executemany("INSERT INTO meta VALUES (?, ?)",
+                                   [("version", INDEX_VERSION), ("trusted", "1" if trusted else "0")])
+            connection.executemany("INSERT INTO compounds VALUES (?, ?, ?, ?, ?, ?)", rows)
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+    return len(rows)
+
+
+def _open_index(path: str) -> sqlite3.Connection | None:
+    """
+    Opens the compiled index read-only, or returns None if it is missing
+    or was written by a different version of this loader.
+    """
+    if not os.path.exists(path):
+        return None
+    connection = sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    except sqlite3.Error:
+        row = None
+    if row is None or row[0] != INDEX_VERSION:
+        connection.close()
+        return None
+    return connection
+
+
+def _trusted(connection: sqlite3.Connection) -> bool:
+    row = connection.execute("SELECT value FROM meta WHERE key = 'trusted'").fetchone()
+    return row is not None and row[0] == "1"
+
+
+def _up_to_date(compound_name: str, entry: os.DirEntry, size: int, mtime_ns: int, digest: str) -> bool:
+    # Only hashed if the file's size or time has changed since it was indexed
+    stat = entry.stat()
+    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+        return True
+    return stat.st_size == size and _digest(compound_name) == digest
+
+
+def _load_indexed(column: str, index_path: str | None) -> Dict[str, object]:
+    """
+    Returns column of every compound whose index entry is trusted or up to date.
+    """
+    indexed = {}
+    trusted = False
+    connection = _open_index(index_path or INDEX_PATH)
+    if connection is not None:
+        try:
+            trusted = _trusted(connection)
+            for compound_name, *entry in connection.execute(
+                f"SELECT name, size, mtime_ns, digest, {column} FROM compounds"
+            ):
+                indexed[compound_name] = entry
+        finally:
+            connection.close()
+
+    values = {}
+    for compound_name, source in _source_files().items():
+        entry = indexed.get(compound_name)
+        if entry is not None and (trusted or _up_to_date(compound_name, source, *entry[:3])):
+            values[compound_name] = entry[3]
+    return values
+
+
+def load_compounds(index_path: str | None = None) -> Dict[str, Compound]:
+    """
+    Loads every ChemSep compound.
+
+    Compounds are read from the compiled index. An index built into the wheel is
+    trusted. Otherwise an XML file is parsed if it has changed since it was indexed,
+    and any compound missing from the index is parsed.
+
+    Args:
+        index_path (str, optional): Location of the compiled index, defaults to INDEX_PATH.
+
+    Returns:
+        Dict[str, Compound]: Parsed compound data keyed by compound name.
+    """
+    indexed = _load_indexed("data", index_path)
+    return {
+        compound_name: _decode(indexed[compound_name]) if compound_name in indexed else load_compound(compound_name)
+        for compound_name in _source_files()
+    }
+
+
+def load_synonyms(index_path: str | None = None) -> Dict[str, List[str]]:
+    """
+    Returns the search synonyms of every ChemSep compound, e.g. its CAS number (see
+    SearchIndex.SYNONYM_FIELDS), without loading the rest of its data. They are read
+    from the compiled index in the same way as load_compounds.
+
+    Args:
+        index_path (str, optional): Location of the compiled index, defaults to INDEX_PATH.
+
+    Returns:
+        Dict[str, List[str]]: Synonyms keyed by compound name.
+    """
+    indexed = _load_indexed("synonyms", index_path)
+    return {
+        compound_name: json.loads(indexed[compound_name]) if compound_name in indexed
+        else _synonyms(load_compound(compound_name))
+        for compound_name in _source_files()
+    }
+
+
+def load_indexed_compound(name: str, index_path: str | None = None) -> Compound:
+    """
+    Loads a single ChemSep compound, from the compiled index if it is trusted or
+    its entry is up to date, otherwise from the XML file.
+
+    Args:
+        name (str): Name of the compound.
+        index_path (str, optional): Location of the compiled index, defaults to INDEX_PATH.
+
+    Returns:
+        Compound: Parsed compound data.
+    """
+    row = None
+    trusted = False
+    connection = _open_index(index_path or INDEX_PATH)
+    if connection is not None:
+        try:
+            trusted = _trusted(connection)
+            row = connection.execute(
+                "SELECT size, mtime_ns, digest, data FROM compounds WHERE name = ?", (name,)
+            ).fetchone()
+        finally:
+            connection.close()
+
+    if row is not None:
+        if trusted:
+            return _decode(row[3])
+        entry = next((e for e in os.scandir(CHEMSEP_DIR) if e.name == name + ".xml"), None)
+        if entry is not None and _up_to_date(name, entry, *row[:3]):
+            return _decode(row[3])
+    return load_compound(name)
+
+
+if __name__ == "__main__":
+    print(f"Compiled {compile_index()} compounds into {INDEX_PATH}")
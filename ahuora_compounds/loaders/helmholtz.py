@@ -6,4 +6,5 @@ def load(registry):
     
     registry.register_package(DefaultPropertyPackage("helmholtz"))
 
-    # todo: add compounds and binds
\ No newline at end of file
+    # Compounds are bound by the package that ships the parameter files, see
+    # ahuora_property_packages.helmholtz.parameters.load_compounds
@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+from ..loaders import chemsep
+from ..loaders.chemsep import compile_index, load_compound, load_compounds
+
+
+def test_index_matches_xml(tmp_path):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    assert compile_index(index_path) == len(load_compounds(str(tmp_path / "missing.sqlite")))
+
+    compounds = load_compounds(index_path)
+    assert compounds["benzene"] == load_compound("benzene")
+    assert compounds["benzene"]["AbsEntropy"].value == 269300
+    assert compounds["benzene"]["AbsEntropy"].unit == "J/kmol/K"
+
+
+def test_stale_index_falls_back_to_xml(tmp_path):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    compile_index(index_path)
+
+    # Corrupt the indexed benzene entry and mark it as indexed from a different file
+    connection = sqlite3.connect(index_path)
+    with connection:
+        connection.execute(
+            "UPDATE compounds SET size = 0, digest = 'changed', data = '{}' WHERE name = 'benzene'"
+        )
+    connection.close()
+
+    assert load_compounds(index_path)["benzene"] == load_compound("benzene")
+    assert chemsep.load_indexed_compound("benzene", index_path) == load_compound("benzene")
+
+
+def test_index_stores_plain_data(tmp_path):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    compile_index(index_path)
+
+    connection = sqlite3.connect(index_path)
+    (data,) = connection.execute("SELECT data FROM compounds WHERE name = 'benzene'").fetchone()
+    connection.close()
+    assert json.loads(data)["AbsEntropy"] == {"name": "IG absolute entropy", "value": 269300.0, "unit": "J/kmol/K"}
+
+
+def test_touched_file_checked_by_digest(tmp_path, monkeypatch):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    compile_index(index_path)
+    connection = sqlite3.connect(index_path)
+    with connection:
+        connection.execute("UPDATE compounds SET data = '{}' WHERE name = 'benzene'")
+    connection.close()
+
+    digested = []
+    digest = chemsep._digest
+    monkeypatch.setattr(chemsep, "_digest", lambda name: digested.append(name) or digest(name))
+
+    # Unchanged files are not hashed
+    assert load_compounds(index_path)["benzene"] == {}
+    assert digested == []
+
+    # A checkout sets the time of a file without changing it
+    source = os.path.join(chemsep.CHEMSEP_DIR, "benzene.xml")
+    stat = os.stat(source)
+    os.utime(source, (stat.st_atime, stat.st_mtime + 3600))
+    try:
+        assert load_compounds(index_path)["benzene"] == {}
+        assert digested == ["benzene"]
+    finally:
+        os.utime(source, (stat.st_atime, stat.st_mtime))
+
+
+def test_trusted_index_not_checked(tmp_path, monkeypatch):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    compile_index(index_path, trusted=True)
+    connection = sqlite3.connect(index_path)
+    with connection:
+        connection.execute("UPDATE compounds SET size = 0, digest = 'changed', data = '{}' WHERE name = 'benzene'")
+    connection.close()
+
+    def fail(name):
+        raise AssertionError(f"{name} was parsed or hashed")
+
+    monkeypatch.setattr(chemsep, "_digest", fail)
+    monkeypatch.setattr(chemsep, "load_compound", fail)
+    assert load_compounds(index_path)["benzene"] == {}
+    assert chemsep.load_indexed_compound("benzene", index_path) == {}
+
+
+def test_synonyms(tmp_path):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    compile_index(index_path)
+    connection = sqlite3.connect(index_path)
+    with connection:
+        connection.execute("UPDATE compounds SET size = 0, synonyms = '[]' WHERE name = 'benzene'")
+    connection.close()
+
+    synonyms = chemsep.load_synonyms(index_path)
+    assert synonyms["toluene"] == ["108-88-3", "(C6H5)CH3"]
+    # Read from the XML file if the entry is stale
+    assert synonyms["benzene"] == ["71-43-2", "-CHCHCHCHCHCH-"]
+    assert synonyms == chemsep.load_synonyms(str(tmp_path / "missing.sqlite"))
+
+
+def test_version_mismatch_ignores_index(tmp_path, monkeypatch):
+    index_path = str(tmp_path / "chemsep.sqlite")
+    compile_index(index_path)
+
+    monkeypatch.setattr(chemsep, "INDEX_VERSION", "outdated")
+    assert chemsep._open_index(index_path) is None
@@ -14,4 +14,23 @@ def test_package_support_strict():
 
 def test_package_support_not_strict():
     assert db.get_supported_packages(["biomass", "water", "carbon dioxide", "oxygen", "carbon monoxide", "nitrogen", "ash"], 
-                                    strict=False) == {"biomass_combustion_reaction", "biomass_and_flue", "peng-robinson", "milk", "humid_air"}
\ No newline at end of file
+                                    strict=False) == {"biomass_combustion_reaction", "biomass_and_flue", "peng-robinson", "milk", "humid_air"}
+
+def test_package_support_batch():
+    compound_lists = [["benzene", "toluene"], ["biomass", "ash"], [], ["water", "not a compound"], ["toluene", "benzene"]]
+    for strict in (True, False):
+        assert db.get_supported_packages_batch(compound_lists, strict=strict) == \
+            [db.get_supported_packages(compounds, strict=strict) for compounds in compound_lists]
+    # Lists with the same support get their own sets
+    supported = db.get_supported_packages_batch(compound_lists)
+    supported[0].add("not a package")
+    assert "not a package" not in supported[4]
+
+def test_package_support_unregistered_compound():
+    assert db.get_supported_packages(["water", "not a compound"], strict=True) == set()
+    assert "peng-robinson" in db.get_supported_packages(["water", "not a compound"], strict=False)
+
+def test_compound_support_does_not_alias_package():
+    supported = db.get_supported_compounds(["biomass_and_flue"], strict=True)
+    supported.add("not a compound")
+    assert "not a compound" not in db.get_supported_compounds(["biomass_and_flue"], strict=True)
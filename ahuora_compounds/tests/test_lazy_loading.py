@@ -0,0 +1,49 @@
+import threading
+from ahuora_compounds.Compound import Compound
+from ahuora_compounds.CompoundRegistry import CompoundRegistry
+from ahuora_compounds.RegistrySearch import RegistrySearch
+from ..loaders import chemsep
+from ..loaders.chemsep import load_compound
+
+
+def test_lazy_registry(monkeypatch):
+    loaded = []
+    load = chemsep.load_indexed_compound
+    monkeypatch.setattr(chemsep, "load_indexed_compound", lambda name: loaded.append(name) or load(name))
+    registry = CompoundRegistry(lazy=True)
+    registry._discover_loaders()
+    db = RegistrySearch(registry)
+
+    assert "benzene" in db.get_compound_names()
+    assert "peng-robinson" in db.get_supported_packages(["benzene", "toluene"])
+    # Synonyms are searchable without loading the compounds
+    assert db.search_compounds("71-43-2") == ["benzene"]
+    assert db.search_compounds("benz", limit=5) == RegistrySearch(CompoundRegistry()).search_compounds("benz", limit=5)
+    assert loaded == []
+
+    benzene = db.get_compound("benzene")
+    assert benzene.get_source("chemsep") == load_compound("benzene")
+    assert benzene.get_source("chemsep")["AbsEntropy"].value == 269300
+    assert loaded == ["benzene"]
+
+
+def test_lazy_source_loaded_once():
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {"value": 1}
+
+    compound = Compound("example")
+    compound.add_lazy_source("example_source", load)
+    assert len(calls) == 0
+
+    threads = [threading.Thread(target=compound.get_source, args=("example_source",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert compound.get_source("example_source") == {"value": 1}
+    assert compound.sources == {"example_source": {"value": 1}}
+    assert len(calls) == 1
@@ -0,0 +1,75 @@
+import threading
+import pytest
+from ahuora_compounds.CompoundRegistry import CompoundRegistry
+from ahuora_compounds.RegistrySearch import RegistrySearch
+
+
+def test_build_on_first_query():
+    registry = CompoundRegistry()
+    registry._discover_loaders()
+    db = RegistrySearch(registry)
+
+    assert not registry._built
+    assert "benzene" in db.get_compound_names()
+    assert registry._built
+
+
+def test_build_on_registry_access():
+    registry = CompoundRegistry()
+    registry._discover_loaders()
+    assert "benzene" in registry.compounds
+    assert registry._built
+
+
+def test_concurrent_build_runs_once():
+    registry = CompoundRegistry()
+    registry._discover_loaders()
+    db = RegistrySearch(registry)
+
+    # Registering a package twice raises, so a second build would surface as an error
+    errors = []
+
+    def query():
+        try:
+            db.get_supported_packages(["benzene"])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(db.get_compound_names()) == len(set(db.get_compound_names()))
+
+
+def test_failed_build_raises_again(monkeypatch):
+    from ahuora_compounds.loaders import loaders_list
+    from ahuora_compounds.PropertyPackage import DefaultPropertyPackage
+
+    def broken_loader(registry):
+        registry.register_package(DefaultPropertyPackage("broken"))
+        registry.bind("missing compound", "broken")
+
+    monkeypatch.setattr("ahuora_compounds.loaders.loaders_list", [*loaders_list, broken_loader])
+    registry = CompoundRegistry()
+    db = RegistrySearch(registry)
+    # Queued before the build, so it is kept when the build fails
+    registry.queue_package(DefaultPropertyPackage("queued"))
+    registry.queue_compound("queued compound", "example_source", {})
+    registry.queue_binding("queued compound", "queued")
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="missing compound"):
+            db.get_compound_names()
+        assert not registry._built
+        # Public accessors build the registry too
+        with pytest.raises(ValueError, match="missing compound"):
+            registry.packages
+
+    monkeypatch.setattr("ahuora_compounds.loaders.loaders_list", loaders_list)
+    assert "benzene" in db.get_compound_names()
+    assert db.get_supported_packages(["queued compound"]) == {"queued"}
+    assert "queued" in registry.packages
@@ -1,4 +1,6 @@
 from ahuora_compounds.CompoundDB import db
+from ahuora_compounds.CompoundRegistry import CompoundRegistry
+from ahuora_compounds.RegistrySearch import RegistrySearch
 
 def test_compound_search():
     assert len(db.search_compounds("ane")) == 122 # Subject to change
@@ -10,5 +12,30 @@ def test_compound_search_filter():
     assert len(db.search_compounds("milk", package_filters=["milk"])) == 1
 
 def test_compound_search_filter_strict():
-    assert db.search_compounds("ide", package_filters=["biomass_combustion_reaction", "peng-robinson"], 
-                               filter_strict=True) == {"carbon monoxide", "carbon dioxide"}
\ No newline at end of file
+    assert set(db.search_compounds("ide", package_filters=["biomass_combustion_reaction", "peng-robinson"], 
+                                   filter_strict=True)) == {"carbon monoxide", "carbon dioxide"}
+
+def test_compound_search_ranking():
+    results = db.search_compounds("benzene")
+    assert results[0] == "benzene"
+    assert results.index("ethylbenzene") > results.index("benzene")
+    assert len(db.search_compounds("benzene", limit=3)) == 3
+
+def test_compound_search_synonyms():
+    assert db.search_compounds("71-43-2") == ["benzene"] # CAS number
+    assert "methane" in db.search_compounds("CH4") # Structure formula
+    assert db.search_compounds("benz")[0] == "benzene"
+
+def test_compound_search_short_query():
+    assert set(db.search_compounds("at", package_filters=["milk"])) == {"water"}
+    assert len(db.search_compounds("")) == len(db.get_compound_names())
+
+
+
+def test_lazy_synonyms_searchable():
+    registry = CompoundRegistry(lazy=True)
+    registry.queue_lazy_compound("example compound", "example_source", lambda: {}, ["EXAMPLE-SYNONYM"])
+    lazy_db = RegistrySearch(registry)
+    assert lazy_db.search_compounds("example-syn") == ["example compound"]
+    # Including the synonyms of the chemsep loader
+    assert lazy_db.search_compounds("71-43-2") == ["benzene"]
@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from pyomo.contrib.pynumero.algorithms.solvers.cyipopt_solver import PyomoCyIpoptSolver
+from idaes.core.util.initialization import solve_indexed_blocks
+from idaes.core.util.model_statistics import degrees_of_freedom, number_activated_constraints
+
+"""
+Opt in instrumentation of the stages of state block initialization.
+
+Initializers time their stages with a StageRecorder. At the end of each stage an
+InitializationEvent is passed to every hook for each index of the state block,
+with the wall time, IPOPT iterations and termination status of the stage's solve,
+and the active constraints and degrees of freedom of that index. The indices of a
+state block are solved together, so they share the time, iterations and status,
+and blocks is the number of them.
+
+Hooks are callables added with add_hook or the instrument context manager, e.g. an
+InitializationCollector, or a JsonLinesExporter. Set AHUORA_INIT_EVENTS to the path
+of a JSON lines file to export the events of every initialization to it. Without
+hooks only the stage times are recorded, in blk.initialization_timings.
+"""
+
+INIT_EVENTS_ENV = "AHUORA_INIT_EVENTS"
+
+_hooks: List[Callable] = []
+# Exporters for AHUORA_INIT_EVENTS by path
+_exporters = {}
+
+
+class InitializationEvent(NamedTuple):
+    block: str
+    index: object
+    package: str
+    stage: str
+    seconds: float
+    blocks: int
+    iterations: Optional[int]
+    n_cons: Optional[int]
+    dof: Optional[int]
+    status: Optional[str]
+
+    def to_dict(self) -> dict:
+        event = self._asdict()
+        event["index"] = _json_index(self.index)
+        return event
+
+
+def add_hook(hook: Callable[[InitializationEvent], None]):
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[InitializationEvent], None]):
+    _hooks.remove(hook)
+
+
+@contextmanager
+def instrument(hook: Callable[[InitializationEvent], None]):
+    """Passes the events of initializations inside the context to hook."""
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+def active_hooks() -> List[Callable]:
+    hooks = list(_hooks)
+    path = os.environ.get(INIT_EVENTS_ENV)
+    if path:
+        if path not in _exporters:
+            _exporters[path] = JsonLinesExporter(path)
+        hooks.append(_exporters[path])
+    return hooks
+
+
+class InitializationCollector:
+    """Hook keeping the events in memory."""
+
+    def __init__(self):
+        self.events: List[InitializationEvent] = []
+
+    def __call__(self, event: InitializationEvent):
+        self.events.append(event)
+
+    def clear(self):
+        self.events.clear()
+
+    def stage_seconds(self) -> Dict[str, float]:
+        """Total seconds of each stage."""
+        seconds = defaultdict(float)
+        for event in self.events:
+            # Each index has its share of the time of its state block
+            seconds[event.stage] += event.seconds / event.blocks
+        return dict(seconds)
+
+    def slowest(self, n: int = 10) -> List[InitializationEvent]:
+        """The total events of the n slowest initialized state blocks."""
+        totals = [event for event in self.events if event.stage == "total"]
+        return sorted(totals, key=lambda event: event.seconds, reverse=True)[:n]
+
+
+class JsonLinesExporter:
+    """Hook appending the events to a JSON lines file, one object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def __call__(self, event: InitializationEvent):
+        line = json.dumps(event.to_dict())
+        with self._lock:
+            self._file.write(line + "\n")
+            # Nothing is left buffered if the process is forked, see base.parallel
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_events(path: str) -> List[InitializationEvent]:
+    """Reads the events written by a JsonLinesExporter."""
+    with open(path) as f:
+        return [InitializationEvent(**json.loads(line)) for line in f if line.strip()]
+
+
+class StageRecorder:
+    """
+    Records the stages of one initialize call of an indexed state block. Solve
+    through it, and call end_stage after each stage and finish at the end.
+    """
+
+    def __init__(self, blk, package: str):
+        self.blk = blk
+        self.package = package
+        self.timings: Dict[str, float] = {}
+        self.hooks = active_hooks()
+        self._start = perf_counter()
+        self._res = None
+        self._iterations = None
+        # Termination of the last solve, reported for the total
+        self._status = None
+        blk.initialization_timings = self.timings
+
+    def solve(self, opt, tee: bool = False):
+        """solve_indexed_blocks, also reading the IPOPT iterations if there are hooks."""
+        if not self.hooks:
+            self._res = solve_indexed_blocks(opt, [self.blk], tee=tee)
+        elif isinstance(opt, PyomoCyIpoptSolver):
+            # The cyipopt results do not report iterations, they are counted as they run
+            counter = _IterationCounter()
+            self._res = solve_indexed_blocks(opt, [self.blk], tee=tee, intermediate_callback=counter)
+            self._iterations = counter.iterations
+        elif getattr(opt, "name", None) == "ipopt":
+            # The IPOPT executable only reports iterations in its output
+            with tempfile.TemporaryDirectory() as directory:
+                logfile = os.path.join(directory, "ipopt.log")
+                self._res = solve_indexed_blocks(opt, [self.blk], tee=tee, logfile=logfile)
+                self._iterations = _read_iterations(logfile)
+        else:
+            self._res = solve_indexed_blocks(opt, [self.blk], tee=tee)
+            # Reported by some solver interfaces
+            iterations = getattr(self._res.solver, "iterations", None)
+            self._iterations = int(iterations) if iterations is not None else None
+        return self._res
+
+    def end_stage(self, name: str):
+        now = perf_counter()
+        seconds = self.timings[name] = now - self._start
+        self._start = now
+        status = None
+        if self._res is not None:
+            status = self._status = str(self._res.solver.termination_condition)
+        if self.hooks:
+            self._emit(name, seconds, self._iterations, status, count=True)
+        self._res = None
+        self._iterations = None
+
+    def finish(self):
+        self.timings["total"] = sum(self.timings.values())
+        if self.hooks:
+            self._emit("total", self.timings["total"], None, self._status, count=False)
+
+    def _emit(self, stage: str, seconds: float, iterations: Optional[int], status: Optional[str], count: bool):
+        for idx, sb in self.blk.items():
+            event = InitializationEvent(
+                block=self.blk.name,
+                index=idx,
+                package=self.package,
+                stage=stage,
+                seconds=seconds,
+                blocks=len(self.blk),
+                iterations=iterations,
+                n_cons=number_activated_constraints(sb) if count else None,
+                dof=degrees_of_freedom(sb) if count else None,
+                status=status,
+            )
+            for hook in self.hooks:
+                hook(event)
+
+
+class _IterationCounter:
+    """Intermediate callback of the PyNumero cyipopt interface, keeping the last iteration."""
+
+    def __init__(self):
+        self.iterations = None
+
+    def __call__(self, nlp, alg_mod, iter_count, *args):
+        self.iterations = iter_count
+        # Carry on solving
+        return True
+
+
+def _read_iterations(logfile: str) -> Optional[int]:
+    try:
+        with open(logfile) as f:
+            match = re.search(r"Number of Iterations\.+:\s*(\d+)", f.read())
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+
+def _json_index(idx):
+    # Indices are scalars, or tuples of them
+    if isinstance(idx, tuple):
+        return [_json_index(i) for i in idx]
+    if idx is None or isinstance(idx, (int, float, str, bool)):
+        return idx
+    return str(idx)
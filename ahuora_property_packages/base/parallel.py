@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from pyomo.common.errors import ApplicationError
+from pyomo.environ import Var
+from idaes.core.util.exceptions import InitializationError
+import idaes.logger as idaeslog
+
+from ahuora_property_packages.base.warm_start import WARM_START_ENV
+from ahuora_property_packages.utils.fix_state_vars import fix_state_vars
+
+"""
+Parallel initialization of the extended state blocks, by initialize(parallel=...).
+
+The indices of a state block are split into chunks and each chunk is initialized
+on its own, in a worker process, so that a bad point only fails its own chunk.
+Failed chunks are retried one index at a time.
+
+IDAES blocks cannot be pickled, so workers are forked: each inherits a copy of
+the model, removes the indices outside its chunk, runs the usual initialize and
+sends back the values of the chunk's variables by name. A worker that dies, e.g.
+in an external function, fails its chunk. Errors from the environment rather than
+the point, e.g. a solver that cannot be found, are raised. Where fork is not
+available, e.g. on Windows, the state block is initialized as usual instead.
+
+Packages whose initialize changes the model, e.g. the Helmholtz vapor fraction
+constraint, make the same changes to the state block before calling
+initialize_parallel, so that it matches the workers' copies. Workers do not use
+warm starts (see base.warm_start), as the store cannot be shared between them.
+"""
+
+# State block being initialized, read by the forked workers
+_block = None
+
+
+class ParallelInitializationError(InitializationError):
+    """Raised when some indices still fail when initialized on their own."""
+
+    def __init__(self, message: str, indices: List[Hashable]):
+        super().__init__(message)
+        self.indices = indices
+
+
+def chunk_indices(indices: Sequence[Hashable], chunks: int) -> List[List[Hashable]]:
+    """Splits indices into at most chunks contiguous chunks of nearly equal size."""
+    indices = list(indices)
+    chunks = max(1, min(chunks, len(indices)))
+    size, extra = divmod(len(indices), chunks)
+    result = []
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        result.append(indices[start:end])
+        start = end
+    return result
+
+
+def initialize_parallel(blk, parallel, **kwargs) -> Optional[dict]:
+    """
+    Initializes an indexed state block in chunks, see the module docstring.
+
+    Args:
+        blk: Indexed state block.
+        parallel: True to use a process per CPU, or the number of processes.
+        chunk_size (int, optional): Indices per chunk, by default the indices are
+            split evenly between the processes.
+        kwargs: Passed to initialize for each chunk, e.g. solver, optarg, state_args.
+
+    Returns:
+        The flags of fix_state_vars if hold_state is True, like initialize.
+    """
+    global _block
+    outlvl = kwargs.get("outlvl", idaeslog.NOTSET)
+    init_log = idaeslog.getInitLogger(blk.name, outlvl, tag="properties")
+    hold_state = kwargs.pop("hold_state", False)
+    chunk_size = kwargs.pop("chunk_size", None)
+    kwargs.pop("warm_start", None)
+    processes = os.cpu_count() if parallel is True else int(parallel)
+
+    indices = list(blk.keys())
+    if chunk_size:
+        chunks = [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]
+    else:
+        chunks = chunk_indices(indices, processes)
+
+    context = _fork_context()
+    if context is None:
+        init_log.info("Processes cannot be forked, initializing in this process.")
+        return type(blk).initialize(blk, hold_state=hold_state, **kwargs)
+
+    init_log.info(f"Initializing {len(chunks)} chunks in {processes} processes.")
+    _block = blk
+    try:
+        values = _run_chunks(context, processes, chunks, kwargs, init_log)
+        retries = _write_back(blk, chunks, values)
+        values = _run_chunks(context, processes, [[idx] for idx in retries], kwargs, init_log)
+    finally:
+        _block = None
+
+    failed = _write_back(blk, [[idx] for idx in retries], values)
+    if retries:
+        init_log.info(f"Retried {len(retries)} indices individually, {len(failed)} failed.")
+    if failed:
+        raise ParallelInitializationError(
+            f"{blk.name} failed to initialize at indices {failed}. Please check "
+            f"the output logs for more information.",
+            failed,
+        )
+
+    if hold_state:
+        return fix_state_vars(blk, kwargs.get("state_args", None))
+    return None
+
+
+def _fork_context():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def _run_chunks(context, processes: int, chunks: List[List[Hashable]], kwargs: dict, init_log) -> list:
+    """
+    Initializes each chunk in its own forked worker, at most processes at a time.
+    Returns the values of each chunk, or None for the chunks that failed.
+    """
+    values = [None] * len(chunks)
+    queue = list(enumerate(chunks))
+    running = {}
+    try:
+        while queue or running:
+            while queue and len(running) < processes:
+                i, chunk = queue.pop(0)
+                # A worker removes indices from its copy, so each chunk needs a fresh one
+                executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+                running[executor.submit(_initialize_chunk, chunk, kwargs)] = (i, executor)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, executor = running.pop(future)
+                executor.shutdown()
+                try:
+                    values[i] = future.result()
+                except BrokenProcessPool:
+                    init_log.info(f"The worker initializing indices {chunks[i]} exited unexpectedly.")
+    finally:
+        for future, (_, executor) in running.items():
+            executor.shutdown(wait=False, cancel_futures=True)
+    return values
+
+
+def _initialize_chunk(chunk: List[Hashable], kwargs: dict) -> Optional[Dict[Hashable, dict]]:
+    """
+    Initializes the indices in chunk, in a forked worker. Returns the variable values
+    of each index, or None if initialization failed. Solver errors are raised, as
+    they would fail every chunk and retry.
+    """
+    blk = _block
+    os.environ.pop(WARM_START_ENV, None)
+    # The model is this worker's own copy
+    chunk_set = set(chunk)
+    for idx in [idx for idx in blk.keys() if idx not in chunk_set]:
+        del blk[idx]
+    try:
+        type(blk).initialize(blk, **kwargs)
+    except (ApplicationError, RuntimeError):
+        raise
+    except Exception as e:
+        init_log = idaeslog.getInitLogger(blk.name, kwargs.get("outlvl", idaeslog.NOTSET), tag="properties")
+        init_log.info(f"Initialization failed for indices {chunk}: {e}")
+        return None
+    return {idx: _values(blk[idx]) for idx in chunk}
+
+
+def _write_back(blk, chunks, values) -> List[Hashable]:
+    """Sets the values of each successful chunk, and returns the indices of the failed ones."""
+    failed = []
+    for chunk, chunk_values in zip(chunks, values):
+        if chunk_values is None:
+            failed.extend(chunk)
+            continue
+        for idx, v in chunk_values.items():
+            _set_values(blk[idx], v)
+    return failed
+
+
+def _vars(sb) -> Dict[str, Var]:
+    # Keyed by name, which is the same in every copy of the model
+    return {
+        v.getname(fully_qualified=True, relative_to=sb): v
+        for v in sb.component_data_objects(Var, descend_into=True)
+    }
+
+
+def _values(sb) -> Dict[str, float]:
+    return {name: v.value for name, v in _vars(sb).items()}
+
+
+def _set_values(sb, values: Dict[str, float]):
+    variables = _vars(sb)
+    if variables.keys() != values.keys():
+        raise InitializationError(
+            f"The variables of {sb.name} differ from those initialized in the worker: "
+            f"{sorted(variables.keys() ^ values.keys())}"
+        )
+    for name, x in values.items():
+        variables[name].set_value(x, skip_validation=True)
@@ -0,0 +1,105 @@
+import os
+import threading
+from typing import Callable
+
+from pyomo.environ import SolverFactory
+from idaes.core.solvers import get_solver
+
+"""
+Solvers for the extended state block initializers.
+
+IPOPT is run in a subprocess by default, which writes an NL file and starts a
+process for every solve. When an in process backend is chosen, IPOPT-family
+solvers are replaced by the PyNumero cyipopt interface with the same options,
+which solves in this process through the IPOPT library.
+
+The backend is chosen by the AHUORA_SOLVER_BACKEND environment variable:
+
+* subprocess (default): always use the named solver, as the factory creates it.
+* in_process: in process for any IPOPT-family solver, e.g. ipopt-watertap,
+  whose scaling wrapper is then not used. Raises if cyipopt is not available.
+* auto: in process if cyipopt is available, for plain ipopt only, otherwise
+  subprocess.
+
+Solver objects are used as they are given. Their optarg is passed to each solve
+rather than set on the object, which may be shared with other callers.
+"""
+
+SOLVER_BACKEND_ENV = "AHUORA_SOLVER_BACKEND"
+SOLVER_BACKENDS = ("subprocess", "in_process", "auto")
+
+# In process solvers, by the name and options of the solver they replace, so that
+# initializing many state blocks reuses one solver object
+_solvers = {}
+_lock = threading.Lock()
+
+
+def solver_backend() -> str:
+    backend = os.environ.get(SOLVER_BACKEND_ENV, "subprocess")
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"{SOLVER_BACKEND_ENV} is {backend}, expected one of {SOLVER_BACKENDS}")
+    return backend
+
+
+def in_process_available() -> bool:
+    return SolverFactory("cyipopt").available(exception_flag=False)
+
+
+def get_initialization_solver(solver=None, optarg=None, factory: Callable = get_solver):
+    """
+    Returns the solver to initialize state blocks with.
+
+    Args:
+        solver: Solver name, or a solver object with a solve method, which is used
+            as it is with optarg passed to each of its solves. Names are created
+            with factory and default to its default solver.
+        optarg (dict, optional): Solver options.
+        factory (Callable): Creates a solver from a name and options, e.g. IDAES or
+            WaterTAP get_solver.
+    """
+    if solver is not None and not isinstance(solver, str):
+        if optarg:
+            return _SolverWithOptions(solver, optarg)
+        return solver
+
+    backend = solver_backend()
+    # Created each time, so that the default solver and its options follow the
+    # current IDAES or WaterTAP configuration
+    opt = factory(solver, optarg)
+    name = getattr(opt, "name", "")
+    if backend == "subprocess" or "ipopt" not in name:
+        return opt
+    if backend == "auto" and (name != "ipopt" or not in_process_available()):
+        return opt
+    if not in_process_available():
+        raise RuntimeError(
+            f"{SOLVER_BACKEND_ENV}={backend} needs cyipopt, install it or use the subprocess backend"
+        )
+
+    # The factory's options, e.g. the IDAES IPOPT defaults, followed by optarg
+    options = dict(opt.options)
+    key = (name, repr(sorted(options.items())))
+    in_process = _solvers.get(key)
+    if in_process is None:
+        with _lock:
+            in_process = _solvers.get(key)
+            if in_process is None:
+                in_process = _solvers[key] = SolverFactory("cyipopt")
+                in_process.config.options.update(options)
+    return in_process
+
+
+class _SolverWithOptions:
+    """A solver object given with optarg, passing optarg to each solve."""
+
+    def __init__(self, solver, options: dict):
+        self._solver = solver
+        self._options = dict(options)
+
+    def solve(self, *args, **kwds):
+        # Options of the solve call take precedence, as they would on the solver
+        options = {**self._options, **kwds.pop("options", {})}
+        return self._solver.solve(*args, options=options, **kwds)
+
+    def __getattr__(self, name):
+        return getattr(self._solver, name)
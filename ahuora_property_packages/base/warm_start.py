@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from pyomo.common.errors import ApplicationError
+from pyomo.environ import Constraint, Var, check_optimal_termination, value
+from idaes.core.util.initialization import solve_indexed_blocks
+
+"""
+Opt in store of converged state blocks, to start later initializations from.
+
+Entries are grouped by a fingerprint of the state block structure: the package,
+components and phases, the constraints that define the state and the state
+variables that are fixed. Within a group the entry with the nearest specification,
+the values of those constraints and variables, is used. A state block's indices are
+looked up and stored together, reading the specifications of each group once.
+
+The store is a sqlite file. It is used when a store is passed to initialize as
+warm_start, or for every initialization when AHUORA_WARM_START is set to the path
+of a store. The least recently used entries are removed past the capacity.
+"""
+
+WARM_START_ENV = "AHUORA_WARM_START"
+DEFAULT_CAPACITY = 10000
+# Below SQLite's limit on the parameters of a statement
+_SQL_VARIABLES = 900
+
+# Default stores by path
+_stores = {}
+
+# (fingerprint, spec)
+Key = Tuple[str, List[float]]
+
+
+class WarmStartStats(NamedTuple):
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+
+
+class WarmStartStore:
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            path (str): sqlite file, created if it does not exist.
+            capacity (int): Entries to keep, the least recently used are removed.
+        """
+        self.path = path
+        self.capacity = capacity
+        self._hits = self._misses = self._stores = self._evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "id INTEGER PRIMARY KEY, fingerprint TEXT NOT NULL, spec TEXT NOT NULL, "
+                "state TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_fingerprint ON entries (fingerprint)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    @property
+    def stats(self) -> WarmStartStats:
+        return WarmStartStats(self._hits, self._misses, self._stores, self._evictions)
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def lookup(self, fingerprint: str, spec: List[float]) -> Optional[Dict[str, float]]:
+        """Returns the variable values of the entry nearest spec, or None if there is none."""
+        return self.lookup_many([(fingerprint, spec)])[0]
+
+    def lookup_many(self, keys: Sequence[Key]) -> List[Optional[Dict[str, float]]]:
+        """
+        Returns the variable values of the entry nearest each (fingerprint, spec), or
+        None where there is none.
+        """
+        nearest = [None] * len(keys)
+        by_fingerprint = {}
+        for i, (fingerprint, _) in enumerate(keys):
+            by_fingerprint.setdefault(fingerprint, []).append(i)
+        with self._lock:
+            for fingerprint, positions in by_fingerprint.items():
+                rows = self._connection.execute(
+                    "SELECT id, spec FROM entries WHERE fingerprint = ?", (fingerprint,)
+                ).fetchall()
+                if not rows:
+                    continue
+                ids = [row[0] for row in rows]
+                specs = np.array([json.loads(row[1]) for row in rows], dtype=float)
+                for i in positions:
+                    nearest[i] = ids[int(np.argmin(_distances(specs, keys[i][1])))]
+
+            found = sorted({entry for entry in nearest if entry is not None})
+            states = {}
+            if found:
+                now = time.time()
+                with self._connection:
+                    self._connection.executemany(
+                        "UPDATE entries SET last_used = ? WHERE id = ?", [(now, entry) for entry in found]
+                    )
+                for start in range(0, len(found), _SQL_VARIABLES):
+                    batch = found[start:start + _SQL_VARIABLES]
+                    states.update(self._connection.execute(
+                        f"SELECT id, state FROM entries WHERE id IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall())
+            hits = sum(entry is not None for entry in nearest)
+            self._hits += hits
+            self._misses += len(keys) - hits
+        return [json.loads(states[entry]) if entry is not None else None for entry in nearest]
+
+    def store(self, fingerprint: str, spec: List[float], state: Dict[str, float]):
+        """Adds an entry, replacing one with the same specification."""
+        self.store_many([(fingerprint, spec, state)])
+
+    def store_many(self, entries: Sequence[Tuple[str, List[float], Dict[str, float]]]):
+        """Adds (fingerprint, spec, state) entries in one transaction, see store."""
+        now = time.time()
+        # The last of entries with the same specification is kept
+        rows = {
+            (fingerprint, json.dumps(spec)): json.dumps(state) for fingerprint, spec, state in entries
+        }
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM entries WHERE fingerprint = ? AND spec = ?", list(rows)
+            )
+            self._connection.executemany(
+                "INSERT INTO entries (fingerprint, spec, state, last_used) VALUES (?, ?, ?, ?)",
+                [(fingerprint, spec, state, now) for (fingerprint, spec), state in rows.items()],
+            )
+            self._stores += len(entries)
+            excess = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.capacity
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE id IN (SELECT id FROM entries ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self._evictions += excess
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self):
+        self._connection.close()
+
+
+def get_warm_start_store(warm_start=None) -> Optional[WarmStartStore]:
+    """
+    Returns the store an initialization should use: warm_start if it is given, otherwise
+    the store at AHUORA_WARM_START, if it is set.
+    """
+    if warm_start is not None:
+        return warm_start
+    path = os.environ.get(WARM_START_ENV)
+    if not path:
+        return None
+    if path not in _stores:
+        _stores[path] = WarmStartStore(path)
+    return _stores[path]
+
+
+class WarmStart:
+    """
+    Warm start of an indexed state block during initialize. Create it before the
+    initializer changes any constraints, call restore once the state variables are
+    fixed, and save once the state blocks have converged.
+    """
+
+    def __init__(self, blk, store: WarmStartStore):
+        self.store = store
+        # Constraint targets before initialization, e.g. before Helmholtz replaces
+        # the vapor fraction constraint
+        self._constraints = {idx: _constraint_targets(sb) for idx, sb in blk.items()}
+        self._blocks = dict(blk.items())
+        self._keys = {}
+        # Values replaced by restore
+        self._replaced = []
+        self.hits = 0
+
+    def restore(self) -> int:
+        """
+        Sets the unfixed variables of each state block from the nearest stored solution.
+        Returns the number of state blocks that had one.
+        """
+        self._keys = {idx: self._key(idx, sb) for idx, sb in self._blocks.items()}
+        states = self.store.lookup_many(list(self._keys.values()))
+        self._replaced = []
+        hits = 0
+        for (idx, sb), state in zip(self._blocks.items(), states):
+            if state is None:
+                continue
+            hits += 1
+            for v in _unfixed_vars(sb):
+                stored = state.get(v.getname(fully_qualified=True, relative_to=sb))
+                if stored is not None:
+                    self._replaced.append((v, v.value))
+                    v.set_value(stored, skip_validation=True)
+        self.hits = hits
+        return hits
+
+    def revert(self):
+        """Sets the variables restore changed back to their values before it."""
+        for v, previous in self._replaced:
+            v.set_value(previous, skip_validation=True)
+        self._replaced = []
+
+    def solve(self, blk, opt, tee: bool = False, solve: Callable = None):
+        """
+        Solves blk from the restored values, if every state block had one. Returns the
+        results if it converged. Otherwise returns None, with the restored values
+        reverted, and the caller should initialize as usual.
+
+        Args:
+            solve (callable, optional): Called as solve(opt, tee=tee) instead of
+                solve_indexed_blocks, e.g. StageRecorder.solve.
+        """
+        if len(self._keys) != len(self._blocks) or self.hits < len(self._blocks):
+            return None
+        try:
+            if solve is None:
+                res = solve_indexed_blocks(opt, [blk], tee=tee)
+            else:
+                res = solve(opt, tee=tee)
+        except (ValueError, ApplicationError):
+            res = None
+        if res is None or not check_optimal_termination(res):
+            self.revert()
+            return None
+        return res
+
+    def save(self):
+        """Stores the current values of each state block restore was called for."""
+        entries = []
+        for idx, (fingerprint, spec) in self._keys.items():
+            sb = self._blocks[idx]
+            state = {
+                v.getname(fully_qualified=True, relative_to=sb): v.value
+                for v in _unfixed_vars(sb) if v.value is not None
+            }
+            entries.append((fingerprint, spec, state))
+        self.store.store_many(entries)
+
+    def _key(self, idx, sb):
+        targets = self._constraints[idx]
+        fixed = [
+            (name, index, v[index].value)
+            for name, v in sb.define_state_vars().items()
+            for index in v
+            if v[index].fixed
+        ]
+        structure = {
+            "package": type(sb.params).__name__,
+            "components": [str(j) for j in sb.params.component_list],
+            "phases": [str(p) for p in sb.params.phase_list],
+            "constraints": sorted(targets),
+            "fixed": [(name, repr(index)) for name, index, _ in fixed],
+        }
+        fingerprint = hashlib.sha256(json.dumps(structure).encode()).hexdigest()
+        spec = [targets[name] for name in sorted(targets)] + [float(x) for _, _, x in fixed]
+        return fingerprint, spec
+
+
+def _constraint_targets(sb) -> Dict[str, float]:
+    # Equality constraints defining the state, e.g. constraints.temperature, have
+    # their target as both bounds
+    targets = {}
+    if hasattr(sb, "constraints"):
+        for c in sb.constraints.component_data_objects(Constraint, descend_into=False):
+            upper = c.upper
+            if c.equality and upper is not None:
+                targets[c.local_name] = float(value(upper))
+    return targets
+
+
+def _unfixed_vars(sb):
+    return (v for v in sb.component_data_objects(Var, descend_into=True) if not v.fixed)
+
+
+def _distances(specs: np.ndarray, spec: List[float]) -> np.ndarray:
+    # Relative differences, so specs in Pa and mole fractions weigh alike
+    spec = np.asarray(spec, dtype=float)
+    scale = np.maximum(np.maximum(np.abs(specs), np.abs(spec)), 1e-8)
+    return np.sum(((specs - spec) / scale) ** 2, axis=1)
@@ -1,51 +1,110 @@
-from ahuora_property_packages.modular.template_builder import build_config
-from .helmholtz.helmholtz_builder import build_helmholtz_package
-from ahuora_property_packages.humid_air import build_humid_air_package
-from ahuora_property_packages.milk import build_milk_package
+import importlib
+import inspect
+from importlib.metadata import entry_points
+from typing import Callable, Dict, List
 from ahuora_property_packages.types import PackageName, States
-from ahuora_property_packages.seawater.seawater_builder import build_seawater_package
-from ahuora_property_packages.combustion.biomass_builder import (
-    build_biomass_and_flue_package,
-    build_biomass_combustion_reaction_package)
-from typing import List
 
-def build_package(package_name: PackageName, compound_list: List[str], valid_states: List[States]=["Liq", "Vap"], property_package=None): # type: ignore
+"""
+Builds property packages by name. Each package's builder is imported the first
+time that package is built, so e.g. a worker that only builds peng-robinson does
+not import the Helmholtz, humid air surrogate, seawater or combustion packages.
+
+Other distributions can add packages through the "ahuora_property_packages.builders"
+entry point group, with the package name as the entry point name, e.g. in pyproject.toml:
+
+    [project.entry-points."ahuora_property_packages.builders"]
+    my_package = "my_distribution.builder:build_my_package"
+"""
+
+ENTRY_POINT_GROUP = "ahuora_property_packages.builders"
+
+# Builder of each package as "module:function". Builders are called with the compound
+# list and the keyword arguments of build_package that their signature accepts.
+PACKAGE_BUILDERS: Dict[str, str] = {
+    "peng-robinson": "ahuora_property_packages.modular.template_builder:build_peng_robinson_package",
+    "helmholtz": "ahuora_property_packages.helmholtz.helmholtz_builder:build_helmholtz_package",
+    "helmholtz-tabulated":
+        "ahuora_property_packages.helmholtz_tabulated.tabulated_builder:build_helmholtz_tabulated_package",
+    "milk": "ahuora_property_packages.milk.milk_builder:build_milk_package",
+    "humid_air": "ahuora_property_packages.humid_air.humid_air_builder:build_humid_air_package",
+    "biomass_and_flue": "ahuora_property_packages.combustion.biomass_builder:build_biomass_and_flue_package",
+    "biomass_combustion_reaction":
+        "ahuora_property_packages.combustion.biomass_builder:build_biomass_combustion_reaction_package",
+    "seawater": "ahuora_property_packages.seawater.seawater_builder:build_seawater_package",
+}
+
+# Builders that have been imported, by package name
+_builders: Dict[str, Callable] = {}
+
+
+def register_package(package_name: str, builder: str | Callable):
+    """
+    Registers a property package builder, replacing any existing builder of that name.
+
+    Args:
+        package_name (str): Name to build the package by.
+        builder (str | Callable): The builder, or its "module:function" path to import on first use.
+    """
+    _builders.pop(package_name, None)
+    if callable(builder):
+        _builders[package_name] = builder
+    else:
+        PACKAGE_BUILDERS[package_name] = builder
+
+
+def get_builder(package_name: str) -> Callable:
+    """
+    Returns the builder of a package, importing it if this is the first use.
+
+    Raises:
+        ValueError: If no builder is registered for the package, or by an entry point.
+    """
+    if package_name not in _builders:
+        target = PACKAGE_BUILDERS.get(package_name)
+        if target is None:
+            # Only look up entry points for names that are not built in
+            found = entry_points(group=ENTRY_POINT_GROUP, name=package_name)
+            if not found:
+                raise ValueError(f"Invalid package name {package_name}. Expected a valid property package type, e.g helmholtz")
+            target = next(iter(found)).value
+        module_name, _, function_name = target.partition(":")
+        _builders[package_name] = getattr(importlib.import_module(module_name), function_name)
+    return _builders[package_name]
+
+
+def build_package(package_name: PackageName, compound_list: List[str], valid_states: List[States]=["Liq", "Vap"], property_package=None, kappa_temperature_range=None): # type: ignore
     """ Builds a property package
 
     Args:
         package_name (PackageName): Name of the property package to build.
         compound_list (List[str]): List of compound names to include in the package.
         valid_states (List[States], optional): List of valid states for the compounds.
-    
+        property_package (optional): Reaction packages only, the property package the reactions use.
+        kappa_temperature_range (Tuple[float, float], optional): Peng-Robinson only, operating window in K
+            used to choose between binary interaction parameters measured over different temperature ranges.
+
     Returns:
         object: IDAES ParameterBlock object.
 
     Raises:
         ValueError: If the package name or states are invalid
     """
-    
+
     # Type checking states
     for state in valid_states:
         if state not in ["Liq", "Vap"]:
             raise ValueError(f"Invalid state {state}. Valid states are: Liq, Vap")
 
-    # Type checking package
-    match package_name:
-        case "peng-robinson":
-            return build_config("peng-robinson", compound_list, valid_states)
-        case "helmholtz":
-            return build_helmholtz_package(compound_list)
-        case "milk":
-            return build_milk_package(compound_list)
-        case "humid_air":
-            return build_humid_air_package(compound_list)
-        case "biomass_and_flue":
-            return build_biomass_and_flue_package(compound_list)
-        case "biomass_combustion_reaction":
-            return build_biomass_combustion_reaction_package(compound_list, pp=property_package)
-        case "seawater":
-            return build_seawater_package(compound_list)
-        case "genericML":
-            raise NotImplementedError("Generic ML package is not implemented yet.")
-        case _:
-            raise ValueError(f"Invalid package name {package_name}. Expected a valid property package type, e.g helmholtz")
\ No newline at end of file
+    if package_name == "genericML":
+        raise NotImplementedError("Generic ML package is not implemented yet.")
+
+    builder = get_builder(package_name)
+    options = {
+        "valid_states": valid_states,
+        "property_package": property_package,
+        "kappa_temperature_range": kappa_temperature_range,
+    }
+    parameters = inspect.signature(builder).parameters
+    if not any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        options = {name: option for name, option in options.items() if name in parameters}
+    return builder(compound_list, **options)
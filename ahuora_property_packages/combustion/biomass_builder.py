@@ -1,3 +1,4 @@
+import warnings
 from .biomass_combustion_rp import BMCombReactionParameterBlock
 from .biomass_comb_pp import configuration
 from idaes.models.properties.modular_properties import GenericParameterBlock
@@ -14,7 +15,15 @@ def build_biomass_and_flue_package(compound_list: List[str]):
     return GenericParameterBlock(**configuration)
 
 
-def build_biomass_combustion_reaction_package(compound_list: List[str], pp=None):
+def build_biomass_combustion_reaction_package(compound_list: List[str], property_package=None, pp=None):
+
+    if pp is not None:
+        warnings.warn(
+            "The pp argument is deprecated and will be removed in future versions, use property_package.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        property_package = pp
 
     # Validate compound list
 
@@ -23,5 +32,5 @@ def build_biomass_combustion_reaction_package(compound_list: List[str], pp=None)
             raise ValueError(f"Compound {compound} is not valid for biomass combustion reaction package.")
 
     return BMCombReactionParameterBlock(
-        property_package=pp
+        property_package=property_package
     )
\ No newline at end of file
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from ahuora_property_packages.helmholtz_tabulated.tabulate import tabulate
+
+R = 8.314462618
+
+
+class SyntheticSource:
+    """
+    Clausius-Clapeyron saturation, an incompressible liquid and an ideal gas vapour,
+    so tables can be tested without the Helmholtz external functions.
+    """
+    compound = "synthetic"
+    mw = 0.018
+    default_pressure_range = (1e3, 1e6)
+    default_temperature_range = (260.0, 700.0)
+    cl, cv, L, T0, P0, Tr, v0, beta = 75.0, 34.0, 40000.0, 373.15, 101325.0, 273.15, 1.8e-5, 2e-4
+
+    def saturation(self, P):
+        T = 1 / (1 / self.T0 - R / self.L * np.log(P / self.P0))
+        liq = self._liq(T)
+        return {"temperature": T, "enth_liq": liq["enth"], "enth_vap": liq["enth"] + self.L,
+                "entr_liq": liq["entr"], "entr_vap": liq["entr"] + self.L / T,
+                "vol_liq": liq["vol"], "vol_vap": R * T / P}
+
+    def _liq(self, T):
+        return {"enth": self.cl * (T - self.Tr), "entr": self.cl * np.log(T / self.Tr),
+                "vol": self.v0 * (1 + self.beta * (T - self.Tr))}
+
+    def _vap(self, P, T):
+        sat = self.saturation(P)
+        return {"enth": sat["enth_vap"] + self.cv * (T - sat["temperature"]),
+                "entr": sat["entr_vap"] + self.cv * np.log(T / sat["temperature"]), "vol": R * T / P}
+
+    def pt(self, P, T, phase):
+        P, T = np.broadcast_arrays(P, T)
+        return self._liq(T) if phase == "liq" else self._vap(P, T)
+
+    def ph(self, P, h, phase):
+        P, h = np.broadcast_arrays(P, h)
+        if phase == "liq":
+            T = self.Tr + h / self.cl
+            values = self._liq(T)
+        else:
+            sat = self.saturation(P)
+            T = sat["temperature"] + (h - sat["enth_vap"]) / self.cv
+            values = self._vap(P, T)
+        return {"temperature": T, "entr": values["entr"], "vol": values["vol"]}
+
+
+@pytest.fixture(scope="session")
+def synthetic_source():
+    return SyntheticSource()
+
+
+@pytest.fixture(scope="session")
+def table_file(synthetic_source, tmp_path_factory):
+    """Tables of SyntheticSource, for helmholtz-tabulated state blocks of the "synthetic" compound."""
+    path = str(tmp_path_factory.mktemp("tables") / "synthetic.npz")
+    tabulate(synthetic_source).save(path)
+    return path
@@ -1,12 +1,11 @@
 from typing import List
 from idaes.models.properties.general_helmholtz import (
-    registered_components,
     PhaseType,
     StateVars,
     AmountBasis
 )
 from .helmholtz_extended import HelmholtzExtendedParameterBlock
-from .parameters import register_compounds
+from .parameters import compound_components, register_compounds
 
 # Add the "parameters" directory to the path so that the Helmholtz EOS can find the parameter files.
 register_compounds()
@@ -20,7 +19,12 @@ def build_helmholtz_package(compound_list: List[str]):
         raise ValueError("Helmholtz EOS only supports single component systems")
     else:
         component = compound_list[0]
-        if component in registered_components():
+        # Registers again only if something else has changed the IDAES registry
+        components = register_compounds()
+        if component not in components:
+            # Compound registry name, e.g. carbon dioxide for co2
+            component = compound_components(components).get(component, component)
+        if component in components:
             # Build and return a helmholtz property package for this compound
             return HelmholtzExtendedParameterBlock(pure_component=component,
                                             phase_presentation=PhaseType.LG,
@@ -1,34 +1,72 @@
 from pyomo.environ import (
     Expression,
-    SolverFactory,
     check_optimal_termination,
     units,
     Block,
-    Constraint
+    Constraint,
+    value,
 )
 from idaes.models.properties.general_helmholtz.helmholtz_state import HelmholtzStateBlockData, _StateBlock
 from idaes.models.properties.general_helmholtz.helmholtz_functions import HelmholtzParameterBlockData
 from idaes.core import declare_process_block_class
-from idaes.core.util.initialization import solve_indexed_blocks, revert_state_vars
+from idaes.core.util.initialization import revert_state_vars
 from idaes.core.util.model_statistics import degrees_of_freedom
 from idaes.core.util.exceptions import InitializationError
 import idaes.logger as idaeslog
 
+from ahuora_property_packages.base.instrumentation import StageRecorder
+from ahuora_property_packages.base.parallel import initialize_parallel
 from ahuora_property_packages.base.state_block_constraints import StateBlockConstraints
+from ahuora_property_packages.base.solvers import get_initialization_solver
+from ahuora_property_packages.base.warm_start import WarmStart, get_warm_start_store
 from ahuora_property_packages.utils.fix_state_vars import fix_state_vars
+from .saturation import get_saturation_curve
 
 
 class _ExtendedStateBlock(_StateBlock):
 
     def initialize(blk, *args, **kwargs):
+        """
+        Initialization routine for the Helmholtz state block, see
+        set_vapor_frac_guesses for the initial guesses.
+
+        Keyword Arguments:
+            state_args: initial guesses of the state variables (default=None)
+            hold_state: whether to return with the state variables fixed (default=False)
+            outlvl: sets output level of initialization routine
+            solver: solver name or solver object (default=None, use the IDAES
+                default solver), see base.solvers.get_initialization_solver
+            optarg: solver options dictionary object (default=None)
+            warm_start: WarmStartStore to start from stored solutions (default=None,
+                see base.warm_start)
+            parallel: True or a number of processes, to initialize chunks of the
+                indices in parallel (default=None, see base.parallel)
+            chunk_size: indices per chunk when initializing in parallel (default=None)
+        """
+        if kwargs.get("parallel"):
+            # The workers inherit the guesses and the vapor fraction constraint
+            set_vapor_frac_guesses(blk)
+            return initialize_parallel(blk, kwargs.pop("parallel"), **kwargs)
+
         outlvl = kwargs.get("outlvl", idaeslog.NOTSET)
         init_log = idaeslog.getInitLogger(blk.name, outlvl, tag="properties")
         solve_log = idaeslog.getSolveLogger(blk.name, outlvl, tag="properties")
 
+        # Stage timings, and events for any hooks, see base.instrumentation
+        recorder = StageRecorder(blk, "helmholtz")
+
+        store = get_warm_start_store(kwargs.get("warm_start", None))
+        warm_start = WarmStart(blk, store) if store is not None else None
+
         set_vapor_frac_guesses(blk)
 
         flag_dict = fix_state_vars(blk, kwargs.get("state_args", None))
 
+        # Stored solutions replace the saturation curve guesses
+        if warm_start is not None:
+            hits = warm_start.restore()
+            init_log.info(f"Warm started {hits} of {len(blk)} state blocks.")
+
         dof = degrees_of_freedom(blk)
         if dof != 0:
             raise InitializationError(
@@ -36,24 +74,36 @@ class _ExtendedStateBlock(_StateBlock):
                 f"initialization at property initialization step: {dof}."
             )
         
+        recorder.end_stage("guesses")
+
         res = None
-        opt = SolverFactory('ipopt')
+        opt = get_initialization_solver(kwargs.get("solver", None), kwargs.get("optarg", None))
         with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-            try:
-                res = solve_indexed_blocks(opt, [blk], tee=slc.tee)
-            except ValueError as e:
-                if str(e).startswith("No variables appear"):
-                    # https://github.com/Pyomo/pyomo/pull/3445
-                    pass
-                else:
-                    raise e
-        
+            # If every state block has a stored solution, solve from those first,
+            # and from the saturation curve guesses if that fails
+            if warm_start is not None:
+                res = warm_start.solve(blk, opt, tee=slc.tee, solve=recorder.solve)
+            if res is None:
+                try:
+                    res = recorder.solve(opt, tee=slc.tee)
+                except ValueError as e:
+                    if str(e).startswith("No variables appear"):
+                        # https://github.com/Pyomo/pyomo/pull/3445
+                        pass
+                    else:
+                        raise e
+        recorder.end_stage("properties")
+        recorder.finish()
+
         if res is not None and not check_optimal_termination(res):
             raise InitializationError(
                 f"{blk.name} failed to initialize successfully. Please check "
                 f"the output logs for more information."
             )
 
+        if warm_start is not None:
+            warm_start.save()
+
         if kwargs.get("hold_state") is True:
             return flag_dict
         else:
@@ -68,17 +118,22 @@ class _ExtendedStateBlock(_StateBlock):
 
 
 
-def set_vapor_frac_guesses(blk: Block) -> None:
+def set_vapor_frac_guesses(blk: Block, saturation_guesses: bool = True) -> None:
     """
     Vapor fraction specified
     valid combinations: {p, x}, {T, x}
 
-    We find a guess for h and p based on the specified vapor fraction and either p or T.
+    We find a guess for h and p based on the specified vapor fraction and either p or T,
+    from the saturation curve of the component (see saturation.py).
 
     This is because the initial guess has to be within the vapor fraction region
     otherwise the solver has a hard time converging.
+
+    Args:
+        saturation_guesses (bool): Set h and p from the saturation curve. If False,
+            only the vapor fraction constraint is replaced.
     """
-    blk[blk.index_set().first()].config.parameters
+    params = blk[blk.index_set().first()].config.parameters
     
     for sb in blk.values():
         if not hasattr(sb.constraints, "vapor_frac"):
@@ -104,6 +159,31 @@ def set_vapor_frac_guesses(blk: Block) -> None:
             Constraint(expr=sb.enth_mol == sb.enth_mol_sat_phase["Liq"] + x * (sb.enth_mol_sat_phase["Vap"] - sb.enth_mol_sat_phase["Liq"]))
         )
 
+        if saturation_guesses:
+            _set_saturation_guesses(sb, get_saturation_curve(params.pure_component), x)
+
+
+def _set_saturation_guesses(sb, curve, x: float) -> None:
+    if hasattr(sb.constraints, "temperature"):
+        # {T, x}: the constraint is on the smoothed temperature, T_sat + h * 1e-6 K/(J/mol)
+        temperature = value(sb.constraints.temperature.upper)
+        enth_mol = 0.0
+        for _ in range(3):
+            pressure = curve.pressure(temperature - enth_mol * 1e-6)
+            sat = curve(pressure)
+            enth_mol = sat["enth_liq"] + x * (sat["enth_vap"] - sat["enth_liq"])
+        if not sb.pressure.fixed:
+            sb.pressure.set_value(float(pressure))
+    elif sb.pressure.value is not None:
+        # {p, x}
+        sat = curve(value(sb.pressure))
+        enth_mol = sat["enth_liq"] + x * (sat["enth_vap"] - sat["enth_liq"])
+    else:
+        return
+    if not sb.enth_mol.fixed:
+        sb.enth_mol.set_value(float(enth_mol))
+
+
 @declare_process_block_class("HelmholtzExtendedStateBlock", block_class=_ExtendedStateBlock)
 class HelmholtzExtendedStateBlockData(HelmholtzStateBlockData, StateBlockConstraints):
 
@@ -1,13 +1,137 @@
-from pyomo.common.fileutils import this_file_dir
-import idaes
-from idaes.models.properties.general_helmholtz.components.parameters import auto_register
-from idaes.models.properties.general_helmholtz import helmholtz_functions 
-from idaes.models.properties.general_helmholtz import helmholtz_state
+import hashlib
 import os
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, NamedTuple
 
-def register_compounds():
-    idaes.cfg.properties.helmholtz.parameter_file_path = os.path.join(this_file_dir(), "")
-    helmholtz_functions._data_dir = idaes.cfg.properties.helmholtz.parameter_file_path
-    helmholtz_functions.helmholtz_data_dir = idaes.cfg.properties.helmholtz.parameter_file_path
-    helmholtz_state._data_dir = idaes.cfg.properties.helmholtz.parameter_file_path 
-    auto_register()
\ No newline at end of file
+"""
+Helmholtz parameter files shipped in this directory, and their registration with IDAES.
+
+The files are scanned once per process, so validating a component or binding it in
+the compound registry is a dictionary lookup. This module only imports IDAES when
+registering, so load_compounds can bind the components in the compound registry
+without importing IDAES.
+"""
+
+PARAMETER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "")
+
+# Expression files a component can have: equation of state, surface tension,
+# thermal conductivity and viscosity
+PROPERTY_SETS = ("eos", "st", "tcx", "visc")
+
+_FILE_PATTERN = re.compile(r"(.+?)(?:_expressions_(" + "|".join(PROPERTY_SETS) + r")\.nl|_parameters\.json|\.json)")
+
+
+# Compound registry (ChemSep) names of the components whose names differ
+CHEMSEP_NAMES = {
+    "co2": "carbon dioxide",
+    "h2o": "water",
+    "i-butane": "isobutane",
+    "npentane": "n-pentane",
+}
+
+
+class HelmholtzParameters(NamedTuple):
+    properties: FrozenSet[str]  # subset of PROPERTY_SETS
+    files: Dict[str, str]  # file name: sha256 of its contents
+
+
+# Discovered components by parameter path
+_parameters: Dict[str, Dict[str, HelmholtzParameters]] = {}
+# Parameter path and components last registered with IDAES
+_registered = None
+_lock = threading.Lock()
+
+
+def discover_parameters(path: str = PARAMETER_PATH, refresh: bool = False) -> Dict[str, HelmholtzParameters]:
+    """
+    Returns the components in path that have an equation of state, by name, as
+    IDAES auto_register would find them. Only the first call for a path reads the files.
+
+    Args:
+        path (str): Directory of parameter files.
+        refresh (bool): Scan the directory again, e.g. after adding parameter files.
+    """
+    if refresh or path not in _parameters:
+        with _lock:
+            if refresh or path not in _parameters:
+                _parameters[path] = _scan(path)
+    return _parameters[path]
+
+
+def register_compounds(path: str = PARAMETER_PATH, refresh: bool = False) -> Dict[str, HelmholtzParameters]:
+    """
+    Points the IDAES Helmholtz data directory at path and registers its components
+    with IDAES auto_register. Does nothing if they are already registered, unless
+    something else has changed the IDAES component registry since.
+
+    Returns:
+        Dict[str, HelmholtzParameters]: The registered components, see discover_parameters.
+    """
+    global _registered
+    import idaes
+    from idaes.models.properties.general_helmholtz import helmholtz_functions
+    from idaes.models.properties.general_helmholtz import helmholtz_state
+    from idaes.models.properties.general_helmholtz.components import registered_components
+    from idaes.models.properties.general_helmholtz.components.parameters import auto_register
+
+    components = discover_parameters(path, refresh)
+    with _lock:
+        if (_registered is not None and _registered[0] == path and _registered[1] is components
+                and idaes.cfg.properties.helmholtz.parameter_file_path == path
+                and set(registered_components()) == set(components)):
+            return components
+
+        idaes.cfg.properties.helmholtz.parameter_file_path = path
+        helmholtz_functions._data_dir = path
+        helmholtz_functions.helmholtz_data_dir = path
+        helmholtz_state._data_dir = path
+        auto_register()
+        _registered = (path, components)
+    return components
+
+
+def load_compounds(registry):
+    """
+    Compound registry loader that binds the Helmholtz components to the compounds
+    they model, e.g. CompoundRegistry(loaders=[load_compounds]). The IDAES component
+    name is kept in each compound's helmholtz data.
+    """
+    components = discover_parameters()
+    for name, component in compound_components(components).items():
+        registry.register_compound(
+            name, "helmholtz", {"component": component, "properties": sorted(components[component].properties)}
+        )
+        registry.bind(name, "helmholtz")
+
+
+def compound_components(components: Iterable[str]) -> Dict[str, str]:
+    """
+    Maps compound registry names to the components that model them. Where several
+    components model a compound, e.g. h2o and water, the one of the same name is used.
+    """
+    result = {}
+    for component in sorted(components):
+        compound = CHEMSEP_NAMES.get(component, component)
+        if compound not in result or component == compound:
+            result[compound] = component
+    return result
+
+
+def _scan(path: str) -> Dict[str, HelmholtzParameters]:
+    properties: Dict[str, set] = {}
+    files: Dict[str, Dict[str, str]] = {}
+    for name in sorted(os.listdir(path)):
+        match = _FILE_PATTERN.fullmatch(name)
+        if match is None:
+            continue
+        component, property_set = match.groups()
+        if property_set is not None:
+            properties.setdefault(component, set()).add(property_set)
+        with open(os.path.join(path, name), "rb") as f:
+            files.setdefault(component, {})[name] = hashlib.sha256(f.read()).hexdigest()
+    return {
+        component: HelmholtzParameters(frozenset(properties[component]), files[component])
+        for component in sorted(properties)
+        if "eos" in properties[component]
+    }
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from ..utils.cache import CACHE_PATH
+from .parameters import PARAMETER_PATH, discover_parameters
+
+"""
+Saturation curves of the Helmholtz components, for initial guesses.
+
+Each curve is a Chebyshev interpolant of the saturation temperature and the
+saturated liquid and vapour enthalpies in ln P, from the triple point to just below
+the critical point. A curve is computed from the equation of state the first time
+a component needs it, and saved with the hashes of the parameter files it was
+computed from, so later processes only compute it again if the parameters change.
+Curves are saved in the user's cache directory, with the property tables.
+"""
+
+SATURATION_CACHE_PATH = os.path.join(CACHE_PATH, "saturation")
+CURVE_PROPERTIES = ("temperature", "enth_liq", "enth_vap")
+DEFAULT_DEGREE = 48
+FORMAT_VERSION = 1
+
+# Curves by component
+_curves: Dict[str, "SaturationCurve"] = {}
+_lock = threading.Lock()
+
+_log = logging.getLogger(__name__)
+
+
+class SaturationCurve:
+
+    def __init__(self, metadata: dict, coefficients: np.ndarray):
+        """
+        Args:
+            metadata (dict): compound, pressure_range (Pa) and parameter_files, the
+                parameter file hashes the curve was computed from.
+            coefficients (np.ndarray): Chebyshev coefficients of each of CURVE_PROPERTIES.
+        """
+        self.metadata = metadata
+        self.coefficients = np.asarray(coefficients, dtype=float)
+
+    @property
+    def pressure_range(self) -> Tuple[float, float]:
+        return tuple(self.metadata["pressure_range"])
+
+    @classmethod
+    def fit(cls, metadata: dict, function: Callable, degree: int = DEFAULT_DEGREE) -> "SaturationCurve":
+        """
+        Interpolates function(P), which returns each of CURVE_PROPERTIES for an array of
+        pressures in Pa, at Chebyshev points in ln P over metadata["pressure_range"].
+        """
+        log_p_min, log_p_max = np.log(metadata["pressure_range"])
+        u = np.cos(np.pi * (np.arange(degree) + 0.5) / degree)
+        values = function(np.exp(log_p_min + (u + 1) * (log_p_max - log_p_min) / 2))
+        vander = chebyshev.chebvander(u, degree - 1)
+        return cls(metadata, [np.linalg.solve(vander, values[name]) for name in CURVE_PROPERTIES])
+
+    def __call__(self, pressure) -> Dict[str, np.ndarray]:
+        """
+        Returns the saturation temperature (K) and saturated liquid and vapour enthalpies
+        (J/mol) at pressures in Pa, clipped to the pressure range.
+        """
+        u = self._coordinate(np.clip(np.asarray(pressure, dtype=float), *self.pressure_range))
+        return {name: chebyshev.chebval(u, c) for name, c in zip(CURVE_PROPERTIES, self.coefficients)}
+
+    def pressure(self, temperature, iterations: int = 60) -> np.ndarray:
+        """
+        Returns the saturation pressure (Pa) at temperatures in K, by bisection. Temperatures
+        outside the curve give the pressure at the nearest end.
+        """
+        temperature = np.asarray(temperature, dtype=float)
+        low = np.full(temperature.shape, -1.0)
+        high = np.full(temperature.shape, 1.0)
+        for _ in range(iterations):
+            mid = (low + high) / 2
+            below = chebyshev.chebval(mid, self.coefficients[0]) < temperature
+            low = np.where(below, mid, low)
+            high = np.where(below, high, mid)
+        log_p_min, log_p_max = np.log(self.pressure_range)
+        return np.exp(log_p_min + ((low + high) / 2 + 1) * (log_p_max - log_p_min) / 2)
+
+    def _coordinate(self, pressure):
+        log_p_min, log_p_max = np.log(self.pressure_range)
+        return 2 * (np.log(pressure) - log_p_min) / (log_p_max - log_p_min) - 1
+
+    def save(self, path: str):
+        np.savez(path, metadata=np.array(json.dumps(dict(self.metadata, format_version=FORMAT_VERSION))),
+                 coefficients=self.coefficients)
+
+    @classmethod
+    def load(cls, path: str) -> "SaturationCurve":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(json.loads(str(data["metadata"])), data["coefficients"])
+
+
+def get_saturation_curve(compound: str, path: str = SATURATION_CACHE_PATH) -> SaturationCurve:
+    """
+    Returns the saturation curve of a Helmholtz component, computing it if it is not
+    cached in memory or in path, or if the parameter files have changed since.
+    """
+    curve = _curves.get(compound)
+    if curve is not None:
+        return curve
+    with _lock:
+        if compound in _curves:
+            return _curves[compound]
+        files = discover_parameters()[compound].files
+        file = os.path.join(path, f"{compound}.npz")
+        curve = None
+        if os.path.exists(file):
+            curve = SaturationCurve.load(file)
+            if (curve.metadata.get("format_version") != FORMAT_VERSION
+                    or curve.metadata.get("parameter_files") != files):
+                curve = None
+        if curve is None:
+            curve = compute_saturation_curve(compound)
+            try:
+                os.makedirs(path, exist_ok=True)
+                curve.save(file)
+            except OSError as error:
+                # The curve is still kept for this process
+                _log.warning(f"Could not save the saturation curve of {compound} to {file}: {error}")
+        _curves[compound] = curve
+        return curve
+
+
+def compute_saturation_curve(compound: str, degree: int = DEFAULT_DEGREE) -> SaturationCurve:
+    """Computes the saturation curve of a Helmholtz component from its equation of state."""
+    from pyomo.environ import ConcreteModel, Param, units, value
+    from idaes.models.properties.general_helmholtz import (
+        AmountBasis,
+        HelmholtzParameterBlock,
+        HelmholtzThermoExpressions,
+    )
+    from .parameters import register_compounds
+
+    register_compounds(PARAMETER_PATH)
+    m = ConcreteModel()
+    m.params = HelmholtzParameterBlock(pure_component=compound, amount_basis=AmountBasis.MOLE)
+    m.pressure = Param(initialize=101325, mutable=True, units=units.Pa)
+    te = HelmholtzThermoExpressions(m, m.params)
+    expressions = {
+        "temperature": te.T_sat(m.pressure),
+        "enth_liq": te.h_liq_sat(p=m.pressure),
+        "enth_vap": te.h_vap_sat(p=m.pressure),
+    }
+
+    def function(pressure):
+        values = {name: np.empty(len(pressure)) for name in CURVE_PROPERTIES}
+        for i, p in enumerate(pressure):
+            m.pressure.set_value(p)
+            for name, expression in expressions.items():
+                values[name][i] = value(expression)
+        return values
+
+    # The enthalpies have infinite slope at the critical point, so the curve stops short of it
+    metadata = {
+        "compound": compound,
+        "pressure_range": [value(m.params.pressure_trip), 0.999 * value(m.params.pressure_crit)],
+        "parameter_files": discover_parameters()[compound].files,
+    }
+    return SaturationCurve.fit(metadata, function, degree)
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import pytest
+from idaes.models.properties.general_helmholtz import helmholtz_available
+from idaes.models.properties.general_helmholtz.components import (
+    clear_component_registry,
+    eos_reference,
+    registered_components,
+    surface_tension_reference,
+    viscosity_available,
+    viscosity_reference,
+)
+from idaes.models.properties.general_helmholtz.components.parameters import auto_register
+from ahuora_property_packages.helmholtz.parameters import (
+    PARAMETER_PATH,
+    compound_components,
+    discover_parameters,
+    load_compounds,
+    register_compounds,
+)
+from ahuora_property_packages.helmholtz.helmholtz_builder import build_helmholtz_package
+from ahuora_compounds.CompoundDB import _registry
+from ahuora_compounds.CompoundRegistry import CompoundRegistry
+from ahuora_compounds.RegistrySearch import RegistrySearch
+
+
+def test_discover_parameters():
+    components = discover_parameters()
+    assert components["water"].properties == {"eos", "st", "tcx", "visc"}
+    assert components["ammonia"].properties == {"eos", "st"}
+    # Generator scripts are not parameter files
+    assert "water.py" not in components["water"].files
+    with open(os.path.join(PARAMETER_PATH, "water_expressions_eos.nl"), "rb") as f:
+        assert components["water"].files["water_expressions_eos.nl"] == hashlib.sha256(f.read()).hexdigest()
+    assert discover_parameters() is components
+
+
+def test_register_compounds_is_idempotent():
+    components = register_compounds()
+    assert set(registered_components()) == set(components)
+    assert viscosity_available("water") and not viscosity_available("ammonia")
+    # Registered by IDAES auto_register, with the same references
+    references = lambda: {
+        c: (eos_reference(c), viscosity_reference(c), surface_tension_reference(c)) for c in components
+    }
+    registered = references()
+    auto_register()
+    assert references() == registered
+    assert register_compounds() is components
+
+    # Registers again if something else clears the IDAES registry
+    clear_component_registry()
+    register_compounds()
+    assert set(registered_components()) == set(components)
+
+
+def test_unknown_compound():
+    with pytest.raises(ValueError):
+        build_helmholtz_package(["not a compound"])
+
+
+@pytest.mark.skipif(not helmholtz_available(), reason="Helmholtz EoS external functions not available")
+def test_build_by_compound_name():
+    assert build_helmholtz_package(["carbon dioxide"]).config.pure_component == "co2"
+    assert build_helmholtz_package(["co2"]).config.pure_component == "co2"
+
+
+def test_compound_bindings():
+    registry = CompoundRegistry(loaders=[load_compounds])
+    db = RegistrySearch(registry)
+    assert "helmholtz" in db.get_supported_packages(["water"], strict=True)
+    supported = db.get_supported_compounds(["helmholtz"], strict=True)
+    assert supported == set(compound_components(discover_parameters()))
+    # Bound to the ChemSep compounds, rather than registered again under their IDAES names
+    assert {"carbon dioxide", "isobutane", "n-pentane"} <= supported
+    assert not {"h2o", "co2", "npentane", "i-butane"} & set(db.get_compound_names())
+    assert all("peng-robinson" in db.get_supported_packages([name]) for name in supported)
+    assert db.get_compound("carbon dioxide").get_source("helmholtz")["component"] == "co2"
+    assert compound_components(["h2o", "water"]) == {"water": "water"}
+    # Only bound when the loader is given
+    assert "helmholtz" not in RegistrySearch(_registry).get_supported_packages(["water"])
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pytest
+from ahuora_property_packages.helmholtz import saturation
+from ahuora_property_packages.helmholtz.parameters import discover_parameters
+from ahuora_property_packages.helmholtz.saturation import SaturationCurve, get_saturation_curve
+
+R = 8.314462618
+
+
+def clausius_clapeyron(pressure):
+    # Saturation of a compound with constant heat of vaporisation, boiling at 373.15 K at 1 atm
+    temperature = 1 / (1 / 373.15 - R / 40000 * np.log(pressure / 101325))
+    enth_liq = 75 * (temperature - 273.15)
+    return {"temperature": temperature, "enth_liq": enth_liq, "enth_vap": enth_liq + 40000}
+
+
+def fit(compound="water"):
+    metadata = {
+        "compound": compound,
+        "pressure_range": [1e3, 1e7],
+        "parameter_files": discover_parameters()[compound].files,
+    }
+    return SaturationCurve.fit(metadata, clausius_clapeyron, degree=24)
+
+
+def test_fit():
+    curve = fit()
+    pressure = np.geomspace(1.5e3, 9e6, 50)
+    values = curve(pressure)
+    expected = clausius_clapeyron(pressure)
+    for name in saturation.CURVE_PROPERTIES:
+        assert np.allclose(values[name], expected[name], rtol=1e-9)
+    assert np.allclose(curve.pressure(expected["temperature"]), pressure, rtol=1e-9)
+    # Clipped to the ends of the curve
+    assert curve(1e8)["temperature"] == pytest.approx(clausius_clapeyron(1e7)["temperature"])
+    assert curve.pressure(200) == pytest.approx(1e3)
+
+
+def test_cache(tmp_path, monkeypatch):
+    computed = []
+
+    def compute(compound):
+        computed.append(compound)
+        return fit(compound)
+
+    monkeypatch.setattr(saturation, "compute_saturation_curve", compute)
+    monkeypatch.setattr(saturation, "_curves", {})
+    curve = get_saturation_curve("water", path=str(tmp_path))
+    assert get_saturation_curve("water", path=str(tmp_path)) is curve
+    assert computed == ["water"]
+
+    # A new process loads the saved curve
+    monkeypatch.setattr(saturation, "_curves", {})
+    loaded = get_saturation_curve("water", path=str(tmp_path))
+    assert computed == ["water"]
+    assert np.array_equal(loaded.coefficients, curve.coefficients)
+
+    # Unless the parameter files have changed
+    curve.metadata["parameter_files"] = {"water_expressions_eos.nl": "0"}
+    curve.save(str(tmp_path / "water.npz"))
+    monkeypatch.setattr(saturation, "_curves", {})
+    get_saturation_curve("water", path=str(tmp_path))
+    assert computed == ["water", "water"]
+
+
+def test_unwritable_cache_warns(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(saturation, "compute_saturation_curve", fit)
+    monkeypatch.setattr(saturation, "_curves", {})
+    # A file where the cache directory should be
+    path = tmp_path / "cache"
+    path.write_text("")
+    curve = get_saturation_curve("water", path=str(path))
+    assert get_saturation_curve("water", path=str(path)) is curve
+    assert "Could not save the saturation curve of water" in caplog.text
+
+
+def test_cache_outside_package():
+    assert not saturation.SATURATION_CACHE_PATH.startswith(os.path.dirname(saturation.__file__))
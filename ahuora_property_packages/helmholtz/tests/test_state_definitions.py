@@ -105,4 +105,30 @@ def test_butane():
     state.constrain("temperature",260)
     solve(m)
     assert value(state.vapor_frac) == approx(0)
-    
\ No newline at end of file
+    
+
+def test_state_definition_temperature_vapor_frac():
+    m = flowsheet()
+    sb = build_state(m)
+    sb.constrain("temperature", 373.15)
+    sb.constrain("vapor_frac", 0.5)
+    sb.constrain("flow_mass", 1)
+    initialize(m)
+    # The saturation curve guess is converged before solving
+    assert value(sb.pressure) == approx(101325, rel=1e-3)
+    solve(m)
+    assert value(sb.pressure) == approx(101325, rel=1e-3)
+    assert value(sb.vapor_frac) == approx(0.5)
+
+
+def test_initialize_with_solver_object():
+    m = flowsheet()
+    sb = build_state(m)
+    sb.constrain("enth_mass", 1878.87)
+    sb.constrain("pressure", 101325)
+    sb.constrain("flow_mass", 1)
+    opt = SolverFactory('ipopt')
+    m.fs.state.initialize(solver=opt, optarg={"max_iter": 100})
+    # optarg is passed to each solve, not set on the caller's solver
+    assert "max_iter" not in opt.options
+    assert value(sb.temperature) == approx(273.5809)
@@ -0,0 +1 @@
+from .tabulated_builder import build_helmholtz_tabulated_package as build_helmholtz_tabulated_package
\ No newline at end of file
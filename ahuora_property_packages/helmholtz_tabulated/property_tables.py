@@ -0,0 +1,214 @@
+import json
+import os
+from typing import Dict
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+"""
+Precomputed single component properties for the helmholtz-tabulated package,
+written by tabulate from the Helmholtz equation of state.
+
+Every property is a Chebyshev series in the pressure coordinate
+u = 2 (ln P - ln Pmin) / (ln Pmax - ln Pmin) - 1:
+
+* Saturation curves are series in u, e.g. the saturation temperature and the
+  saturated liquid and vapour enthalpies.
+* Each phase has a table over (P, h) and a table over (P, T). Their second
+  coordinate is the distance from saturation, eta, scaled to 0 at saturation and
+  1 at the edge of the table, e.g. eta = (h_vap(P) - h) / (h_vap(P) - h_min(P))
+  for liquid. A property is its saturation value plus eta times a series in u and
+  2 eta - 1, so it meets the saturation curve exactly at the phase boundary.
+
+The state blocks write the same series as Pyomo expressions, in power form, so
+values and derivatives agree with the tables to rounding. Volumes are tabulated
+as ln(v).
+"""
+
+FORMAT_VERSION = 1
+PHASES = ("liq", "vap")
+# Curves in pressure. enth_min is the liquid enthalpy at the lowest table
+# temperature and enth_max the vapour enthalpy at the highest.
+SATURATION_PROPERTIES = (
+    "temperature", "enth_liq", "enth_vap", "entr_liq", "entr_vap",
+    "log_vol_liq", "log_vol_vap", "enth_min", "enth_max",
+)
+# Single phase properties tabulated over (P, h) and over (P, T)
+PH_PROPERTIES = ("temperature", "entr", "log_vol")
+PT_PROPERTIES = ("enth", "entr", "log_vol")
+TABLES = {"ph": PH_PROPERTIES, "pt": PT_PROPERTIES}
+
+# Loaded tables by path, with the modification time they were loaded at
+_tables = {}
+
+
+class PropertyTables:
+
+    def __init__(self, metadata: dict, saturation: np.ndarray, regions: Dict[str, np.ndarray]):
+        """
+        Args:
+            metadata (dict): compound, mw (kg/mol), pressure_range (Pa), temperature_range (K),
+                and anything else to keep with the tables, e.g. fit errors.
+            saturation (np.ndarray): Coefficients of each of SATURATION_PROPERTIES, shape (9, n).
+            regions (Dict[str, np.ndarray]): Coefficients of each property of a table, by
+                "<ph|pt>_<liq|vap>", shape (3, n_pressure, n_eta).
+        """
+        self.metadata = metadata
+        self.saturation_coefficients = np.asarray(saturation, dtype=float)
+        self.region_coefficients = {name: np.asarray(c, dtype=float) for name, c in regions.items()}
+        expected = {f"{table}_{phase}" for table in TABLES for phase in PHASES}
+        if set(self.region_coefficients) != expected:
+            raise ValueError(f"Expected tables {sorted(expected)}, got {sorted(self.region_coefficients)}")
+
+    @property
+    def compound(self) -> str:
+        return self.metadata["compound"]
+
+    @property
+    def mw(self) -> float:
+        return self.metadata["mw"]
+
+    @property
+    def pressure_range(self):
+        return tuple(self.metadata["pressure_range"])
+
+    @property
+    def temperature_range(self):
+        return tuple(self.metadata["temperature_range"])
+
+    def coefficients(self, table: str, phase: str, prop: str) -> np.ndarray:
+        """Returns the (n_pressure, n_eta) coefficients of a property in a table."""
+        return self.region_coefficients[f"{table}_{phase}"][TABLES[table].index(prop)]
+
+    def pressure_coordinate(self, pressure, log=np.log):
+        """Returns u for pressures in Pa. log is np.log, or pyomo log for expressions."""
+        p_min, p_max = self.pressure_range
+        return 2 * (log(pressure) - np.log(p_min)) / (np.log(p_max) - np.log(p_min)) - 1
+
+    def saturation(self, pressure) -> Dict[str, np.ndarray]:
+        """Returns each of SATURATION_PROPERTIES at pressures in Pa."""
+        u = self.pressure_coordinate(np.asarray(pressure, dtype=float))
+        return {
+            name: chebyshev.chebval(u, coefficients)
+            for name, coefficients in zip(SATURATION_PROPERTIES, self.saturation_coefficients)
+        }
+
+    def properties_ph(self, pressure, enth_mol) -> Dict[str, np.ndarray]:
+        """
+        Returns temperature (K), vapor_frac, entr_mol (J/mol/K) and vol_mol (m^3/mol) at
+        each pressure (Pa) and molar enthalpy (J/mol). Two phase states are mixtures of
+        the saturated phases.
+        """
+        P, h = np.broadcast_arrays(np.asarray(pressure, dtype=float), np.asarray(enth_mol, dtype=float))
+        sat = self.saturation(P)
+        u = self.pressure_coordinate(P)
+        vapor_frac = np.clip((h - sat["enth_liq"]) / (sat["enth_vap"] - sat["enth_liq"]), 0, 1)
+        result = {
+            "temperature": sat["temperature"].copy(),
+            "vapor_frac": vapor_frac,
+            "entr_mol": sat["entr_liq"] + vapor_frac * (sat["entr_vap"] - sat["entr_liq"]),
+            "vol_mol": np.exp(sat["log_vol_liq"]) + vapor_frac * (np.exp(sat["log_vol_vap"]) - np.exp(sat["log_vol_liq"])),
+        }
+        for phase, single in (("liq", h < sat["enth_liq"]), ("vap", h > sat["enth_vap"])):
+            # States of the other phase are held at saturation, where they are not used
+            eta = np.maximum(enthalpy_eta(phase, h, sat), 0)
+            values = {prop: self._region("ph", phase, prop, u, eta, sat) for prop in PH_PROPERTIES}
+            result["temperature"] = np.where(single, values["temperature"], result["temperature"])
+            result["entr_mol"] = np.where(single, values["entr"], result["entr_mol"])
+            result["vol_mol"] = np.where(single, np.exp(values["log_vol"]), result["vol_mol"])
+        return result
+
+    def enth_mol_pt(self, pressure, temperature) -> np.ndarray:
+        """
+        Returns the molar enthalpy (J/mol) at each pressure (Pa) and temperature (K),
+        of liquid below the saturation temperature and of vapour above it.
+        """
+        P, T = np.broadcast_arrays(np.asarray(pressure, dtype=float), np.asarray(temperature, dtype=float))
+        sat = self.saturation(P)
+        u = self.pressure_coordinate(P)
+        liquid = T < sat["temperature"]
+        eta = {phase: np.maximum(temperature_eta(phase, T, sat, self.temperature_range), 0) for phase in PHASES}
+        return np.where(
+            liquid,
+            self._region("pt", "liq", "enth", u, eta["liq"], sat),
+            self._region("pt", "vap", "enth", u, eta["vap"], sat),
+        )
+
+    def _region(self, table, phase, prop, u, eta, sat):
+        return sat[saturation_name(prop, phase)] + eta * chebyshev.chebval2d(
+            u, 2 * eta - 1, self.coefficients(table, phase, prop)
+        )
+
+    def save(self, path: str):
+        """Writes the tables to a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            metadata=np.array(json.dumps(dict(self.metadata, format_version=FORMAT_VERSION))),
+            saturation=self.saturation_coefficients,
+            **self.region_coefficients,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PropertyTables":
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data["metadata"]))
+            if metadata.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"{path} has table format {metadata.get('format_version')}, "
+                                 f"expected {FORMAT_VERSION}. Tabulate the compound again.")
+            regions = {name: data[name] for name in data.files if name not in ("metadata", "saturation")}
+            return cls(metadata, data["saturation"], regions)
+
+
+def get_tables(path: str) -> PropertyTables:
+    """
+    Returns the PropertyTables stored at path. The file is only read again if it has
+    been modified, so every parameter block shares the same tables.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _tables.get(path, None)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, PropertyTables.load(path))
+        _tables[path] = cached
+    return cached[1]
+
+
+def saturation_name(prop: str, phase: str) -> str:
+    """Returns the saturation curve a single phase property starts from."""
+    return "temperature" if prop == "temperature" else f"{prop}_{phase}"
+
+
+def enthalpy_eta(phase: str, enth_mol, sat):
+    """Distance of a state from saturation in a (P, h) table, 0 at saturation."""
+    if phase == "liq":
+        return (sat["enth_liq"] - enth_mol) / (sat["enth_liq"] - sat["enth_min"])
+    return (enth_mol - sat["enth_vap"]) / (sat["enth_max"] - sat["enth_vap"])
+
+
+def temperature_eta(phase: str, temperature, sat, temperature_range):
+    """Distance of a state from saturation in a (P, T) table, 0 at saturation."""
+    t_min, t_max = temperature_range
+    if phase == "liq":
+        return (sat["temperature"] - temperature) / (sat["temperature"] - t_min)
+    return (temperature - sat["temperature"]) / (t_max - sat["temperature"])
+
+
+def chebyshev_nodes(n: int) -> np.ndarray:
+    """Chebyshev points of the first kind on [-1, 1], which exclude the end points."""
+    return np.cos(np.pi * (np.arange(n) + 0.5) / n)[::-1]
+
+
+
+def power_coefficients(coefficients: np.ndarray) -> np.ndarray:
+    """
+    Converts the coefficients of a Chebyshev series in one or two coordinates to
+    those of the same polynomial in powers of the coordinates.
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    for axis in range(coefficients.ndim):
+        n = coefficients.shape[axis]
+        # Column k holds the power coefficients of T_k
+        conversion = np.zeros((n, n))
+        for k in range(n):
+            conversion[:k + 1, k] = chebyshev.cheb2poly(np.eye(n)[k])
+        coefficients = np.moveaxis(np.tensordot(conversion, coefficients, axes=(1, axis)), 0, axis)
+    return coefficients
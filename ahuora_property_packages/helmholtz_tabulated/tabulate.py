@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from ..utils.cache import CACHE_PATH
+from .property_tables import (
+    PHASES,
+    SATURATION_PROPERTIES,
+    TABLES,
+    PropertyTables,
+    chebyshev_nodes,
+    saturation_name,
+)
+
+"""
+Writes property tables for the helmholtz-tabulated package from the Helmholtz
+equation of state, which needs the IDAES Helmholtz external functions:
+
+    python -m ahuora_property_packages.helmholtz_tabulated.tabulate water
+
+Water can also be tabulated from the IAPWS-95 formulation of the iapws package,
+which the Helmholtz water parameters implement, without the external functions:
+
+    python -m ahuora_property_packages.helmholtz_tabulated.tabulate water --source iapws
+
+Properties are sampled at Chebyshev points and interpolated, and the largest
+difference from the equation of state between the sample points is stored with
+the tables as max_errors.
+
+Tables are written to the user's cache directory, as the installed package may
+be read only. Tables shipped with the package are used for compounds that have
+none there.
+"""
+
+# Tables shipped with the package
+TABLE_PATH = os.path.join(os.path.dirname(__file__), "tables")
+TABLE_CACHE_PATH = os.path.join(CACHE_PATH, "tables")
+DEFAULT_DEGREE = 16
+DEFAULT_SATURATION_DEGREE = 32
+
+
+class HelmholtzSource:
+    """
+    Evaluates a compound with HelmholtzExtendedParameterBlock, one point at a time.
+
+    A source for tabulate has compound, mw (kg/mol), default_pressure_range and
+    default_temperature_range attributes, and saturation, ph and pt methods that
+    take and return arrays in SI units on a molar basis.
+    """
+
+    def __init__(self, compound: str):
+        from pyomo.environ import ConcreteModel, Param, units, value
+        from idaes.core import FlowsheetBlock
+        from idaes.models.properties.general_helmholtz import HelmholtzThermoExpressions
+        from ahuora_property_packages.helmholtz.helmholtz_builder import build_helmholtz_package
+
+        self._value = value
+        m = ConcreteModel()
+        m.fs = FlowsheetBlock(dynamic=False)
+        m.fs.properties = build_helmholtz_package([compound])
+        m.pressure = Param(initialize=101325, mutable=True, units=units.Pa)
+        m.enth_mol = Param(initialize=0, mutable=True, units=units.J / units.mol)
+        m.temperature = Param(initialize=300, mutable=True, units=units.K)
+        te = HelmholtzThermoExpressions(m, m.fs.properties)
+        p, h, T = m.pressure, m.enth_mol, m.temperature
+        self._model = m
+        self._expressions = {
+            "saturation": {
+                "temperature": te.T_sat(p),
+                "enth_liq": te.h_liq_sat(p=p),
+                "enth_vap": te.h_vap_sat(p=p),
+                "entr_liq": te.s_liq_sat(p=p),
+                "entr_vap": te.s_vap_sat(p=p),
+                "vol_liq": te.v_liq_sat(p=p),
+                "vol_vap": te.v_vap_sat(p=p),
+            },
+            "ph": {"temperature": te.T(h=h, p=p), "entr": te.s(h=h, p=p), "vol": te.v(h=h, p=p)},
+        }
+        for phase, x in (("liq", 0), ("vap", 1)):
+            self._expressions[f"pt_{phase}"] = {
+                "enth": te.h(T=T, p=p, x=x), "entr": te.s(T=T, p=p, x=x), "vol": te.v(T=T, p=p, x=x),
+            }
+
+        params = m.fs.properties
+        self.compound = compound
+        self.mw = value(params.mw)
+        self.pressure_crit = value(params.pressure_crit)
+        # Subcritical, from just above the triple point
+        self.default_pressure_range = (max(1.05 * value(params.pressure_trip), value(params.pressure_min)),
+                                       0.95 * self.pressure_crit)
+        self.default_temperature_range = (value(params.temperature_trip),
+                                          min(value(params.temperature_max), 2 * value(params.temperature_crit)))
+
+    def saturation(self, pressure: np.ndarray) -> Dict[str, np.ndarray]:
+        return self._evaluate("saturation", pressure=pressure)
+
+    def ph(self, pressure: np.ndarray, enth_mol: np.ndarray, phase: str) -> Dict[str, np.ndarray]:
+        # The phase follows from the state
+        return self._evaluate("ph", pressure=pressure, enth_mol=enth_mol)
+
+    def pt(self, pressure: np.ndarray, temperature: np.ndarray, phase: str) -> Dict[str, np.ndarray]:
+        return self._evaluate(f"pt_{phase}", pressure=pressure, temperature=temperature)
+
+    def _evaluate(self, name, **inputs):
+        expressions = self._expressions[name]
+        inputs = dict(zip(inputs, np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in inputs.values()))))
+        shape = next(iter(inputs.values())).shape
+        results = {prop: np.empty(shape) for prop in expressions}
+        for index in np.ndindex(shape):
+            for param, values in inputs.items():
+                getattr(self._model, param).set_value(values[index])
+            for prop, expression in expressions.items():
+                results[prop][index] = self._value(expression)
+        return results
+
+
+class IapwsSource:
+    """
+    Evaluates water with the IAPWS-95 formulation of the iapws package, one point at
+    a time. Its ranges are those HelmholtzSource takes from the water parameters.
+    """
+
+    def __init__(self, compound: str = "water"):
+        from iapws import IAPWS95
+        from ahuora_property_packages.helmholtz.parameters import PARAMETER_PATH
+
+        if compound != "water":
+            raise ValueError(f"The iapws source only has water, not {compound}")
+        self._state = IAPWS95
+        with open(os.path.join(PARAMETER_PATH, "water_parameters.json")) as f:
+            params = json.load(f)["param"]
+        self.compound = compound
+        self.mw = params["MW"] / 1000
+        # Parameter files are in kPa
+        self.pressure_crit = params["Pc"] * 1000
+        self.default_pressure_range = (max(1.05 * params["Pt"], params["P_min"]) * 1000, 0.95 * self.pressure_crit)
+        self.default_temperature_range = (params["Tt"], min(params["T_max"], 2 * params["Tc"]))
+
+    def saturation(self, pressure: np.ndarray) -> Dict[str, np.ndarray]:
+        results = {}
+        for phase, x in (("liq", 0), ("vap", 1)):
+            values = self._evaluate(lambda P: self._state(P=P / 1e6, x=x), pressure)
+            results["temperature"] = values["temperature"]
+            for prop in ("enth", "entr", "vol"):
+                results[f"{prop}_{phase}"] = values[prop]
+        return results
+
+    def ph(self, pressure: np.ndarray, enth_mol: np.ndarray, phase: str) -> Dict[str, np.ndarray]:
+        from scipy.optimize import brentq
+
+        # The temperature of the phase with that enthalpy, as iapws's own (P, h) flash
+        # does not always converge
+        t_min, t_max = self.default_temperature_range
+
+        def state(P, h):
+            T_sat = self._state(P=P / 1e6, x=0).T
+            low, high = (t_min, T_sat * (1 - 1e-12)) if phase == "liq" else (T_sat * (1 + 1e-12), t_max)
+            T = brentq(lambda T: self._state(P=P / 1e6, T=T).h * 1000 * self.mw - h, low, high, xtol=1e-10, rtol=1e-14)
+            return self._state(P=P / 1e6, T=T)
+
+        values = self._evaluate(state, pressure, enth_mol)
+        return {"temperature": values["temperature"], "entr": values["entr"], "vol": values["vol"]}
+
+    def pt(self, pressure: np.ndarray, temperature: np.ndarray, phase: str) -> Dict[str, np.ndarray]:
+        values = self._evaluate(lambda P, T: self._state(P=P / 1e6, T=T), pressure, temperature)
+        return {"enth": values["enth"], "entr": values["entr"], "vol": values["vol"]}
+
+    def _evaluate(self, state, *inputs):
+        # iapws works in MPa, kJ/kg and m^3/kg
+        inputs = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in inputs))
+        results = {prop: np.empty(inputs[0].shape) for prop in ("temperature", "enth", "entr", "vol")}
+        for index in np.ndindex(inputs[0].shape):
+            st = state(*(v[index] for v in inputs))
+            results["temperature"][index] = st.T
+            results["enth"][index] = st.h * 1000 * self.mw
+            results["entr"][index] = st.s * 1000 * self.mw
+            results["vol"][index] = st.v * self.mw
+        return results
+
+
+SOURCES = {"helmholtz": HelmholtzSource, "iapws": IapwsSource}
+
+
+def find_table_file(compound: str) -> Optional[str]:
+    """Returns the tables of compound in the cache directory, or shipped with the package."""
+    for path in (TABLE_CACHE_PATH, TABLE_PATH):
+        file = os.path.join(path, f"{compound}.npz")
+        if os.path.exists(file):
+            return file
+    return None
+
+
+def tabulate(source, pressure_range=None, temperature_range=None,
+             degree: int = DEFAULT_DEGREE, saturation_degree: int = DEFAULT_SATURATION_DEGREE) -> PropertyTables:
+    """
+    Tabulates a compound.
+
+    Args:
+        source: Property source, e.g. HelmholtzSource.
+        pressure_range (Tuple[float, float]): Pa, below the critical pressure. Defaults
+            to the source's default_pressure_range.
+        temperature_range (Tuple[float, float]): K, containing the saturation temperature
+            at every pressure. Defaults to the source's default_temperature_range.
+        degree (int): Chebyshev terms in each coordinate of the single phase tables.
+        saturation_degree (int): Chebyshev terms of the saturation curves.
+    """
+    pressure_range = tuple(pressure_range or source.default_pressure_range)
+    temperature_range = tuple(temperature_range or source.default_temperature_range)
+    t_min, t_max = temperature_range
+    log_p_min, log_p_max = np.log(pressure_range)
+
+    def pressure(u):
+        return np.exp(log_p_min + (np.asarray(u) + 1) * (log_p_max - log_p_min) / 2)
+
+    # Saturation curves, and the enthalpy at the temperature limits
+    u_sat = chebyshev_nodes(saturation_degree)
+
+    def saturation_samples(u):
+        P = pressure(u)
+        sat = source.saturation(P)
+        if np.any(sat["temperature"] <= t_min) or np.any(sat["temperature"] >= t_max):
+            raise ValueError(f"The saturation temperature leaves {temperature_range} K in {pressure_range} Pa")
+        return {
+            "temperature": sat["temperature"],
+            "enth_liq": sat["enth_liq"], "enth_vap": sat["enth_vap"],
+            "entr_liq": sat["entr_liq"], "entr_vap": sat["entr_vap"],
+            "log_vol_liq": np.log(sat["vol_liq"]), "log_vol_vap": np.log(sat["vol_vap"]),
+            "enth_min": source.pt(P, np.full_like(P, t_min), "liq")["enth"],
+            "enth_max": source.pt(P, np.full_like(P, t_max), "vap")["enth"],
+        }
+
+    samples = saturation_samples(u_sat)
+    vander = chebyshev.chebvander(u_sat, saturation_degree - 1)
+    saturation = np.array([np.linalg.solve(vander, samples[name]) for name in SATURATION_PROPERTIES])
+
+    # Single phase tables, sampled on a Chebyshev grid in (u, 2 eta - 1)
+    nodes = chebyshev_nodes(degree)
+    u, q = np.meshgrid(nodes, nodes, indexing="ij")
+    vander = chebyshev.chebvander(nodes, degree - 1)
+    tables = PropertyTables(
+        {"compound": source.compound, "mw": source.mw,
+         "pressure_range": list(pressure_range), "temperature_range": list(temperature_range)},
+        saturation,
+        {f"{table}_{phase}": np.zeros((len(props), degree, degree)) for table, props in TABLES.items() for phase in PHASES},
+    )
+    for table, props in TABLES.items():
+        for phase in PHASES:
+            values = _table_samples(source, tables, table, phase, u, (q + 1) / 2)
+            sat = tables.saturation(pressure(u))
+            for i, prop in enumerate(props):
+                g = (values[prop] - sat[saturation_name(prop, phase)]) / ((q + 1) / 2)
+                # Interpolate in both coordinates, g = V C V^T
+                tables.region_coefficients[f"{table}_{phase}"][i] = np.linalg.solve(vander, np.linalg.solve(vander, g).T).T
+
+    tables.metadata["max_errors"] = _max_errors(source, tables, saturation_samples, pressure, degree, saturation_degree)
+    return tables
+
+
+def _table_samples(source, tables, table, phase, u, eta):
+    # Source values at the states of a table at (u, eta), with ln(v) in place of v
+    P = np.exp(np.log(tables.pressure_range[0]) + (u + 1) * np.log(tables.pressure_range[1] / tables.pressure_range[0]) / 2)
+    sat = tables.saturation(P)
+    if table == "ph":
+        if phase == "liq":
+            h = sat["enth_liq"] - eta * (sat["enth_liq"] - sat["enth_min"])
+        else:
+            h = sat["enth_vap"] + eta * (sat["enth_max"] - sat["enth_vap"])
+        values = source.ph(P, h, phase)
+    else:
+        t_min, t_max = tables.temperature_range
+        if phase == "liq":
+            T = sat["temperature"] - eta * (sat["temperature"] - t_min)
+        else:
+            T = sat["temperature"] + eta * (t_max - sat["temperature"])
+        values = source.pt(P, T, phase)
+    values = dict(values)
+    values["log_vol"] = np.log(values.pop("vol"))
+    return values
+
+
+def _max_errors(source, tables, saturation_samples, pressure, degree, saturation_degree) -> Dict[str, float]:
+    # Largest difference from the source half way between the sample points
+    u_sat = np.cos(np.pi * np.arange(1, saturation_degree) / saturation_degree)
+    expected = saturation_samples(u_sat)
+    actual = tables.saturation(pressure(u_sat))
+    errors = {f"saturation_{name}": float(np.max(np.abs(actual[name] - expected[name]))) for name in SATURATION_PROPERTIES}
+
+    midpoints = np.cos(np.pi * np.arange(1, degree) / degree)
+    u, q = np.meshgrid(midpoints, midpoints, indexing="ij")
+    eta = (q + 1) / 2
+    for table, props in TABLES.items():
+        for phase in PHASES:
+            expected = _table_samples(source, tables, table, phase, u, eta)
+            sat = tables.saturation(pressure(u))
+            for prop in props:
+                actual = tables._region(table, phase, prop, u, eta, sat)
+                errors[f"{table}_{phase}_{prop}"] = float(np.max(np.abs(actual - expected[prop])))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("compound", help="Helmholtz component, e.g. water")
+    parser.add_argument("--source", choices=list(SOURCES), default="helmholtz",
+                        help="iapws only has water, and does not need the IDAES external functions")
+    parser.add_argument("--pressure-range", type=float, nargs=2, metavar=("PMIN", "PMAX"), help="Pa")
+    parser.add_argument("--temperature-range", type=float, nargs=2, metavar=("TMIN", "TMAX"), help="K")
+    parser.add_argument("--degree", type=int, default=DEFAULT_DEGREE)
+    parser.add_argument("--saturation-degree", type=int, default=DEFAULT_SATURATION_DEGREE)
+    parser.add_argument("--output", help=f"defaults to <compound>.npz in {TABLE_CACHE_PATH}")
+    args = parser.parse_args()
+
+    from ahuora_property_packages.helmholtz.parameters import discover_parameters
+
+    source = SOURCES[args.source](args.compound)
+    tables = tabulate(source, args.pressure_range, args.temperature_range, args.degree, args.saturation_degree)
+    # Parameter file hashes, to find tables older than the equation of state
+    tables.metadata["parameter_files"] = discover_parameters()[args.compound].files
+    output = args.output or os.path.join(TABLE_CACHE_PATH, f"{args.compound}.npz")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tables.save(output)
+    print(f"wrote {output}")
+    for name, error in tables.metadata["max_errors"].items():
+        print(f"{name:>24} {error:.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from typing import List
+
+from .tabulated_extended import TabulatedHelmholtzParameterBlock
+from .tabulate import find_table_file
+
+
+def build_helmholtz_tabulated_package(compound_list: List[str], table_file: str = None):
+    if len(compound_list) != 1:
+        raise ValueError("Tabulated Helmholtz package only supports single component systems")
+    component = compound_list[0]
+    if table_file is None:
+        table_file = find_table_file(component)
+        if table_file is None:
+            raise ValueError(
+                f"No property tables for {component}. Write them with "
+                f"python -m ahuora_property_packages.helmholtz_tabulated.tabulate {component}"
+            )
+    return TabulatedHelmholtzParameterBlock(table_file=table_file)
@@ -0,0 +1,410 @@
+import logging
+
+from pyomo.environ import (
+    Constraint,
+    Expr_if,
+    Expression,
+    NonNegativeReals,
+    Param,
+    Var,
+    check_optimal_termination,
+    exp,
+    log,
+    units,
+    value,
+)
+from pyomo.common.config import ConfigValue
+from idaes.core import (
+    declare_process_block_class,
+    PhysicalParameterBlock,
+    StateBlockData,
+    StateBlock,
+    MaterialBalanceType,
+    EnergyBalanceType,
+    MaterialFlowBasis,
+    LiquidPhase,
+    VaporPhase,
+    Component,
+)
+from idaes.core.util.initialization import revert_state_vars
+from idaes.core.util.model_statistics import degrees_of_freedom
+from idaes.core.util.exceptions import InitializationError
+import idaes.logger as idaeslog
+
+from ahuora_property_packages.base.instrumentation import StageRecorder
+from ahuora_property_packages.base.parallel import initialize_parallel
+from ahuora_property_packages.base.state_block_constraints import StateBlockConstraints
+from ahuora_property_packages.base.solvers import get_initialization_solver
+from ahuora_property_packages.utils.fix_state_vars import fix_state_vars
+from ahuora_property_packages.helmholtz.parameters import discover_parameters
+from .property_tables import (
+    PHASES,
+    PH_PROPERTIES,
+    SATURATION_PROPERTIES,
+    enthalpy_eta,
+    get_tables,
+    power_coefficients,
+    saturation_name,
+)
+
+"""
+Pure component property package that evaluates tables written by tabulate,
+instead of calling the Helmholtz external functions. State variables are flow_mol,
+pressure and enth_mol, as for the Helmholtz package with StateVars.PH, and every
+property is an algebraic expression of them.
+
+Liquid and vapour are presented as separate phases. Two phase states are mixtures
+of the saturated phases, and single phase states are read from the (P, h) table
+of their phase.
+"""
+
+_log = logging.getLogger(__name__)
+
+
+class _TabulatedStateBlock(StateBlock):
+
+    def initialize(blk, *args, **kwargs):
+        # Opt in, see base.parallel
+        if kwargs.get("parallel"):
+            # The workers inherit the guesses and the vapor fraction constraint
+            set_enthalpy_guesses(blk)
+            return initialize_parallel(blk, kwargs.pop("parallel"), **kwargs)
+
+        outlvl = kwargs.get("outlvl", idaeslog.NOTSET)
+        init_log = idaeslog.getInitLogger(blk.name, outlvl, tag="properties")
+        solve_log = idaeslog.getSolveLogger(blk.name, outlvl, tag="properties")
+        # Stage timings, and events for any hooks, see base.instrumentation
+        recorder = StageRecorder(blk, "helmholtz-tabulated")
+
+        set_enthalpy_guesses(blk)
+
+        flag_dict = fix_state_vars(blk, kwargs.get("state_args", None))
+
+        dof = degrees_of_freedom(blk)
+        if dof != 0:
+            raise InitializationError(
+                f"{blk.name} Unexpected degrees of freedom during "
+                f"initialization at property initialization step: {dof}."
+            )
+
+        recorder.end_stage("guesses")
+
+        res = None
+        opt = get_initialization_solver(kwargs.get("solver", None), kwargs.get("optarg", None))
+        with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
+            try:
+                res = recorder.solve(opt, tee=slc.tee)
+            except ValueError as e:
+                if str(e).startswith("No variables appear"):
+                    # https://github.com/Pyomo/pyomo/pull/3445
+                    pass
+                else:
+                    raise e
+        recorder.end_stage("properties")
+        recorder.finish()
+
+        if res is not None and not check_optimal_termination(res):
+            raise InitializationError(
+                f"{blk.name} failed to initialize successfully. Please check "
+                f"the output logs for more information."
+            )
+
+        if kwargs.get("hold_state") is True:
+            return flag_dict
+        else:
+            blk.release_state(flag_dict)
+
+        init_log.info(
+            "Property package initialization: {}.".format(idaeslog.condition(res))
+        )
+
+    def release_state(blk, flags, outlvl=idaeslog.NOTSET):
+        revert_state_vars(blk, flags)
+
+
+def set_enthalpy_guesses(blk) -> None:
+    """
+    Temperature or vapor fraction specified, with pressure
+    valid combinations: {p, T}, {p, x}
+
+    The tables give h directly for these, so each state block starts at its
+    solution (or within the 1e-6 K/(J/mol) smoothing of temperature of it).
+
+    As for the Helmholtz package, the vapor fraction constraint is replaced by
+    h = h_sat_liq + x(h_sat_vap - h_sat_liq), which stays smooth outside the two
+    phase region.
+    """
+    for sb in blk.values():
+        tables = sb.params.tables
+        if hasattr(sb.constraints, "vapor_frac"):
+            if sb.constraints.vapor_frac.lower != sb.constraints.vapor_frac.upper:
+                raise ValueError("Bounds on the vapor fraction constraint are not supported. See PropertyPackages, tabulated_extended.py")
+            x = sb.constraints.vapor_frac.lower
+            del sb.constraints.vapor_frac
+            sb.constraints.add_component(
+                "custom_vapor_frac",
+                Constraint(expr=sb.enth_mol == sb.enth_mol_sat_phase["Liq"] + x * (sb.enth_mol_sat_phase["Vap"] - sb.enth_mol_sat_phase["Liq"]))
+            )
+            if not sb.enth_mol.fixed and sb.pressure.fixed:
+                sat = tables.saturation(value(sb.pressure))
+                sb.enth_mol.set_value(float(sat["enth_liq"] + x * (sat["enth_vap"] - sat["enth_liq"])))
+        elif hasattr(sb.constraints, "temperature"):
+            if not sb.enth_mol.fixed and sb.pressure.fixed:
+                temperature = sb.constraints.temperature.upper
+                sb.enth_mol.set_value(float(tables.enth_mol_pt(value(sb.pressure), value(temperature))))
+
+
+@declare_process_block_class("TabulatedHelmholtzStateBlock", block_class=_TabulatedStateBlock)
+class TabulatedHelmholtzStateBlockData(StateBlockData, StateBlockConstraints):
+
+    def build(blk, *args):
+        StateBlockData.build(blk, *args)
+        params = blk.params
+        tables = params.tables
+
+        blk.flow_mol = Var(
+            domain=NonNegativeReals,
+            initialize=1.0,
+            units=units.mol / units.s,
+            doc="Total molar flowrate [mol/s]",
+        )
+        blk.pressure = Var(
+            domain=NonNegativeReals,
+            initialize=params.default_pressure,
+            bounds=tables.pressure_range,
+            units=units.Pa,
+            doc="Pressure [Pa]",
+        )
+        blk.enth_mol = Var(
+            initialize=params.default_enth_mol,
+            units=units.J / units.mol,
+            doc="Molar enthalpy [J/mol]",
+        )
+
+        # Pyomo walks a named expression every time it appears, so each series is
+        # written in Horner form in the coordinates rather than with a shared basis
+        blk.table_pressure_coordinate = Expression(
+            expr=tables.pressure_coordinate(blk.pressure / units.Pa, log=log)
+        )
+        u = blk.table_pressure_coordinate
+        blk.table_saturation = Expression(SATURATION_PROPERTIES, rule=lambda b, name: (
+            _horner(params.saturation_power[name], u)
+        ))
+        sat = blk.table_saturation
+
+        # Distance from saturation in each phase's (P, h) table. States of the other
+        # phase are held at saturation, as Pyomo evaluates every branch of an Expr_if
+        # and the series grow quickly outside the table
+        h = blk.enth_mol / (units.J / units.mol)
+
+        def eta_rule(b, phase):
+            eta = enthalpy_eta(phase, h, sat)
+            return Expr_if(IF=eta >= 0, THEN=eta, ELSE=0)
+        blk.table_eta = Expression(PHASES, rule=eta_rule)
+
+        def single_phase_rule(b, phase, prop):
+            coefficients = params.region_power["ph", phase, prop]
+            q = 2 * b.table_eta[phase] - 1
+            series = _horner([_horner(column, u) for column in coefficients.T], q)
+            return sat[saturation_name(prop, phase)] + b.table_eta[phase] * series
+        blk.table_single_phase = Expression(PHASES, PH_PROPERTIES, rule=single_phase_rule)
+        single = blk.table_single_phase
+
+        # Saturation properties in the package units
+        blk.temperature_sat = Expression(expr=sat["temperature"] * units.K)
+        blk.enth_mol_sat_phase = Expression(params.phase_list, rule=lambda b, p: (
+            sat[f"enth_{p.lower()}"] * units.J / units.mol
+        ))
+        blk.entr_mol_sat_phase = Expression(params.phase_list, rule=lambda b, p: (
+            sat[f"entr_{p.lower()}"] * units.J / units.mol / units.K
+        ))
+        blk.vol_mol_sat_phase = Expression(params.phase_list, rule=lambda b, p: (
+            exp(sat[f"log_vol_{p.lower()}"]) * units.m**3 / units.mol
+        ))
+
+        # Phase split, 0 or 1 outside the two phase region
+        liquid = h <= sat["enth_liq"]
+        vapour = h >= sat["enth_vap"]
+        blk.vapor_frac = Expression(expr=Expr_if(
+            IF=liquid, THEN=0, ELSE=Expr_if(
+                IF=vapour, THEN=1, ELSE=(h - sat["enth_liq"]) / (sat["enth_vap"] - sat["enth_liq"])
+            )
+        ))
+        blk.phase_frac = Expression(params.phase_list, rule=lambda b, p: (
+            b.vapor_frac if p == "Vap" else 1 - b.vapor_frac
+        ))
+
+        def mixed(single_liq, single_vap, sat_liq, sat_vap):
+            return Expr_if(IF=liquid, THEN=single_liq, ELSE=Expr_if(
+                IF=vapour, THEN=single_vap, ELSE=sat_liq + blk.vapor_frac * (sat_vap - sat_liq)
+            ))
+
+        blk.old_temperature = Expression(expr=mixed(
+            single["liq", "temperature"], single["vap", "temperature"], sat["temperature"], sat["temperature"]
+        ) * units.K)
+        blk.entr_mol = Expression(expr=mixed(
+            single["liq", "entr"], single["vap", "entr"], sat["entr_liq"], sat["entr_vap"]
+        ) * units.J / units.mol / units.K)
+        blk.vol_mol = Expression(expr=mixed(
+            exp(single["liq", "log_vol"]), exp(single["vap", "log_vol"]),
+            exp(sat["log_vol_liq"]), exp(sat["log_vol_vap"]),
+        ) * units.m**3 / units.mol)
+
+        # Each phase is at saturation in the two phase region, and is the whole
+        # state outside it
+        blk.enth_mol_phase = Expression(params.phase_list, rule=lambda b, p: (
+            Expr_if(IF=vapour, THEN=h, ELSE=sat["enth_vap"]) if p == "Vap"
+            else Expr_if(IF=liquid, THEN=h, ELSE=sat["enth_liq"])
+        ) * units.J / units.mol)
+
+        blk.mw = Expression(expr=params.mw)
+        blk.dens_mol = Expression(expr=1 / blk.vol_mol)
+        blk.dens_mass = Expression(expr=params.mw / blk.vol_mol)
+        blk.flow_mass = Expression(expr=params.mw * blk.flow_mol)
+        blk.flow_vol = Expression(expr=blk.vol_mol * blk.flow_mol)
+        blk.mole_frac_comp = Expression(params.component_list, rule=lambda b, j: 1.0)
+        blk.flow_mol_comp = Expression(params.component_list, rule=lambda b, j: b.flow_mol)
+
+        StateBlockConstraints.build(blk, *args)
+
+    def add_extra_expressions(blk):
+        super().add_extra_expressions()
+
+        # Same as HelmholtzExtendedStateBlockData, pure components have one
+        # saturation temperature
+        blk.add_component("temperature_bubble", Expression(expr=blk.temperature_sat))
+        blk.add_component("temperature_dew", Expression(expr=blk.temperature_sat))
+
+        # Smooth the temperature through the two phase region as the Helmholtz
+        # package does, so constraining temperature has a nonzero gradient there
+        blk.add_component("temperature", Expression(
+            expr=blk.old_temperature + (blk.enth_mol / (1 * units.J/units.mol))*0.000001 * units.K
+        ))
+
+    def get_material_flow_terms(blk, p, j):
+        return blk.flow_mol * blk.phase_frac[p]
+
+    def get_enthalpy_flow_terms(blk, p):
+        return blk.flow_mol * blk.phase_frac[p] * blk.enth_mol_phase[p]
+
+    def get_material_flow_basis(blk):
+        return MaterialFlowBasis.molar
+
+    def default_material_balance_type(blk):
+        return MaterialBalanceType.componentTotal
+
+    def default_energy_balance_type(blk):
+        return EnergyBalanceType.enthalpyTotal
+
+    def define_state_vars(blk):
+        return {"flow_mol": blk.flow_mol, "enth_mol": blk.enth_mol, "pressure": blk.pressure}
+
+
+def _horner(coefficients, x):
+    # c_0 + x (c_1 + x (c_2 + ...))
+    expr = coefficients[-1]
+    for c in reversed(coefficients[:-1]):
+        expr = c + x * expr
+    return expr
+
+
+@declare_process_block_class("TabulatedHelmholtzParameterBlock")
+class TabulatedHelmholtzParameterData(PhysicalParameterBlock):
+    """
+    Parameter block of the helmholtz-tabulated package. The tables are loaded once
+    per file and shared by every parameter block.
+    """
+    CONFIG = PhysicalParameterBlock.CONFIG()
+    CONFIG.declare(
+        "table_file",
+        ConfigValue(
+            default=None,
+            domain=str,
+            description="Property table file",
+            doc="Path of the .npz tables written by "
+            "python -m ahuora_property_packages.helmholtz_tabulated.tabulate",
+        ),
+    )
+
+    def build(self):
+        super().build()
+        if self.config.table_file is None:
+            raise ValueError("TabulatedHelmholtzParameterBlock needs a table_file")
+
+        self._state_block_class = TabulatedHelmholtzStateBlock # noqa: F821
+        # Plain attribute rather than a component, the tables are not part of the model
+        self.tables = get_tables(self.config.table_file)
+        compound = self.tables.compound
+        _check_parameter_files(self.tables)
+        # Power series coefficients of the expressions, converted once per block
+        self.saturation_power = {
+            name: power_coefficients(c) for name, c in zip(SATURATION_PROPERTIES, self.tables.saturation_coefficients)
+        }
+        self.region_power = {
+            ("ph", phase, prop): power_coefficients(self.tables.coefficients("ph", phase, prop))
+            for phase in PHASES for prop in PH_PROPERTIES
+        }
+
+        self.Liq = LiquidPhase()
+        self.Vap = VaporPhase()
+        self.add_component(compound, Component())
+        self.mw = Param(
+            initialize=self.tables.mw,
+            mutable=True,
+            units=units.kg / units.mol,
+            doc="Molecular weight [kg/mol]",
+        )
+        p_min, p_max = self.tables.pressure_range
+        self.default_pressure = min(max(101325, p_min), p_max)
+        sat = self.tables.saturation(self.default_pressure)
+        self.default_enth_mol = float(sat["enth_liq"])
+
+    @classmethod
+    def define_metadata(cls, obj):
+        obj.add_properties(
+            {
+                "flow_mol": {"method": None, "units": units.mol / units.s},
+                "flow_mass": {"method": None, "units": units.kg / units.s},
+                "flow_vol": {"method": None, "units": units.m**3 / units.s},
+                "pressure": {"method": None, "units": units.Pa},
+                "temperature": {"method": None, "units": units.K},
+                "enth_mol": {"method": None, "units": units.J / units.mol},
+                "entr_mol": {"method": None, "units": units.J / units.mol / units.K},
+                "vol_mol": {"method": None, "units": units.m**3 / units.mol},
+                "dens_mol": {"method": None, "units": units.mol / units.m**3},
+                "dens_mass": {"method": None, "units": units.kg / units.m**3},
+                "mw": {"method": None, "units": units.kg / units.mol},
+                "mole_frac_comp": {"method": None},
+                "phase_frac": {"method": None},
+                "enth_mol_phase": {"method": None, "units": units.J / units.mol},
+                "temperature_sat": {"method": None, "units": units.K},
+            }
+        )
+        obj.define_custom_properties(
+            {
+                "vapor_frac": {"method": None},
+                "enth_mol_sat_phase": {"method": None},
+                "entr_mol_sat_phase": {"method": None},
+                "vol_mol_sat_phase": {"method": None},
+            }
+        )
+        obj.add_default_units(
+            {
+                "time": units.s,
+                "length": units.m,
+                "mass": units.kg,
+                "amount": units.mol,
+                "temperature": units.K,
+            }
+        )
+
+
+def _check_parameter_files(tables) -> None:
+    # Warn if the Helmholtz parameters have changed since the tables were written
+    recorded = tables.metadata.get("parameter_files")
+    current = discover_parameters().get(tables.compound)
+    if recorded is not None and current is not None and recorded != current.files:
+        _log.warning(
+            f"Property tables for {tables.compound} were written from different Helmholtz "
+            f"parameter files, tabulate the compound again."
+        )
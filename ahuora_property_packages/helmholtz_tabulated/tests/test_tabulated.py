@@ -0,0 +1,165 @@
+import os
+import numpy as np
+import pytest
+from pyomo.environ import ConcreteModel, value
+from idaes.core import FlowsheetBlock
+from idaes.models.properties.general_helmholtz import helmholtz_available
+from ahuora_property_packages.helmholtz.parameters import discover_parameters
+from ahuora_property_packages.helmholtz_tabulated import tabulate as tabulate_module
+from ahuora_property_packages.helmholtz_tabulated.property_tables import PropertyTables, get_tables
+from ahuora_property_packages.helmholtz_tabulated.tabulate import (
+    TABLE_PATH,
+    HelmholtzSource,
+    IapwsSource,
+    find_table_file,
+    tabulate,
+)
+from ahuora_property_packages.helmholtz_tabulated.tabulated_builder import build_helmholtz_tabulated_package
+from ahuora_property_packages.helmholtz_tabulated.tabulated_extended import set_enthalpy_guesses
+
+
+WATER_TABLES = os.path.join(TABLE_PATH, "water.npz")
+
+
+@pytest.fixture(scope="module", params=["synthetic", "water"])
+def model(request, table_file):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    files = {"synthetic": table_file, "water": WATER_TABLES}
+    m.fs.properties = build_helmholtz_tabulated_package([request.param], table_file=files[request.param])
+    m.fs.sb = m.fs.properties.build_state_block([0])
+    return m
+
+
+def test_tabulate_accuracy(synthetic_source):
+    tables = tabulate(synthetic_source)
+    assert max(tables.metadata["max_errors"].values()) < 1e-6
+
+    P = np.geomspace(2e3, 9e5, 7)[:, None]
+    sat = synthetic_source.saturation(P)
+    # Liquid, two phase and vapour states
+    h = np.hstack([sat["enth_liq"] - 2000, sat["enth_liq"] + 0.3 * synthetic_source.L, sat["enth_vap"] + 5000])
+    props = tables.properties_ph(P, h)
+    assert np.allclose(props["vapor_frac"], [0, 0.3, 1])
+    assert np.allclose(props["temperature"][:, 1], sat["temperature"][:, 0])
+    assert np.allclose(props["temperature"][:, 0], synthetic_source.ph(P, h[:, :1], "liq")["temperature"][:, 0], rtol=1e-9)
+    assert np.allclose(props["temperature"][:, 2], synthetic_source.ph(P, h[:, 2:], "vap")["temperature"][:, 0], rtol=1e-9)
+
+    T = np.array([300.0, 600.0])
+    assert np.allclose(tables.enth_mol_pt(1e5, T), [synthetic_source.pt(1e5, T[0], "liq")["enth"], synthetic_source.pt(1e5, T[1], "vap")["enth"]])
+
+
+def test_tabulate_temperature_range(synthetic_source):
+    with pytest.raises(ValueError):
+        tabulate(synthetic_source, temperature_range=(400, 700))
+
+
+def test_save_load(synthetic_source, table_file):
+    loaded = PropertyTables.load(table_file)
+    assert loaded.compound == "synthetic"
+    assert loaded.pressure_range == synthetic_source.default_pressure_range
+    assert get_tables(table_file) is get_tables(table_file)
+    assert loaded.properties_ph(1e5, 1000)["temperature"] == pytest.approx(
+        get_tables(table_file).properties_ph(1e5, 1000)["temperature"], rel=1e-15)
+
+
+def test_missing_tables():
+    with pytest.raises(ValueError, match="tabulate"):
+        build_helmholtz_tabulated_package(["not a compound"])
+
+
+def test_find_table_file(tmp_path, monkeypatch):
+    shipped, cache = tmp_path / "shipped", tmp_path / "cache"
+    shipped.mkdir()
+    cache.mkdir()
+    monkeypatch.setattr(tabulate_module, "TABLE_PATH", str(shipped))
+    monkeypatch.setattr(tabulate_module, "TABLE_CACHE_PATH", str(cache))
+    assert find_table_file("water") is None
+    (shipped / "water.npz").touch()
+    assert find_table_file("water") == str(shipped / "water.npz")
+    # Tables written by the user take precedence
+    (cache / "water.npz").touch()
+    assert find_table_file("water") == str(cache / "water.npz")
+
+
+def test_shipped_water_tables():
+    assert find_table_file("water") is not None
+    tables = get_tables(WATER_TABLES)
+    assert tables.metadata["parameter_files"] == discover_parameters()["water"].files
+    # IAPWS-95 at 1 atm, and liquid at 300 K and 1 bar
+    sat = tables.saturation(101325.0)
+    assert sat["temperature"] == pytest.approx(373.124, rel=1e-5)
+    assert sat["enth_vap"] - sat["enth_liq"] == pytest.approx(2256.47 * 18.015268, rel=1e-3)
+    props = tables.properties_ph(1e5, 112.654 * 18.015268)
+    assert props["temperature"] == pytest.approx(300, abs=0.05)
+    assert props["vol_mol"] == pytest.approx(18.015268e-3 / 996.56, rel=1e-3)
+
+
+def test_iapws_source():
+    pytest.importorskip("iapws")
+    source = IapwsSource()
+    tables = get_tables(WATER_TABLES)
+    assert source.default_pressure_range == pytest.approx(tables.pressure_range)
+    assert source.default_temperature_range == pytest.approx(tables.temperature_range)
+    # The shipped tables are within their recorded errors of the source
+    P = np.array([5e3, 2e5, 4e6])
+    sat = source.saturation(P)
+    errors = tables.metadata["max_errors"]
+    for name in ("temperature", "enth_liq", "enth_vap"):
+        assert np.abs(tables.saturation(P)[name] - sat[name]).max() <= 2 * errors[f"saturation_{name}"]
+    h = sat["enth_vap"] + 5000
+    assert np.abs(tables.properties_ph(P, h)["temperature"] - source.ph(P, h, "vap")["temperature"]).max() \
+        <= 2 * errors["ph_vap_temperature"]
+
+
+@pytest.mark.skipif(not helmholtz_available(), reason="Helmholtz EoS external functions not available")
+def test_helmholtz_source():
+    source = HelmholtzSource("water")
+    # IAPWS-95 at 1 atm, and liquid at 300 K and 1 bar
+    sat = source.saturation(np.array([101325.0]))
+    assert sat["temperature"][0] == pytest.approx(373.124, rel=1e-5)
+    assert sat["enth_vap"][0] - sat["enth_liq"][0] == pytest.approx(2256.47 * 18.015268, rel=1e-4)
+    assert source.pt(1e5, 300.0, "liq")["vol"] == pytest.approx(18.015268e-3 / 996.56, rel=1e-4)
+
+    # Tables of a narrow range, checked against the equation of state between the sample points
+    tables = tabulate(source, pressure_range=(1e4, 1e6), temperature_range=(300, 700), degree=10, saturation_degree=16)
+    assert tables.metadata["max_errors"]["saturation_temperature"] < 1e-2
+    # Subcooled liquid and superheated vapour
+    P = np.array([2e4, 3e5])
+    h = np.array([source.pt(2e4, 320.0, "liq")["enth"], source.pt(3e5, 650.0, "vap")["enth"]])
+    props = tables.properties_ph(P, h)
+    assert props["temperature"] == pytest.approx([320, 650], rel=1e-3)
+
+
+# Liquid, two phase and vapour states of both compounds
+@pytest.mark.parametrize("pressure,enth_mol", [(2e3, 500), (5e4, 20000), (9e5, 60000)])
+def test_expressions_match_tables(model, pressure, enth_mol):
+    sb = model.fs.sb[0]
+    tables = model.fs.properties.tables
+    sb.pressure.set_value(pressure)
+    sb.enth_mol.set_value(enth_mol)
+    props = tables.properties_ph(pressure, enth_mol)
+    assert value(sb.old_temperature) == pytest.approx(props["temperature"], rel=1e-9)
+    assert value(sb.vapor_frac) == pytest.approx(props["vapor_frac"], abs=1e-12)
+    assert value(sb.entr_mol) == pytest.approx(props["entr_mol"], rel=1e-9)
+    assert value(sb.vol_mol) == pytest.approx(props["vol_mol"], rel=1e-9)
+    assert value(sb.phase_frac["Liq"] + sb.phase_frac["Vap"]) == pytest.approx(1)
+    assert value(sb.temperature_sat) == pytest.approx(tables.saturation(pressure)["temperature"], rel=1e-9)
+
+
+def test_enthalpy_guesses(table_file):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_helmholtz_tabulated_package(["synthetic"], table_file=table_file)
+    m.fs.sb = m.fs.properties.build_state_block([0, 1])
+    for sb in m.fs.sb.values():
+        sb.flow_mol.fix(1)
+        sb.pressure.fix(1e5)
+    m.fs.sb[0].constrain("temperature", 450)
+    m.fs.sb[1].constrain("vapor_frac", 0.25)
+    set_enthalpy_guesses(m.fs.sb)
+    assert value(m.fs.sb[0].old_temperature) == pytest.approx(450, rel=1e-9)
+    assert value(m.fs.sb[1].vapor_frac) == pytest.approx(0.25)
+    # The vapor fraction spec is the lever rule, which holds at the guess
+    assert not hasattr(m.fs.sb[1].constraints, "vapor_frac")
+    assert value(m.fs.sb[1].constraints.custom_vapor_frac.body) == pytest.approx(0, abs=1e-8)
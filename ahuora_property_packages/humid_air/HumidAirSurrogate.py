@@ -1,4 +1,5 @@
 # Import Python libraries
+import json
 import logging
 import os
 
@@ -13,6 +14,9 @@ from pyomo.environ import (
     units,
 )
 
+from pyomo.common.config import ConfigValue, In
+from pyomo.contrib.pynumero.interfaces.external_grey_box import ExternalGreyBoxBlock
+
 # Import IDAES cores
 from idaes.core import (
     declare_process_block_class,
@@ -30,6 +34,10 @@ from idaes.core.surrogate.surrogate_block import SurrogateBlock
 from idaes.core.surrogate.pysmo_surrogate import PysmoSurrogate
 import idaes.logger as idaeslog
 
+from .polynomial_surrogate import PolynomialSurrogate, SURROGATE_TYPE as POLYNOMIAL_SURROGATE_TYPE
+from .surrogate_grey_box import HumidAirGreyBox
+from . import surrogate_reduction
+
 from pyomo.environ import Block
 from pyomo.core.base.expression import ScalarExpression, Expression, _GeneralExpressionData, ExpressionData
 from pyomo.core.base.var import ScalarVar, _GeneralVarData, VarData, IndexedVar
@@ -42,6 +50,53 @@ __author__ = "Stephen Burroughs"
 # Set up logger
 _log = logging.getLogger(__name__)
 
+SURROGATE_PATH = os.path.join(os.path.dirname(__file__), "pysmo_humid_air.json")
+# Written by surrogate_reduction from SURROGATE_PATH
+REDUCED_SURROGATE_PATH = os.path.join(os.path.dirname(__file__), "humid_air_reduced.json")
+
+# Ways a state block can evaluate the surrogate
+SURROGATE_MODES = ["expression", "grey_box"]
+
+# Loaded surrogates by (path, polynomial), with the modification time they were loaded at
+_surrogates = {}
+
+
+def get_surrogate(path=SURROGATE_PATH):
+    """
+    Returns the PysmoSurrogate or PolynomialSurrogate stored at path. The file is only
+    parsed again if it has been modified, so every parameter block shares the same
+    surrogate object. The surrogate is only read when building expressions, so it
+    must not be modified.
+    """
+    return _load(path, False)
+
+
+def get_polynomial_surrogate(path=SURROGATE_PATH):
+    """
+    Returns the surrogate stored at path as a PolynomialSurrogate, caching it the same
+    way as get_surrogate. PySMO surrogates are converted with the dry air fraction
+    eliminated, which gives the same outputs when the mole fractions sum to one,
+    without the large cancelling terms.
+    """
+    return _load(path, True)
+
+
+def _load(path, polynomial):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _surrogates.get((path, polynomial), None)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r") as file:
+            surrogate_type = json.load(file).get("surrogate_type", None)
+        if surrogate_type == POLYNOMIAL_SURROGATE_TYPE:
+            surrogate = PolynomialSurrogate.load_from_file(path)
+        elif polynomial:
+            surrogate = surrogate_reduction.read_eliminated(path)
+        else:
+            surrogate = PysmoSurrogate.load_from_file(path)
+        cached = (mtime, surrogate)
+        _surrogates[(path, polynomial)] = cached
+    return cached[1]
+
 class _StateBlock(StateBlock):
     """
     This Class contains methods which should be applied to Property Blocks as a
@@ -311,16 +366,22 @@ class HAirStateBlockData(StateBlockData):
 
         inputs = [self.temperature, self.pressure, self.mole_frac_comp["water"], self.mole_frac_comp["air"]]
         outputs = [self.relative_humidity, self.temperature_wet_bulb, self.enth_mol, self.entr_mol, self.vol_mol]
-        script_dir = os.path.dirname(__file__)
-        self.pysmo_surrogate = PysmoSurrogate.load_from_file(
-            os.path.join(script_dir,"pysmo_humid_air.json")
-        )
-        self.surrogate = SurrogateBlock()
-        self.surrogate.build_model(
-            self.pysmo_surrogate,
-            input_vars=inputs,
-            output_vars=outputs,
-        )
+        if self.params.config.surrogate_mode == "grey_box":
+            # Outputs and derivatives come from NumPy, no surrogate expressions are built
+            self.surrogate = ExternalGreyBoxBlock()
+            self.surrogate.set_external_model(
+                HumidAirGreyBox(self.params.pysmo_surrogate),
+                inputs=inputs,
+                outputs=outputs,
+            )
+        else:
+            self.surrogate = SurrogateBlock()
+            self.surrogate.build_model(
+                # Loaded once by the parameter block and shared by every state block
+                self.params.pysmo_surrogate,
+                input_vars=inputs,
+                output_vars=outputs,
+            )
 
     def _vol_mass(self):
         def _vol_mass_rule(b):
@@ -463,6 +524,28 @@ class PhysicalParameterData(PhysicalParameterBlock):
     supercritical Humid Air
 
     """
+    CONFIG = PhysicalParameterBlock.CONFIG()
+    CONFIG.declare(
+        "surrogate_file",
+        ConfigValue(
+            default=SURROGATE_PATH,
+            domain=str,
+            description="Surrogate model file",
+            doc="Path of the PySMO surrogate, or of a reduced surrogate written by "
+            "surrogate_reduction, e.g. REDUCED_SURROGATE_PATH.",
+        ),
+    )
+    CONFIG.declare(
+        "surrogate_mode",
+        ConfigValue(
+            default="expression",
+            domain=In(SURROGATE_MODES),
+            description="How state blocks evaluate the surrogate",
+            doc="expression - build the surrogate as Pyomo constraints (default). "
+            "grey_box - evaluate the outputs, Jacobian and Hessian with NumPy in an "
+            "ExternalGreyBoxBlock, which needs a PyNumero solver such as cyipopt.",
+        ),
+    )
 
     def build(self):
         """
@@ -486,6 +569,12 @@ class PhysicalParameterData(PhysicalParameterBlock):
             units=units.kg / units.mol,
         )
 
+        # Plain attribute rather than a component, the surrogate is not part of the model
+        if self.config.surrogate_mode == "grey_box":
+            self.pysmo_surrogate = get_polynomial_surrogate(self.config.surrogate_file)
+        else:
+            self.pysmo_surrogate = get_surrogate(self.config.surrogate_file)
+
     @classmethod
     def define_metadata(cls, obj):
         obj.add_properties(
@@ -1,11 +1,11 @@
-from .HumidAirSurrogate import HAirParameterBlock
+from .HumidAirSurrogate import HAirParameterBlock, SURROGATE_PATH
 from typing import List
 
-def build_humid_air_package(compound_list: List[str]):
+def build_humid_air_package(compound_list: List[str], surrogate_file: str = SURROGATE_PATH):
     if len(compound_list) != 2:
         raise ValueError("Humid Air package only supports two components: water and air")
     for compound in compound_list:
         if compound not in ["water", "air"]:
             raise ValueError(f"Compound {compound} not supported in Humid Air package")
 
-    return HAirParameterBlock()
\ No newline at end of file
+    return HAirParameterBlock(surrogate_file=surrogate_file)
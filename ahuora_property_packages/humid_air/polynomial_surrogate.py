@@ -0,0 +1,267 @@
+from typing import Dict, List, Tuple
+import json
+import numpy as np
+from pyomo.environ import Constraint, Set
+from idaes.core.surrogate.base.surrogate_base import SurrogateBase
+
+"""
+Polynomial surrogate stored as a list of monomials per output, on inputs scaled
+by a constant factor, u_i = x_i / input_scale_i:
+
+    output = sum_k coefficients[k] * prod_i u_i ** exponents[k, i]
+
+Exponents can be negative, e.g. for a pressure / temperature term. This is the
+format written by surrogate_reduction, and it can be used anywhere a PySMO
+surrogate can, e.g. with SurrogateBlock.build_model.
+"""
+
+SURROGATE_TYPE = "polynomial"
+
+
+class PolynomialSurrogate(SurrogateBase):
+
+    def __init__(self, input_labels: List[str], output_labels: List[str], input_bounds: Dict[str, Tuple[float, float]],
+                 input_scale: Dict[str, float], terms: Dict[str, Tuple[np.ndarray, np.ndarray]], errors=None):
+        """
+        Args:
+            input_labels (List[str]): Input names, in order.
+            output_labels (List[str]): Output names, in order.
+            input_bounds (Dict[str, Tuple[float, float]]): Valid range of each input, unscaled.
+            input_scale (Dict[str, float]): Factor each input is divided by before the polynomial is evaluated.
+            terms (Dict[str, Tuple[np.ndarray, np.ndarray]]): (exponents, coefficients) of each output,
+                with shapes (n_terms, n_inputs) and (n_terms,).
+            errors (dict, optional): Fit or reduction error metrics of each output, kept for reference.
+        """
+        super().__init__(input_labels, output_labels, input_bounds)
+        self.input_scale = {label: float(input_scale.get(label, 1.0)) for label in input_labels}
+        self.errors = dict(errors) if errors is not None else {}
+        self.__terms = {}
+        self.__stacked = None
+        for label in output_labels:
+            exponents, coefficients = terms[label]
+            exponents = np.asarray(exponents, dtype=int).reshape(-1, len(input_labels))
+            coefficients = np.asarray(coefficients, dtype=float).reshape(-1)
+            if exponents.shape[0] != coefficients.shape[0]:
+                raise ValueError(f"{label} has {exponents.shape[0]} exponent rows and {coefficients.shape[0]} coefficients")
+            self.__terms[label] = (exponents, coefficients)
+
+    def terms(self, output_label: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns copies of the (exponents, coefficients) of an output.
+        """
+        exponents, coefficients = self.__terms[output_label]
+        return exponents.copy(), coefficients.copy()
+
+    def n_terms(self) -> Dict[str, int]:
+        return {label: len(coefficients) for label, (_, coefficients) in self.__terms.items()}
+
+    def scale_vector(self) -> np.ndarray:
+        return np.array([self.input_scale[label] for label in self._input_labels])
+
+    def evaluate(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Evaluates every output at many points.
+
+        Args:
+            inputs (np.ndarray): Unscaled inputs, shape (n, n_inputs) in input_labels order.
+
+        Returns:
+            np.ndarray: Outputs, shape (n, n_outputs) in output_labels order.
+        """
+        scaled = np.atleast_2d(np.asarray(inputs, dtype=float)) / self.scale_vector()
+        outputs = np.empty((scaled.shape[0], self.n_outputs()))
+        for j, label in enumerate(self._output_labels):
+            exponents, coefficients = self.__terms[label]
+            outputs[:, j] = np.prod(scaled[:, None, :] ** exponents[None, :, :], axis=2) @ coefficients
+        return outputs
+
+    def derivatives(self, inputs: np.ndarray, order: int = 1) -> Tuple[np.ndarray, ...]:
+        """
+        Evaluates every output and its analytic derivatives at many points, with
+        all outputs and terms in one set of array operations.
+
+        Args:
+            inputs (np.ndarray): Unscaled inputs, shape (n, n_inputs) in input_labels order.
+            order (int): 1 for outputs and Jacobian, 2 to add the Hessian.
+
+        Returns:
+            Tuple[np.ndarray, ...]: outputs (n, n_outputs), Jacobian (n, n_outputs, n_inputs)
+                and, for order 2, Hessian (n, n_outputs, n_inputs, n_inputs), all with
+                respect to the unscaled inputs.
+        """
+        exponents, coefficients, rows = self._stacked()
+        factor, d_factor, d2_factor = self._factors(inputs, exponents, order)
+        n, _, n_inputs = factor.shape
+
+        def product(exclude):
+            result = np.broadcast_to(coefficients, (n, len(coefficients))).copy()
+            for k in range(n_inputs):
+                if k not in exclude:
+                    result *= factor[:, :, k]
+            return result
+
+        outputs = product(()) @ rows
+        jacobian = np.empty((n, self.n_outputs(), n_inputs))
+        for i in range(n_inputs):
+            jacobian[:, :, i] = (product((i,)) * d_factor[:, :, i]) @ rows
+        if order == 1:
+            return outputs, jacobian
+
+        hessian = np.empty((n, self.n_outputs(), n_inputs, n_inputs))
+        for i in range(n_inputs):
+            hessian[:, :, i, i] = (product((i,)) * d2_factor[:, :, i]) @ rows
+            for j in range(i):
+                hessian[:, :, i, j] = hessian[:, :, j, i] = (
+                    product((i, j)) * d_factor[:, :, i] * d_factor[:, :, j]
+                ) @ rows
+        return outputs, jacobian, hessian
+
+    def directional_derivative(self, inputs: np.ndarray, output_label: str,
+                               direction: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluates one output and its derivative along direction at many points, using
+        only the terms of that output, e.g. for Newton iterations on a single input.
+
+        Args:
+            inputs (np.ndarray): Unscaled inputs, shape (n, n_inputs) in input_labels order.
+            output_label (str): Output to evaluate.
+            direction (np.ndarray): Change in each unscaled input, shape (n_inputs,).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The output and its directional derivative, shape (n,).
+        """
+        exponents, coefficients = self.__terms[output_label]
+        exponents = exponents.astype(int)
+        scales = self.scale_vector()
+        scaled = np.atleast_2d(np.asarray(inputs, dtype=float)) / scales
+        # Integer powers of each scaled input, gathered per term rather than raised
+        # with a float power, which is most of the cost for large batches. Column k
+        # of a table is the power k + lowest, with one power below the lowest exponent
+        # for the derivative of negative powers.
+        lowest = np.minimum(exponents.min(axis=0) - 1, 0)
+        powers = []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in range(scaled.shape[1]):
+                table = np.ones((scaled.shape[0], exponents[:, i].max() + 1 - lowest[i]))
+                for k in range(-lowest[i] + 1, table.shape[1]):
+                    table[:, k] = table[:, k - 1] * scaled[:, i]
+                for k in range(-lowest[i] - 1, -1, -1):
+                    table[:, k] = table[:, k + 1] / scaled[:, i]
+                powers.append(table)
+        factors = [powers[i][:, exponents[:, i] - lowest[i]] for i in range(scaled.shape[1])]
+        values = np.prod(factors, axis=0) @ coefficients
+        derivative = np.zeros(scaled.shape[0])
+        for i in np.flatnonzero(direction):
+            # Zero powers do not depend on the input, even where it is zero
+            d_power = powers[i][:, np.maximum(exponents[:, i] - 1, lowest[i]) - lowest[i]]
+            with np.errstate(invalid="ignore"):
+                d_factor = np.where(exponents[:, i] != 0, exponents[:, i] * d_power, 0.0) / scales[i]
+            others = np.prod([f for k, f in enumerate(factors) if k != i], axis=0)
+            derivative += direction[i] * ((others * d_factor) @ coefficients)
+        return values, derivative
+
+    def _factors(self, inputs: np.ndarray, exponents: np.ndarray, order: int):
+        # Factor of each term for each input, shape (n, n_terms, n_inputs), and its
+        # first and second derivatives with respect to the unscaled input. Zero powers
+        # are handled separately so inputs at zero, e.g. a water fraction of 0, do not
+        # give 0 ** -1.
+        scales = self.scale_vector()
+        u = (np.atleast_2d(np.asarray(inputs, dtype=float)) / scales)[:, None, :]
+        p = exponents[None, :, :]
+        nonzero = p != 0
+        d2_factor = None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = np.where(nonzero, u ** p, 1.0)
+            d_factor = np.where(nonzero, p * u ** (p - 1), 0.0) / scales
+            if order > 1:
+                d2_factor = np.where(p * (p - 1) != 0, p * (p - 1) * u ** (p - 2), 0.0) / scales ** 2
+        return factor, d_factor, d2_factor
+
+    def _stacked(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Terms of every output in one array, with a (n_terms, n_outputs) matrix
+        # that sums them into their outputs
+        if self.__stacked is None:
+            exponents = np.vstack([self.__terms[label][0] for label in self._output_labels])
+            coefficients = np.concatenate([self.__terms[label][1] for label in self._output_labels])
+            rows = np.zeros((len(coefficients), self.n_outputs()))
+            start = 0
+            for j, label in enumerate(self._output_labels):
+                end = start + len(self.__terms[label][1])
+                rows[start:end, j] = 1.0
+                start = end
+            self.__stacked = (exponents, coefficients, rows)
+        return self.__stacked
+
+    def evaluate_surrogate(self, inputs):
+        import pandas as pd
+
+        outputs = self.evaluate(inputs[self._input_labels].to_numpy())
+        return pd.DataFrame(data=outputs, index=inputs.index, columns=self._output_labels)
+
+    def expression(self, output_label: str, variables: list):
+        """
+        Returns the Pyomo expression of an output, in terms of the unscaled input variables.
+        The input scaling is folded into each coefficient, so it adds no expression nodes.
+        """
+        exponents, coefficients = self.__terms[output_label]
+        unscaled = coefficients / np.prod(self.scale_vector()[None, :] ** exponents, axis=1)
+        expr = 0
+        for row, coefficient in zip(exponents, unscaled):
+            term = float(coefficient)
+            for variable, exponent in zip(variables, row):
+                if exponent == 1:
+                    term = term * variable
+                elif exponent == -1:
+                    term = term / variable
+                elif exponent != 0:
+                    term = term * variable ** int(exponent)
+            expr = expr + term
+        return expr
+
+    def populate_block(self, block, additional_options=None):
+        output_set = Set(initialize=self._output_labels, ordered=True)
+
+        def polynomial_rule(b, o):
+            in_vars = block.input_vars_as_dict()
+            out_vars = block.output_vars_as_dict()
+            return out_vars[o] == self.expression(o, list(in_vars.values()))
+
+        block.polynomial_constraint = Constraint(output_set, rule=polynomial_rule)
+
+    def save(self, strm):
+        json.dump(
+            {
+                "surrogate_type": SURROGATE_TYPE,
+                "input_labels": self._input_labels,
+                "output_labels": self._output_labels,
+                "input_bounds": self._input_bounds,
+                "input_scale": self.input_scale,
+                "errors": self.errors,
+                "terms": {
+                    label: {
+                        "exponents": exponents.tolist(),
+                        "coefficients": coefficients.tolist(),
+                    }
+                    for label, (exponents, coefficients) in self.__terms.items()
+                },
+            },
+            strm,
+            indent=1,
+        )
+
+    @classmethod
+    def load(cls, strm):
+        data = json.load(strm)
+        if data.get("surrogate_type", None) != SURROGATE_TYPE:
+            raise ValueError(f"Not a {SURROGATE_TYPE} surrogate: {data.get('surrogate_type', None)}")
+        return cls(
+            data["input_labels"],
+            data["output_labels"],
+            {label: tuple(bounds) for label, bounds in data["input_bounds"].items()},
+            data["input_scale"],
+            {
+                label: (terms["exponents"], terms["coefficients"])
+                for label, terms in data["terms"].items()
+            },
+            data.get("errors", None),
+        )
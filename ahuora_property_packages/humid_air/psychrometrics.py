@@ -0,0 +1,176 @@
+from typing import Dict, NamedTuple
+import numpy as np
+from pyomo.environ import value
+
+from .HumidAirSurrogate import HAirParameterBlock, get_polynomial_surrogate
+from .polynomial_surrogate import PolynomialSurrogate
+
+"""
+Evaluates the humid air surrogate for arrays of state points with NumPy, without
+building a state block or calling a solver.
+
+Uses the same surrogate file and molecular weights as HAirParameterBlock, so the
+values match a solved HAirStateBlock at the same temperature, pressure and water
+mole fraction. All methods broadcast T (K), P (Pa) and the water mole fraction
+against each other, and return arrays of the broadcast shape.
+
+The surrogate output named relative_humidity follows the humidity ratio of the
+state (kg water per kg dry air) rather than a fraction of saturation, and it is
+returned as fitted. The mass based properties divide by the molecular weight of
+the humid air, whereas HAirStateBlock.vol_mass divides by the sum of x_i / mw_i.
+"""
+
+# Surrogate inputs that can be solved for, and their position in the input list
+UNKNOWNS = {"temperature": 0, "mole_frac_water": 2}
+
+
+class HumidAirProperties(NamedTuple):
+    relative_humidity: np.ndarray
+    temperature_wet_bulb: np.ndarray  # K
+    enth_mol: np.ndarray  # J/mol
+    entr_mol: np.ndarray  # J/mol/K
+    vol_mol: np.ndarray  # m^3/mol
+    mw: np.ndarray  # kg/mol of humid air
+    humidity_ratio: np.ndarray  # kg water / kg dry air
+    enth_mass: np.ndarray  # J/kg of humid air
+    vol_mass: np.ndarray  # m^3/kg of humid air
+
+
+class InverseResult(NamedTuple):
+    value: np.ndarray  # solved temperature or water mole fraction, nan if not converged
+    properties: HumidAirProperties
+    converged: np.ndarray  # bool
+    iterations: int
+
+
+class HumidAirEvaluator:
+
+    def __init__(self, surrogate: PolynomialSurrogate, mw_comp: Dict[str, float]):
+        """
+        Args:
+            surrogate (PolynomialSurrogate): Humid air surrogate, e.g. from get_polynomial_surrogate.
+            mw_comp (Dict[str, float]): Molecular weights of water and air in kg/mol.
+        """
+        self.surrogate = surrogate
+        self.output_labels = surrogate.output_labels()
+        self.mw_water = float(mw_comp["water"])
+        self.mw_air = float(mw_comp["air"])
+        bounds = surrogate.input_bounds()
+        labels = surrogate.input_labels()
+        # Bounds of each unknown, in surrogate input order
+        self.bounds = {name: tuple(bounds[labels[i]]) for name, i in UNKNOWNS.items()}
+
+    @classmethod
+    def from_package(cls, params=None) -> "HumidAirEvaluator":
+        """
+        Returns an evaluator with the surrogate file and molecular weights of a
+        HAirParameterBlock, or of a default one if params is not given.
+        """
+        if params is None:
+            params = HAirParameterBlock(concrete=True)
+        return cls(
+            get_polynomial_surrogate(params.config.surrogate_file),
+            {c: value(params.mw_comp[c]) for c in params.component_list},
+        )
+
+    def properties(self, T, P, mole_frac_water) -> HumidAirProperties:
+        """
+        Returns every property at each (T, P, water mole fraction) point.
+        """
+        T, P, x = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (T, P, mole_frac_water)))
+        outputs = self.surrogate.evaluate(self._inputs(T, P, x))
+        return self._properties(T.shape, x, outputs)
+
+    def solve(self, output: str, target, P, T=None, mole_frac_water=None,
+              tol: float = 1e-10, max_iter: int = 50) -> InverseResult:
+        """
+        Solves for the temperature or the water mole fraction that gives a target
+        value of a surrogate output, e.g. the water mole fraction at a relative
+        humidity, by Newton iteration kept inside a bracket of the input bounds.
+
+        Give exactly one of T and mole_frac_water, the other is solved for. Points
+        whose target cannot be reached within the input bounds are not converged.
+
+        Args:
+            output (str): One of relative_humidity, temperature_wet_bulb, enth_mol, entr_mol, vol_mol.
+            target (array_like): Target value of output.
+            P (array_like): Pressure in Pa.
+            T (array_like, optional): Temperature in K.
+            mole_frac_water (array_like, optional): Water mole fraction.
+            tol (float): Convergence tolerance on output, relative to max(1, |target|).
+            max_iter (int): Maximum Newton iterations.
+        """
+        if output not in self.output_labels:
+            raise ValueError(f"Unknown output {output}, expected one of {self.output_labels}")
+        if (T is None) == (mole_frac_water is None):
+            raise ValueError("Give exactly one of T and mole_frac_water")
+        unknown = "temperature" if T is None else "mole_frac_water"
+        known = mole_frac_water if T is None else T
+        target, P, known = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (target, P, known)))
+        shape = target.shape
+        target, P, known = target.ravel(), P.ravel(), known.ravel()
+        # The dry air fraction is one minus the water fraction
+        direction = np.array([1.0, 0, 0, 0]) if unknown == "temperature" else np.array([0, 0, 1.0, -1.0])
+
+        def residual(x):
+            T_, x_ = (x, known) if unknown == "temperature" else (known, x)
+            values, derivative = self.surrogate.directional_derivative(self._inputs(T_, P, x_), output, direction)
+            return values - target, derivative
+
+        low = np.full(target.shape, self.bounds[unknown][0])
+        high = np.full(target.shape, self.bounds[unknown][1])
+        f_low, _ = residual(low)
+        f_high, _ = residual(high)
+        # Also excludes points with nan inputs
+        bracketed = f_low * f_high <= 0
+        scale = tol * np.maximum(1.0, np.abs(target))
+
+        x = (low + high) / 2
+        converged = np.zeros(target.shape, dtype=bool)
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            f, df = residual(x)
+            converged = bracketed & (np.abs(f) <= scale)
+            if np.all(converged | ~bracketed):
+                break
+            # Keep the root between low and high
+            below = np.sign(f) == np.sign(f_low)
+            low = np.where(below, x, low)
+            f_low = np.where(below, f, f_low)
+            high = np.where(below, high, x)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = x - f / df
+            inside = np.isfinite(newton) & (newton > low) & (newton < high)
+            x = np.where(converged, x, np.where(inside, newton, (low + high) / 2))
+
+        x = np.where(converged, x, np.nan)
+        T_, x_ = (x, known) if unknown == "temperature" else (known, x)
+        return InverseResult(
+            x.reshape(shape),
+            self.properties(T_.reshape(shape), P.reshape(shape), x_.reshape(shape)),
+            converged.reshape(shape),
+            iterations,
+        )
+
+    def _inputs(self, T, P, x) -> np.ndarray:
+        # Surrogate inputs are temperature, pressure, water and dry air mole fractions
+        T, P, x = (np.ravel(v) for v in (T, P, x))
+        return np.column_stack([T, P, x, 1 - x])
+
+    def _properties(self, shape, x, outputs: np.ndarray) -> HumidAirProperties:
+        x = np.ravel(x)
+        mw = x * self.mw_water + (1 - x) * self.mw_air
+        with np.errstate(divide="ignore"):
+            humidity_ratio = x * self.mw_water / ((1 - x) * self.mw_air)
+        values = {label: outputs[:, i] for i, label in enumerate(self.output_labels)}
+        return HumidAirProperties(
+            values["relative_humidity"].reshape(shape),
+            values["temperature_wet_bulb"].reshape(shape),
+            values["enth_mol"].reshape(shape),
+            values["entr_mol"].reshape(shape),
+            values["vol_mol"].reshape(shape),
+            mw.reshape(shape),
+            humidity_ratio.reshape(shape),
+            (values["enth_mol"] / mw).reshape(shape),
+            (values["vol_mol"] / mw).reshape(shape),
+        )
@@ -0,0 +1,87 @@
+from typing import List
+import numpy as np
+from scipy.sparse import coo_matrix
+from pyomo.contrib.pynumero.interfaces.external_grey_box import ExternalGreyBoxModel
+
+from .polynomial_surrogate import PolynomialSurrogate
+
+"""
+Grey box form of a humid air PolynomialSurrogate. The outputs, their Jacobian and
+Hessian are evaluated with NumPy instead of being written out as Pyomo expressions,
+so building the model and writing it for the solver does not depend on how many
+terms the surrogate has.
+
+Grey box blocks are solved through PyNumero, e.g. with the cyipopt solver.
+"""
+
+
+class HumidAirGreyBox(ExternalGreyBoxModel):
+
+    def __init__(self, surrogate: PolynomialSurrogate, use_surrogate_bounds: bool = True):
+        """
+        Args:
+            surrogate (PolynomialSurrogate): Surrogate to evaluate, shared between blocks.
+            use_surrogate_bounds (bool): Tighten the bounds of the input variables to the
+                surrogate input bounds, as SurrogateBlock.build_model does.
+        """
+        self._surrogate = surrogate
+        self._use_surrogate_bounds = use_surrogate_bounds
+        self._inputs = np.zeros(surrogate.n_inputs())
+        self._multipliers = np.zeros(surrogate.n_outputs())
+        self._cached_inputs = None
+        self._cached = None
+
+    def input_names(self) -> List[str]:
+        return self._surrogate.input_labels()
+
+    def output_names(self) -> List[str]:
+        return self._surrogate.output_labels()
+
+    def finalize_block_construction(self, pyomo_block):
+        # Indexed by name, or by position if the block was given existing variables
+        input_vars = list(pyomo_block.inputs.values())
+        output_vars = list(pyomo_block.outputs.values())
+        bounds = self._surrogate.input_bounds()
+        if self._use_surrogate_bounds and bounds is not None:
+            for label, var in zip(self.input_names(), input_vars):
+                lb, ub = bounds[label]
+                var.setlb(lb if var.lb is None else max(lb, var.lb))
+                var.setub(ub if var.ub is None else min(ub, var.ub))
+        # Start the outputs consistent with the inputs
+        inputs = np.array([var.value for var in input_vars], dtype=float)
+        if not np.any(np.isnan(inputs)):
+            for var, value in zip(output_vars, self._surrogate.evaluate(inputs[None, :])[0]):
+                var.set_value(value, skip_validation=True)
+
+    def set_input_values(self, input_values):
+        self._inputs = np.asarray(input_values, dtype=float).copy()
+
+    def set_output_constraint_multipliers(self, output_con_multiplier_values):
+        self._multipliers = np.asarray(output_con_multiplier_values, dtype=float).copy()
+
+    def evaluate_outputs(self):
+        return self._evaluate()[0]
+
+    def evaluate_jacobian_outputs(self):
+        return _dense_to_coo(self._evaluate()[1])
+
+    def evaluate_hessian_outputs(self):
+        # Lower triangle of the multiplier weighted sum of output Hessians
+        hessian = np.tensordot(self._multipliers, self._evaluate()[2], axes=1)
+        rows, cols = np.tril_indices(hessian.shape[0])
+        return coo_matrix((hessian[rows, cols], (rows, cols)), shape=hessian.shape)
+
+    def _evaluate(self):
+        # One call gives outputs and both derivatives, which the solver asks for
+        # separately at the same point
+        if self._cached_inputs is None or not np.array_equal(self._cached_inputs, self._inputs):
+            outputs, jacobian, hessian = self._surrogate.derivatives(self._inputs[None, :], order=2)
+            self._cached = (outputs[0], jacobian[0], hessian[0])
+            self._cached_inputs = self._inputs.copy()
+        return self._cached
+
+
+def _dense_to_coo(matrix: np.ndarray) -> coo_matrix:
+    # Keep every entry, so the sparsity structure does not change between evaluations
+    rows, cols = np.indices(matrix.shape)
+    return coo_matrix((matrix.ravel(), (rows.ravel(), cols.ravel())), shape=matrix.shape)
@@ -0,0 +1,266 @@
+from fractions import Fraction
+from math import comb
+from typing import Dict, List, Tuple
+import argparse
+import json
+import re
+import numpy as np
+
+from .polynomial_surrogate import PolynomialSurrogate
+
+"""
+Reduces the PySMO humid air surrogate to a smaller PolynomialSurrogate.
+
+1. The PySMO polynomial (constant, pure powers, pairwise products and extra terms)
+   is rewritten as a sum of monomials, merging terms that are the same monomial.
+2. The dry air mole fraction is replaced by 1 - water mole fraction. The fitted
+   weights contain large pairs, e.g. +/-5.7e8, that only cancel because the two
+   mole fractions sum to one, and these collapse once the terms are merged.
+3. Inputs are scaled by their largest magnitude, so every scaled input is at most
+   one.
+
+Every step is exact where the mole fractions sum to one, and the smaller term count
+comes only from merging the terms after eliminating the dry air mole fraction. No
+terms are dropped: the smallest terms of most outputs still change them by more
+than 1e-3 of their magnitude over the input bounds.
+
+Usage:
+    python -m ahuora_property_packages.humid_air.surrogate_reduction [source] [target]
+"""
+
+# Input replaced by one minus another input, for the humid air surrogate
+HUMID_AIR_COMPLEMENT = {"mole_frac_da": "mole_frac_w"}
+
+DEFAULT_SAMPLES = 20000
+
+# Coefficients are summed exactly, the PySMO terms cancel to many significant figures
+Polynomial = Dict[Tuple[int, ...], Fraction]
+
+# "*IndexedParam[pressure]" or "/IndexedParam[temperature_dry_bulb]"
+FACTOR = re.compile(r"([*/]?)IndexedParam\[(\w+)\]")
+
+
+def read_pysmo(path: str) -> PolynomialSurrogate:
+    """
+    Reads a PySMO polynomial surrogate file as an unscaled PolynomialSurrogate.
+    """
+    with open(path, "r") as file:
+        data = json.load(file)
+    if data["surrogate_type"] != "poly":
+        raise ValueError(f"Only PySMO polynomial surrogates can be read, got {data['surrogate_type']}")
+
+    input_labels = data["input_labels"]
+    polynomials = {}
+    errors = {}
+    for label in data["output_labels"]:
+        attr = data["model_encoding"][label]["attr"]
+        if attr["regression_data_columns"] != input_labels:
+            raise ValueError(f"{label} was fitted on {attr['regression_data_columns']}, not {input_labels}")
+        rows = _pysmo_exponents(
+            len(input_labels),
+            int(attr["final_polynomial_order"]),
+            int(attr["multinomials"]),
+            [_parse_term(term, input_labels) for term in attr["additional_term_expressions"]],
+        )
+        weights = [weight[0] for weight in attr["optimal_weights_array"]]
+        if len(rows) != len(weights):
+            raise ValueError(f"{label} has {len(weights)} weights for {len(rows)} terms")
+        polynomial: Polynomial = {}
+        for row, weight in zip(rows, weights):
+            _add(polynomial, row, Fraction(weight))
+        polynomials[label] = polynomial
+        errors[label] = attr.get("errors", {})
+
+    return _surrogate(
+        input_labels,
+        data["output_labels"],
+        {label: tuple(bounds) for label, bounds in data["input_bounds"].items()},
+        {label: 1.0 for label in input_labels},
+        polynomials,
+        errors,
+    )
+
+
+def eliminate(surrogate: PolynomialSurrogate, complement: Dict[str, str]) -> PolynomialSurrogate:
+    """
+    Replaces each input in complement by one minus its paired input, e.g.
+    {"mole_frac_da": "mole_frac_w"}. The replaced input is kept, with zero exponents.
+    """
+    labels = surrogate.input_labels()
+    if any(surrogate.input_scale[label] != 1 for label in labels):
+        raise ValueError("Eliminate inputs before rescaling")
+    polynomials = _polynomials(surrogate)
+    for replaced, kept in complement.items():
+        r, k = labels.index(replaced), labels.index(kept)
+        for label, polynomial in polynomials.items():
+            new_polynomial: Polynomial = {}
+            for row, coefficient in polynomial.items():
+                power = row[r]
+                if power < 0:
+                    raise ValueError(f"Cannot eliminate {replaced} from a term with a negative power in {label}")
+                # (1 - x_k) ** power
+                for j in range(power + 1):
+                    new_row = list(row)
+                    new_row[r] = 0
+                    new_row[k] += j
+                    _add(new_polynomial, tuple(new_row), coefficient * comb(power, j) * (-1) ** j)
+            polynomials[label] = new_polynomial
+    return _surrogate(labels, surrogate.output_labels(), surrogate.input_bounds(), surrogate.input_scale,
+                      polynomials, surrogate.errors)
+
+
+def rescale(surrogate: PolynomialSurrogate, input_scale: Dict[str, float] = None) -> PolynomialSurrogate:
+    """
+    Changes the input scaling without changing the outputs. Defaults to the
+    largest magnitude of each input's bounds.
+    """
+    labels = surrogate.input_labels()
+    if input_scale is None:
+        input_scale = {
+            label: max(abs(bound) for bound in surrogate.input_bounds()[label]) or 1.0 for label in labels
+        }
+    ratio = [Fraction(input_scale[label]) / Fraction(surrogate.input_scale[label]) for label in labels]
+    polynomials = {
+        label: {row: coefficient * _product(ratio, row) for row, coefficient in polynomial.items()}
+        for label, polynomial in _polynomials(surrogate).items()
+    }
+    return _surrogate(labels, surrogate.output_labels(), surrogate.input_bounds(), input_scale,
+                      polynomials, surrogate.errors)
+
+
+def sample_inputs(surrogate, n: int = DEFAULT_SAMPLES, complement: Dict[str, str] = HUMID_AIR_COMPLEMENT,
+                  seed: int = 0) -> np.ndarray:
+    """
+    Returns n random points within the input bounds, shape (n, n_inputs), with
+    each input in complement set to one minus its paired input.
+    """
+    rng = np.random.default_rng(seed)
+    labels = surrogate.input_labels()
+    bounds = surrogate.input_bounds()
+    points = np.column_stack([rng.uniform(*bounds[label], n) for label in labels])
+    for replaced, kept in complement.items():
+        points[:, labels.index(replaced)] = 1 - points[:, labels.index(kept)]
+    return points
+
+
+def max_errors(reference, surrogate, inputs: np.ndarray) -> Dict[str, Tuple[float, float]]:
+    """
+    Returns the (absolute, relative to the largest output magnitude) maximum
+    difference between two surrogates at inputs, for each output.
+    """
+    expected = evaluate(reference, inputs)
+    actual = evaluate(surrogate, inputs)
+    scale = np.max(np.abs(expected), axis=0)
+    error = np.max(np.abs(actual - expected), axis=0)
+    return {label: (float(error[j]), float(error[j] / scale[j]))
+            for j, label in enumerate(reference.output_labels())}
+
+
+def evaluate(surrogate, inputs: np.ndarray) -> np.ndarray:
+    """
+    Evaluates a PolynomialSurrogate or PysmoSurrogate at inputs, shape (n, n_inputs).
+    """
+    if isinstance(surrogate, PolynomialSurrogate):
+        return surrogate.evaluate(inputs)
+    import pandas as pd
+
+    inputs = pd.DataFrame(np.asarray(inputs, dtype=float), columns=surrogate.input_labels())
+    return surrogate.evaluate_surrogate(inputs).to_numpy()
+
+
+def read_eliminated(source: str, complement: Dict[str, str] = HUMID_AIR_COMPLEMENT) -> PolynomialSurrogate:
+    """
+    Reads a PySMO polynomial surrogate with the complement inputs eliminated and the
+    inputs rescaled. Where the complement inputs sum to one this is the source
+    surrogate exactly.
+    """
+    return rescale(eliminate(read_pysmo(source), complement))
+
+
+def reduce_surrogate(source: str, target: str = None,
+                     complement: Dict[str, str] = HUMID_AIR_COMPLEMENT) -> PolynomialSurrogate:
+    """
+    Reads a PySMO polynomial surrogate with the complement inputs eliminated and the
+    inputs rescaled, and writes it to target if given. The errors of the PySMO fit
+    are kept.
+    """
+    reduced = read_eliminated(source, complement)
+    if target is not None:
+        reduced.save_to_file(target, overwrite=True)
+    return reduced
+
+
+def _pysmo_exponents(n: int, order: int, multinomials: int, extra: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+    # Same order as PolynomialRegression.polygeneration
+    rows = [(0,) * n]
+    for power in range(1, order + 1):
+        for i in range(n):
+            rows.append(tuple(power if k == i else 0 for k in range(n)))
+    if multinomials == 1:
+        for i in range(n):
+            for j in range(i):
+                rows.append(tuple(1 if k in (i, j) else 0 for k in range(n)))
+    return rows + extra
+
+
+def _parse_term(term: str, input_labels: List[str]) -> Tuple[int, ...]:
+    row = [0] * len(input_labels)
+    position = 0
+    for match in FACTOR.finditer(term):
+        if match.start() != position:
+            raise ValueError(f"Only products and quotients of inputs are supported: {term}")
+        row[input_labels.index(match.group(2))] += -1 if match.group(1) == "/" else 1
+        position = match.end()
+    if position != len(term):
+        raise ValueError(f"Only products and quotients of inputs are supported: {term}")
+    return tuple(row)
+
+
+def _add(polynomial: Polynomial, row: Tuple[int, ...], coefficient: Fraction):
+    polynomial[row] = polynomial.get(row, 0) + coefficient
+
+
+def _product(values: List[Fraction], powers: Tuple[int, ...]) -> Fraction:
+    result = Fraction(1)
+    for value, power in zip(values, powers):
+        result *= value ** power
+    return result
+
+
+def _polynomials(surrogate: PolynomialSurrogate) -> Dict[str, Polynomial]:
+    polynomials = {}
+    for label in surrogate.output_labels():
+        exponents, coefficients = surrogate.terms(label)
+        polynomials[label] = {tuple(int(p) for p in row): Fraction(float(c)) for row, c in zip(exponents, coefficients)}
+    return polynomials
+
+
+def _surrogate(input_labels, output_labels, input_bounds, input_scale, polynomials: Dict[str, Polynomial], errors):
+    terms = {}
+    for label in output_labels:
+        # Merged terms can cancel exactly
+        items = [(row, c) for row, c in polynomials[label].items() if c != 0]
+        terms[label] = (
+            np.array([row for row, _ in items], dtype=int).reshape(-1, len(input_labels)),
+            np.array([float(c) for _, c in items], dtype=float),
+        )
+    return PolynomialSurrogate(input_labels, output_labels, input_bounds, input_scale, terms, errors)
+
+
+def main():
+    from .HumidAirSurrogate import SURROGATE_PATH, REDUCED_SURROGATE_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", nargs="?", default=SURROGATE_PATH)
+    parser.add_argument("target", nargs="?", default=REDUCED_SURROGATE_PATH)
+    args = parser.parse_args()
+
+    original = read_pysmo(args.source)
+    reduced = reduce_surrogate(args.source, args.target)
+    for label in reduced.output_labels():
+        print(f"{label:>22}: {original.n_terms()[label]:3d} -> {reduced.n_terms()[label]:3d} terms")
+    print(f"written to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,3 +38,15 @@ def testConstraints(): ##not expected to do anything at this stage
 
     solver = get_solver("ipopt")
     solver.solve(m)
+
+def testSharedSurrogate():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_package("humid_air", ["water", "air"])
+    m.fs.properties2 = build_package("humid_air", ["water", "air"])
+    m.fs.sb = m.fs.properties.build_state_block([0, 1, 2])
+    # Loaded once per process, not once per state block
+    assert m.fs.properties.pysmo_surrogate is m.fs.properties2.pysmo_surrogate
+    for sb in m.fs.sb.values():
+        assert not hasattr(sb, "pysmo_surrogate")
+        assert sb.surrogate.find_component("pysmo_constraint") is not None
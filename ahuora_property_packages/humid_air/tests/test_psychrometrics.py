@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from pyomo.environ import ConcreteModel, value
+from idaes.core import FlowsheetBlock
+from ahuora_property_packages.humid_air.HumidAirSurrogate import HAirParameterBlock, REDUCED_SURROGATE_PATH
+from ahuora_property_packages.humid_air.psychrometrics import HumidAirEvaluator
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    return HumidAirEvaluator.from_package()
+
+
+def test_properties_match_state_block():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = HAirParameterBlock(surrogate_file=REDUCED_SURROGATE_PATH)
+    m.fs.sb = m.fs.properties.build_state_block()
+    evaluator = HumidAirEvaluator.from_package(m.fs.properties)
+
+    point = [320.0, 101325.0, 0.05, 0.95]
+    m.fs.sb.temperature.set_value(point[0])
+    m.fs.sb.pressure.set_value(point[1])
+    m.fs.sb.mole_frac_comp["water"].set_value(point[2])
+    m.fs.sb.mole_frac_comp["air"].set_value(point[3])
+    props = evaluator.properties(point[0], point[1], point[2])
+    for label in evaluator.output_labels:
+        output = m.fs.sb.surrogate.output_vars_as_dict()[label]
+        output.set_value(0, skip_validation=True)
+        # The constraint body is output - expression
+        expected = -value(m.fs.sb.surrogate.polynomial_constraint[label].body)
+        assert getattr(props, label) == pytest.approx(expected, rel=1e-9), label
+    mw_comp = m.fs.properties.mw_comp
+    assert props.mw == pytest.approx(point[2] * value(mw_comp["water"]) + point[3] * value(mw_comp["air"]))
+
+
+def test_properties_broadcast(evaluator):
+    T = np.linspace(290, 350, 7)[:, None]
+    x = np.linspace(0.0, 0.1, 3)[None, :]
+    props = evaluator.properties(T, 101325, x)
+    assert props.enth_mol.shape == (7, 3)
+    assert np.allclose(props.enth_mol[:, 1], evaluator.properties(T[:, 0], 101325, x[0, 1]).enth_mol, rtol=1e-14)
+    assert np.all(props.humidity_ratio[:, 0] == 0)
+
+
+def test_solve_mole_frac_water(evaluator):
+    T = np.linspace(280, 360, 20)[:, None]
+    target = np.linspace(0.005, 0.1, 5)[None, :]
+    result = evaluator.solve("relative_humidity", target, 101325, T=T)
+    assert result.value.shape == (20, 5)
+    assert np.all(result.converged)
+    assert np.allclose(result.properties.relative_humidity, target, rtol=0, atol=1e-9)
+
+
+def test_solve_temperature_round_trip(evaluator):
+    T = np.linspace(280, 360, 20)
+    x = np.full(20, 0.03)
+    enth_mol = evaluator.properties(T, 101325, x).enth_mol
+    result = evaluator.solve("enth_mol", enth_mol, 101325, mole_frac_water=x)
+    assert np.all(result.converged)
+    assert np.allclose(result.value, T, rtol=0, atol=1e-8)
+
+
+def test_solve_unreachable(evaluator):
+    T = evaluator.bounds["temperature"]
+    too_hot = evaluator.properties(T[1], 101325, 0.03).enth_mol + 1e5
+    result = evaluator.solve("enth_mol", [too_hot, np.nan], 101325, mole_frac_water=0.03)
+    assert not np.any(result.converged)
+    assert np.all(np.isnan(result.value))
+
+
+def test_solve_arguments(evaluator):
+    with pytest.raises(ValueError):
+        evaluator.solve("enth_mol", 0, 101325)
+    with pytest.raises(ValueError):
+        evaluator.solve("enth_mol", 0, 101325, T=300, mole_frac_water=0.01)
+    with pytest.raises(ValueError):
+        evaluator.solve("humidity_ratio", 0.01, 101325, T=300)
+
+
+def test_directional_derivative(evaluator):
+    surrogate = evaluator.surrogate
+    points = evaluator._inputs(np.full(5, 320.0), np.full(5, 101325.0), np.linspace(0, 0.2, 5))
+    outputs, jacobian = surrogate.derivatives(points)
+    for direction in (np.array([1.0, 0, 0, 0]), np.array([0, 0, 1.0, -1.0])):
+        for j, label in enumerate(surrogate.output_labels()):
+            values, derivative = surrogate.directional_derivative(points, label, direction)
+            assert np.allclose(values, outputs[:, j], rtol=1e-12)
+            assert np.allclose(derivative, jacobian[:, j] @ direction, rtol=1e-10, atol=1e-12)
@@ -0,0 +1,62 @@
+import numpy as np
+from pyomo.environ import ConcreteModel, Constraint
+from pyomo.contrib.pynumero.interfaces.external_grey_box import ExternalGreyBoxBlock
+from idaes.core import FlowsheetBlock
+from ahuora_property_packages.humid_air.HumidAirSurrogate import (
+    HAirParameterBlock,
+    SURROGATE_PATH,
+    get_polynomial_surrogate,
+)
+from ahuora_property_packages.humid_air.surrogate_grey_box import HumidAirGreyBox
+
+POINTS = np.array([
+    [320.0, 101325.0, 0.05, 0.95],
+    [500.0, 400000.0, 0.15, 0.85],
+    # Dry air, the derivatives must not divide by the water fraction
+    [300.0, 101325.0, 0.0, 1.0],
+])
+
+
+def test_derivatives():
+    surrogate = get_polynomial_surrogate(SURROGATE_PATH)
+    outputs, jacobian, hessian = surrogate.derivatives(POINTS, order=2)
+    assert np.allclose(outputs, surrogate.evaluate(POINTS), rtol=1e-12)
+    assert np.all(np.isfinite(jacobian)) and np.all(np.isfinite(hessian))
+
+    steps = np.array([1e-3, 1.0, 1e-6, 1e-6])
+    for i, step in enumerate(steps):
+        delta = np.zeros(len(steps))
+        delta[i] = step
+        fd_jacobian = (surrogate.evaluate(POINTS + delta) - surrogate.evaluate(POINTS - delta)) / (2 * step)
+        assert np.allclose(jacobian[:, :, i], fd_jacobian, rtol=1e-5, atol=1e-8)
+        fd_hessian = (surrogate.derivatives(POINTS + delta)[1] - surrogate.derivatives(POINTS - delta)[1]) / (2 * step)
+        assert np.allclose(hessian[:, :, :, i], fd_hessian, rtol=1e-5, atol=1e-8)
+
+
+def test_grey_box_model():
+    surrogate = get_polynomial_surrogate(SURROGATE_PATH)
+    model = HumidAirGreyBox(surrogate)
+    outputs, jacobian, hessian = surrogate.derivatives(POINTS[:1], order=2)
+
+    model.set_input_values(POINTS[0])
+    assert np.array_equal(model.evaluate_outputs(), outputs[0])
+    assert np.array_equal(model.evaluate_jacobian_outputs().toarray(), jacobian[0])
+
+    multipliers = np.arange(1.0, surrogate.n_outputs() + 1)
+    model.set_output_constraint_multipliers(multipliers)
+    expected = np.tril(np.tensordot(multipliers, hessian[0], axes=1))
+    assert np.allclose(model.evaluate_hessian_outputs().toarray(), expected)
+
+
+def test_grey_box_state_block():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = HAirParameterBlock(surrogate_mode="grey_box")
+    m.fs.sb = m.fs.properties.build_state_block([0, 1])
+    for sb in m.fs.sb.values():
+        assert isinstance(sb.surrogate, ExternalGreyBoxBlock)
+        assert next(sb.surrogate.component_data_objects(Constraint), None) is None
+        # Inputs and outputs are the state block variables themselves
+        assert sb.surrogate.inputs[0] is sb.temperature
+        assert sb.surrogate.outputs[2] is sb.enth_mol
+        assert sb.temperature.bounds == (273.15, 673.15)
@@ -0,0 +1,86 @@
+from fractions import Fraction
+import io
+import numpy as np
+from pyomo.environ import ConcreteModel, value
+from idaes.core import FlowsheetBlock
+from ahuora_property_packages.humid_air import surrogate_reduction
+from ahuora_property_packages.humid_air.polynomial_surrogate import PolynomialSurrogate
+from ahuora_property_packages.humid_air.HumidAirSurrogate import (
+    HAirParameterBlock,
+    REDUCED_SURROGATE_PATH,
+    SURROGATE_PATH,
+    get_surrogate,
+)
+
+
+def exact_value(surrogate, label, inputs):
+    exponents, coefficients = surrogate.terms(label)
+    scaled = [Fraction(x) / Fraction(surrogate.input_scale[name]) for x, name in zip(inputs, surrogate.input_labels())]
+    total = Fraction(0)
+    for row, coefficient in zip(exponents, coefficients):
+        term = Fraction(float(coefficient))
+        for x, power in zip(scaled, row):
+            term *= x ** int(power)
+        total += term
+    return float(total)
+
+
+def test_read_pysmo():
+    original = get_surrogate(SURROGATE_PATH)
+    polynomial = surrogate_reduction.read_pysmo(SURROGATE_PATH)
+    inputs = surrogate_reduction.sample_inputs(polynomial, 200)
+    expected = surrogate_reduction.evaluate(original, inputs)
+    actual = polynomial.evaluate(inputs)
+    for j, label in enumerate(polynomial.output_labels()):
+        # The PySMO terms cancel badly, so the two only agree to within the
+        # rounding error of summing the terms in floating point
+        exponents, coefficients = polynomial.terms(label)
+        term_sum = np.abs(np.prod(inputs[:, None, :] ** exponents[None, :, :], axis=2)) @ np.abs(coefficients)
+        assert np.all(np.abs(actual[:, j] - expected[:, j]) <= 1e-14 * len(coefficients) * term_sum), label
+
+
+def test_eliminate_is_exact():
+    original = surrogate_reduction.read_pysmo(SURROGATE_PATH)
+    reduced = surrogate_reduction.rescale(
+        surrogate_reduction.eliminate(original, surrogate_reduction.HUMID_AIR_COMPLEMENT)
+    )
+    # Dry air fraction is 1 - water fraction exactly for these values
+    points = [[300.0, 101325.0, 0.125, 0.875], [550.0, 600000.0, 0.0625, 0.9375]]
+    for point in points:
+        outputs = reduced.evaluate(np.array([point]))[0]
+        for j, label in enumerate(reduced.output_labels()):
+            expected = exact_value(original, label, point)
+            assert abs(outputs[j] - expected) <= 1e-9 * max(1.0, abs(expected)), label
+    assert all(reduced.n_terms()[label] < original.n_terms()[label] for label in original.output_labels())
+
+
+def test_save_load():
+    reduced = surrogate_reduction.reduce_surrogate(SURROGATE_PATH)
+    stream = io.StringIO()
+    reduced.save(stream)
+    stream.seek(0)
+    loaded = PolynomialSurrogate.load(stream)
+    inputs = surrogate_reduction.sample_inputs(reduced, 50)
+    assert np.array_equal(loaded.evaluate(inputs), reduced.evaluate(inputs))
+    assert loaded.input_scale == reduced.input_scale
+
+
+def test_state_block_with_reduced_surrogate():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = HAirParameterBlock(surrogate_file=REDUCED_SURROGATE_PATH)
+    m.fs.sb = m.fs.properties.build_state_block()
+    surrogate = m.fs.properties.pysmo_surrogate
+    assert isinstance(surrogate, PolynomialSurrogate)
+
+    point = [320.0, 101325.0, 0.05, 0.95]
+    m.fs.sb.temperature.set_value(point[0])
+    m.fs.sb.pressure.set_value(point[1])
+    m.fs.sb.mole_frac_comp["water"].set_value(point[2])
+    m.fs.sb.mole_frac_comp["air"].set_value(point[3])
+    expected = surrogate.evaluate(np.array([point]))[0]
+    for j, label in enumerate(surrogate.output_labels()):
+        m.fs.sb.surrogate.output_vars_as_dict()[label].set_value(0, skip_validation=True)
+        # The constraint body is output - expression
+        actual = -value(m.fs.sb.surrogate.polynomial_constraint[label].body)
+        assert abs(actual - expected[j]) <= 1e-9 * max(1.0, abs(expected[j])), label
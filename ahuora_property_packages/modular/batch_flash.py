@@ -0,0 +1,195 @@
+from time import perf_counter
+from typing import Dict, List
+import numpy as np
+from pyomo.environ import Block, Param, Var, value, check_optimal_termination
+from pyomo.common.modeling import unique_component_name
+from idaes.core.solvers import get_solver
+from idaes.core.util.exceptions import InitializationError
+
+"""
+Flashes many state points through a single reused state block.
+
+Points are solved in continuation order: each point starts from the converged
+values of the nearest point solved so far, and is only initialized from scratch
+if there is no converged neighbour or the warm started solve fails.
+"""
+
+# Spec that pairs with pressure, in the order they are checked
+SPECS = ["temperature", "enth_mol", "vapor_frac"]
+
+RESULT_DTYPE = [
+    ("temperature", float),
+    ("pressure", float),
+    ("enth_mol", float),
+    ("entr_mol", float),
+    ("vapor_frac", float),
+    ("converged", bool),
+    ("initialized", bool),  # True if the point needed a full initialization
+    ("warm_start", int),  # index of the point used as the starting guess, -1 if none
+    ("order", int),  # position in the solve order
+    ("time", float),  # seconds spent on this point
+    ("termination", "U32"),
+]
+
+
+def batch_flash(params, pressure, mole_frac_comp, temperature=None, enth_mol=None, vapor_frac=None,
+                solver=None, optarg=None) -> np.recarray:
+    """
+    Flashes many state points with one state block of a parameter block.
+
+    Args:
+        params: A constructed GenericExtendedParameterBlock that is part of a model.
+        pressure (array_like): Pressure of each point in Pa, shape (n,).
+        mole_frac_comp (array_like): Overall mole fractions, shape (n, nc), or (nc,) for every point.
+        temperature (array_like, optional): Temperature of each point in K, for a T/P flash.
+        enth_mol (array_like, optional): Molar enthalpy of each point in J/mol, for a P/H flash.
+        vapor_frac (array_like, optional): Vapor fraction of each point, for a P/vapor fraction flash.
+        solver (str, optional): Solver name, defaults to the IDAES default solver.
+        optarg (dict, optional): Solver options.
+
+    Returns:
+        np.recarray: One record per point, in the order given, see RESULT_DTYPE.
+
+    Raises:
+        ValueError: If not exactly one of temperature, enth_mol and vapor_frac is given.
+    """
+    given = {name: spec for name, spec in zip(SPECS, [temperature, enth_mol, vapor_frac]) if spec is not None}
+    if len(given) != 1:
+        raise ValueError(f"Give pressure and exactly one of {SPECS}, got {list(given)}")
+    spec_name, spec = given.popitem()
+
+    spec = np.atleast_1d(np.asarray(spec, dtype=float))
+    pressure = np.broadcast_to(np.asarray(pressure, dtype=float).reshape(-1), spec.shape)
+    mole_frac_comp = np.broadcast_to(np.atleast_2d(np.asarray(mole_frac_comp, dtype=float)),
+                                     (spec.shape[0], len(params.component_list)))
+
+    if spec.shape[0] == 0:
+        return np.recarray(0, dtype=RESULT_DTYPE)
+
+    model = params.parent_block()
+    if model is None:
+        raise ValueError("The parameter block must be part of a model, e.g. m.fs.properties")
+
+    # Scratch block next to the parameter block, removed once the batch is done
+    name = unique_component_name(model, "_batch_flash")
+    model.add_component(name, Block())
+    batch = getattr(model, name)
+    try:
+        return _solve_batch(params, batch, spec_name, spec, pressure, mole_frac_comp, solver, optarg)
+    finally:
+        model.del_component(batch)
+
+
+def continuation_order(points: np.ndarray) -> List[int]:
+    """
+    Greedy nearest neighbour ordering of points, starting from the first point
+    after sorting, with each column scaled to [0, 1].
+
+    Args:
+        points (np.ndarray): Shape (n, d).
+
+    Returns:
+        List[int]: Indices of points in solve order.
+    """
+    points = _scale(points)
+    n = points.shape[0]
+    if n == 0:
+        return []
+    remaining = np.ones(n, dtype=bool)
+    current = int(np.lexsort(points.T[::-1])[0])
+    order = [current]
+    remaining[current] = False
+    for _ in range(n - 1):
+        distance = np.sum((points - points[current]) ** 2, axis=1)
+        distance[~remaining] = np.inf
+        current = int(np.argmin(distance))
+        order.append(current)
+        remaining[current] = False
+    return order
+
+
+def _solve_batch(params, batch, spec_name, spec, pressure, mole_frac_comp, solver, optarg) -> np.recarray:
+    batch.state = params.build_state_block([0], defined_state=True)
+    sb = batch.state[0]
+
+    sb.flow_mol.fix(1)
+    if spec_name != "temperature":
+        # Mutable target, so the same constraint is reused for every point
+        batch.spec = Param(initialize=float(spec[0]), mutable=True)
+        sb.constrain_component(getattr(sb, spec_name), batch.spec)
+
+    opt = get_solver(solver, optarg)
+    variables = list(sb.component_data_objects(Var, descend_into=True))
+
+    points = np.column_stack([spec, pressure, mole_frac_comp])
+    scaled = _scale(points)
+    order = continuation_order(points)
+
+    results = np.recarray(len(spec), dtype=RESULT_DTYPE)
+    results.warm_start = -1
+    converged_points: List[int] = []
+    snapshots: Dict[int, np.ndarray] = {}
+
+    for position, i in enumerate(order):
+        start = perf_counter()
+
+        sb.pressure.fix(pressure[i])
+        for j, component in enumerate(params.component_list):
+            sb.mole_frac_comp[component].fix(mole_frac_comp[i, j])
+        if spec_name == "temperature":
+            sb.temperature.fix(spec[i])
+        else:
+            batch.spec.set_value(spec[i])
+
+        warm_start = -1
+        if converged_points:
+            neighbours = np.array(converged_points)
+            warm_start = int(neighbours[np.argmin(np.sum((scaled[neighbours] - scaled[i]) ** 2, axis=1))])
+            _restore(variables, snapshots[warm_start])
+
+        converged, termination, initialized = False, "", False
+        if warm_start >= 0:
+            converged, termination = _solve(opt, batch)
+        if not converged:
+            initialized = True
+            try:
+                batch.state.initialize(solver=solver, optarg=optarg)
+                converged, termination = _solve(opt, batch)
+            except InitializationError:
+                termination = "initialization failed"
+
+        if converged:
+            converged_points.append(i)
+            snapshots[i] = np.array([v.value if v.value is not None else np.nan for v in variables])
+
+        results[i] = (
+            value(sb.temperature),
+            pressure[i],
+            value(sb.enth_mol),
+            value(sb.entr_mol),
+            value(sb.vapor_frac),
+            converged,
+            initialized,
+            warm_start,
+            position,
+            perf_counter() - start,
+            termination,
+        )
+
+    return results
+
+
+def _solve(opt, block):
+    res = opt.solve(block)
+    return check_optimal_termination(res), str(res.solver.termination_condition)
+
+
+def _restore(variables, snapshot: np.ndarray):
+    for var, val in zip(variables, snapshot):
+        if not var.fixed and not np.isnan(val):
+            var.set_value(val, skip_validation=True)
+
+
+def _scale(points: np.ndarray) -> np.ndarray:
+    span = points.max(axis=0) - points.min(axis=0)
+    return (points - points.min(axis=0)) / np.where(span > 0, span, 1)
@@ -1,5 +1,5 @@
 from math import floor
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 from .base_parser import BuildBase
 from ahuora_compounds.Compound import Compound
 from pyomo.environ import units as pyunits
@@ -11,9 +11,8 @@ from idaes.models.properties.modular_properties.phase_equil.forms import log_fug
 from idaes.models.properties.modular_properties.eos.ceos import Cubic, CubicType
 from idaes.models.properties.modular_properties.pure import RPP4, Perrys
 from ahuora_property_packages.modular.builder.data.chem_sep import ChemSep
-from pyomo.common.fileutils import this_file_dir
 from ahuora_property_packages.types import States
-import csv
+from .interaction_table import get_interaction_table
 
 class base_units_parser(BuildBase):
     @staticmethod
@@ -265,39 +264,21 @@ class temperature_ref_parser(BuildBase):
 
 class pr_kappa_parser(BuildBase):
     @staticmethod
-    def serialise(compounds: List[Compound], valid_states: List[States]) -> Dict[str, Any]:
-        kappa_parameters = {}
-        compound_id_map = {}
+    def serialise(compounds: List[Compound], valid_states: List[States], temperature_range: Tuple[float, float] = None) -> Dict[str, Any]:
+        """
+        Args:
+            temperature_range (Tuple[float, float], optional): Operating window in K. Where pr.dat has
+                several values for a pair, use the one measured over a range covering this window.
+        """
+        # Interaction data is read from pr.dat once and indexed by LibraryIndex pair
+        table = get_interaction_table()
+        ids = [floor(compound["LibraryIndex"].value) for compound in compounds]
+        kappa = table.matrix(ids, temperature_range)
 
+        # Missing interactions are zero
+        kappa_parameters = {}
         for i, compound1 in enumerate(compounds):
-            compound_id_map[str(floor(compound1["LibraryIndex"].value))] = compound1
             for j, compound2 in enumerate(compounds):
-                kappa_parameters[(compound1["CompoundID"].value, compound2["CompoundID"].value)] = 0.000
-                # Setting all interactions initially to zero
-
-        # TODO: Adjust method so the multiple kappa values for single pair are supported
-        # Open and read the interaction data file
-        file = open(this_file_dir() + "/data/pr.dat", 'r')
-        reader = csv.reader(file, delimiter=';')
-        for row in reader:
-
-            # Skip invalid rows
-            if len(row) < 4:
-                continue
-            
-            # Extract ID1, ID2, kappa (k12) and comment
-            id1, id2, kappa, _ = row
-
-            try:
-                kappa_value = float(kappa)
-            except ValueError:
-                continue
-
-            # Check if the compound IDs exist in the compound list
-            if id1 in compound_id_map and id2 in compound_id_map:
-                compound1 = compound_id_map[id1]
-                compound2 = compound_id_map[id2]
-                kappa_parameters[(compound1["CompoundID"].value, compound2["CompoundID"].value)] = kappa_value
-                kappa_parameters[(compound2["CompoundID"].value, compound1["CompoundID"].value)] = kappa_value
+                kappa_parameters[(compound1["CompoundID"].value, compound2["CompoundID"].value)] = float(kappa[i, j])
 
         return {"PR_kappa": kappa_parameters}
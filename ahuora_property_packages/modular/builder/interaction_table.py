@@ -0,0 +1,140 @@
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from pyomo.common.fileutils import this_file_dir
+import csv
+import os
+import re
+import numpy as np
+
+"""
+Peng-Robinson binary interaction parameters from the ChemSep pr.dat library,
+indexed by ChemSep LibraryIndex pair.
+
+pr.dat can list several k12 values for the same pair, measured over different
+temperature ranges (given in the comment, e.g. "Hydrogen/Nitrogen T=90-113K p210").
+All of them are kept, in file order.
+"""
+
+PR_DAT_PATH = os.path.join(this_file_dir(), "data", "pr.dat")
+
+# "T=90-113K" or "T=77.35K"
+TEMPERATURE_RANGE = re.compile(r"T=\s*(\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*K")
+
+
+class Interaction(NamedTuple):
+    kappa: float
+    comment: str
+    temperature_min: float | None
+    temperature_max: float | None
+
+    def covers(self, temperature_range: Tuple[float, float]) -> bool:
+        """
+        True if the temperature range of this entry contains the whole of temperature_range.
+        """
+        if self.temperature_min is None:
+            return False
+        low, high = temperature_range
+        return self.temperature_min <= low and high <= self.temperature_max
+
+
+class InteractionTable:
+
+    def __init__(self, path: str = PR_DAT_PATH):
+        """
+        Reads every valid row of a pr.dat file.
+
+        Args:
+            path (str): Path to a ChemSep interaction parameter file, rows of "id1;id2;k12;comment".
+        """
+        self.__pairs: Dict[Tuple[int, int], List[Interaction]] = {}
+
+        with open(path, "r") as file:
+            for row in csv.reader(file, delimiter=";"):
+                # Skip invalid rows, e.g. the header
+                if len(row) < 4:
+                    continue
+                id1, id2, kappa, comment = row[:4]
+                try:
+                    key = pair_key(int(id1), int(id2))
+                    kappa_value = float(kappa)
+                except ValueError:
+                    continue
+                self.__pairs.setdefault(key, []).append(
+                    Interaction(kappa_value, comment.strip(), *parse_temperature_range(comment))
+                )
+
+    def __len__(self) -> int:
+        return len(self.__pairs)
+
+    def entries(self, id1: int, id2: int) -> List[Interaction]:
+        """
+        Returns all entries for a pair of LibraryIndex values, in file order. The pair is unordered.
+        """
+        return list(self.__pairs.get(pair_key(id1, id2), []))
+
+    def lookup(self, id1: int, id2: int, temperature_range: Tuple[float, float] = None) -> float | None:
+        """
+        Returns k12 for a pair of LibraryIndex values, or None if the pair is not in the table.
+
+        Args:
+            id1 (int): LibraryIndex of the first compound.
+            id2 (int): LibraryIndex of the second compound.
+            temperature_range (Tuple[float, float], optional): Operating window in K. If given,
+                the narrowest entry whose temperature range covers the window is used.
+
+        Returns:
+            float | None: The last entry for the pair in pr.dat, unless an entry covers temperature_range.
+        """
+        entries = self.__pairs.get(pair_key(id1, id2), None)
+        if not entries:
+            return None
+        if temperature_range is not None:
+            covering = [entry for entry in entries if entry.covers(temperature_range)]
+            if covering:
+                return min(covering, key=lambda entry: entry.temperature_max - entry.temperature_min).kappa
+        return entries[-1].kappa
+
+    def matrix(self, ids: Iterable[int], temperature_range: Tuple[float, float] = None) -> np.ndarray:
+        """
+        Returns the symmetric k_ij matrix for a list of LibraryIndex values, with zeros for
+        missing pairs and on the diagonal.
+        """
+        ids = list(ids)
+        kappa = np.zeros((len(ids), len(ids)))
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                value = self.lookup(ids[i], ids[j], temperature_range)
+                if value is not None:
+                    kappa[i, j] = kappa[j, i] = value
+        return kappa
+
+
+def pair_key(id1: int, id2: int) -> Tuple[int, int]:
+    return (id1, id2) if id1 <= id2 else (id2, id1)
+
+
+def parse_temperature_range(comment: str) -> Tuple[float | None, float | None]:
+    """
+    Returns the (min, max) temperature in K given in a pr.dat comment, or (None, None).
+    A single temperature gives min == max.
+    """
+    match = TEMPERATURE_RANGE.search(comment)
+    if match is None:
+        return None, None
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) is not None else low
+    return low, high
+
+
+_tables: Dict[str, Tuple[int, InteractionTable]] = {}
+
+
+def get_interaction_table(path: str = PR_DAT_PATH) -> InteractionTable:
+    """
+    Returns the InteractionTable for path. The file is only read again if it has been modified.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _tables.get(path, None)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, InteractionTable(path))
+        _tables[path] = cached
+    return cached[1]
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+import os
+from pyomo.common.fileutils import this_file_dir
+
+"""
+LRU cache of serialised property package templates, so that building the same
+package repeatedly skips the template parsers.
+
+Entries are keyed by package name, sorted compound names, valid states and a
+digest of the data files the parsers read, so editing e.g. pr.dat invalidates
+every entry that was built from the old file.
+"""
+
+# Data files read by the template parsers
+DATA_FILES = [
+    os.path.join(this_file_dir(), "builder", "data", "pr.dat"),
+]
+
+DEFAULT_MAXSIZE = 64
+
+
+class ConfigCache:
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Tuple, Tuple[Dict[str, Any], Dict[str, str]]] = OrderedDict()
+        self.__lock = Lock()
+        self.__digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+    def key(self, package_name: str, compound_names: List[str], valid_states: List[str], *options) -> Tuple:
+        """
+        Returns the cache key for a build_config call. Any build options that change
+        the template, e.g. the interaction parameter temperature range, go in options.
+        """
+        return (
+            package_name.lower(),
+            tuple(sorted(compound_names)),
+            tuple(valid_states),
+            options,
+            self.data_digest(),
+        )
+
+    def data_digest(self) -> str:
+        """
+        Returns a digest of the DATA_FILES contents. Files are only re-hashed when
+        their size or modification time changes.
+        """
+        digest = sha256()
+        for path in DATA_FILES:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = self.__digests.get(path, None)
+            if cached is None or cached[0] != signature:
+                with open(path, "rb") as file:
+                    cached = (signature, sha256(file.read()).hexdigest())
+                self.__digests[path] = cached
+            digest.update(cached[1].encode())
+        return digest.hexdigest()
+
+    def get(self, key: Tuple, compound_names: List[str]) -> Dict[str, Any] | None:
+        """
+        Returns a copy of the cached template for key, with its components in the
+        order of compound_names, or None if there is no entry.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+
+        template, component_ids = entry
+        new_template = copy_template(template)
+        # The key ignores compound order, but component order is kept as requested
+        components = new_template["components"]
+        new_template["components"] = {
+            component_ids[name]: components[component_ids[name]] for name in compound_names
+        }
+        return new_template
+
+    def put(self, key: Tuple, template: Dict[str, Any], component_ids: Dict[str, str]):
+        """
+        Stores a copy of template under key, evicting the least recently used entry if full.
+
+        Args:
+            key (Tuple): Key from ConfigCache.key.
+            template (Dict[str, Any]): Serialised template, as passed to GenericExtendedParameterBlock.
+            component_ids (Dict[str, str]): CompoundID of each compound name.
+        """
+        if self.maxsize <= 0:
+            return
+        with self.__lock:
+            self.__entries[key] = (copy_template(template), dict(component_ids))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+def copy_template(template: Any) -> Any:
+    """
+    Copies the mutable containers of a serialised template. Leaves such as pyomo
+    units, IDAES classes and numbers are immutable and are shared.
+    """
+    if isinstance(template, dict):
+        return {key: copy_template(value) for key, value in template.items()}
+    if isinstance(template, list):
+        return [copy_template(value) for value in template]
+    if isinstance(template, tuple):
+        return tuple(copy_template(value) for value in template)
+    return template
+
+
+config_cache = ConfigCache()
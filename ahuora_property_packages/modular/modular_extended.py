@@ -1,4 +1,6 @@
+from math import exp as math_exp
 from pyomo.environ import Expression
+from pyomo.common.config import ConfigValue, Bool
 
 from idaes.core import declare_process_block_class
 from idaes.models.properties.modular_properties.base.generic_property import (
@@ -8,8 +10,14 @@ from idaes.models.properties.modular_properties.base.generic_property import (
 )
 import idaes.models.properties.modular_properties.base.utility as utility
 
+from ahuora_property_packages.base.instrumentation import StageRecorder
+from ahuora_property_packages.base.parallel import initialize_parallel
 from ahuora_property_packages.base.state_block_constraints import StateBlockConstraints
+from ahuora_property_packages.base.solvers import get_initialization_solver
+from ahuora_property_packages.base.warm_start import WarmStart, get_warm_start_store
 from ahuora_property_packages.utils.fix_state_vars import fix_state_vars
+from .batch_flash import batch_flash
+from .wilson import WILSON
 
 
 # TODO: remove these imports once https://github.com/IDAES/idaes-pse/pull/1554 is resolved
@@ -34,7 +42,6 @@ from idaes.core.util.exceptions import (
     BurntToast,
     InitializationError,
 )
-from idaes.core.solvers import get_solver
 import idaes.logger as idaeslog
 
 from idaes.models.properties.modular_properties.base.utility import (
@@ -53,10 +60,65 @@ from idaes.models.properties.modular_properties.base.generic_property import (
 # critical point initialization (ie. temperature_bubble, temperature_dew)
 utility.MAX_ITER = 1000
 
+# A fixed T/P/z state is taken to be single phase if its Wilson bubble (sum z K)
+# or dew (sum z / K) sum is below this, i.e. well away from the phase envelope.
+# Peng-Robinson finds two phases at Wilson bubble sums down to about 0.4 for
+# asymmetric mixtures, e.g. methane and n-decane, see tests/test_fast_path.py
+FAST_PATH_MARGIN = 0.25
+
+
+def estimate_single_phase(b, margin=FAST_PATH_MARGIN):
+    """
+    Estimates whether a state block with fixed temperature, pressure and composition
+    is clearly single phase, using Wilson K-values.
+
+    Returns:
+        "Liq" if clearly subcooled, "Vap" if clearly superheated, otherwise None.
+    """
+    if not (b.temperature.fixed and b.pressure.fixed):
+        return None
+    if not all(b.mole_frac_comp[j].fixed for j in b.component_list):
+        return None
+    if "Liq" not in b.phase_list or "Vap" not in b.phase_list:
+        return None
+
+    T = value(b.temperature)
+    P = value(b.pressure)
+    bubble = 0
+    dew = 0
+    for j in b.component_list:
+        cobj = b.params.get_component(j)
+        if not all(hasattr(cobj, name) for name in ("temperature_crit", "pressure_crit", "omega")):
+            return None
+        z = value(b.mole_frac_comp[j])
+        if ("Liq", j) not in b.phase_component_set:
+            # Non-condensable, can never be all liquid
+            bubble = float("inf")
+            continue
+        K = value(cobj.pressure_crit) / P * math_exp(
+            WILSON * (1 + value(cobj.omega)) * (1 - value(cobj.temperature_crit) / T)
+        )
+        bubble += z * K
+        dew += z / K
+
+    if bubble < margin:
+        return "Liq"
+    if dew < margin:
+        return "Vap"
+    return None
+
 
 class _ExtendedGenericStateBlock(_GenericStateBlock):
 
     def initialize(blk, *args, **kwargs):
+        # Opt in, see base.parallel
+        if kwargs.get("parallel"):
+            return initialize_parallel(blk, kwargs.pop("parallel"), **kwargs)
+
+        # Opt in, see base.warm_start
+        store = get_warm_start_store(kwargs.pop("warm_start", None))
+        warm_start = WarmStart(blk, store) if store is not None else None
+
         flag_dict = fix_state_vars(blk, kwargs.get("state_args", None))
 
         # Set state_vars_fixed to True to avoid fixing state variables
@@ -64,12 +126,23 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
         # the block if we are using constraints
         kwargs["state_vars_fixed"] = True
 
-        # TODO: replace this with
-        # super().initialize(*args, **kwargs)
-        # once https://github.com/IDAES/idaes-pse/pull/1554 has
-        # been resolved and released (allows using constraints to
-        # define state variables during initialization)
-        blk._custom_super_initialize(*args, **kwargs)
+        # If every state block has a stored solution, solve from those first
+        warm_started = False
+        if warm_start is not None:
+            warm_start.restore()
+            opt = get_initialization_solver(kwargs.get("solver", None), kwargs.get("optarg", None))
+            warm_started = warm_start.solve(blk, opt) is not None
+
+        if not warm_started:
+            # TODO: replace this with
+            # super().initialize(*args, **kwargs)
+            # once https://github.com/IDAES/idaes-pse/pull/1554 has
+            # been resolved and released (allows using constraints to
+            # define state variables during initialization)
+            blk._custom_super_initialize(*args, **kwargs)
+
+        if warm_start is not None:
+            warm_start.save()
 
         if kwargs.get("hold_state") is True:
             return flag_dict
@@ -85,6 +158,7 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
         outlvl=idaeslog.NOTSET,
         solver=None,
         optarg=None,
+        fast_path=None,
     ):
         """
         Initialization routine for property package.
@@ -115,6 +189,12 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
                         - False - state variables are unfixed after
                                  initialization by calling the
                                  release_state method
+            fast_path : skip the bubble/dew and phase equilibrium solves for
+                        blocks with fixed T, P and composition that are clearly
+                        single phase (default=None, use the parameter block's
+                        initialize_fast_path config).
+        Per-stage wall times in seconds are stored in blk.initialization_timings,
+        and passed to any instrumentation hooks (see base.instrumentation).
         Returns:
             If hold_states is True, returns a dict containing flags for
             which states were fixed during initialization.
@@ -125,6 +205,8 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
         init_log.info("Starting initialization")
 
         res = None
+        # Stage timings, and events for any hooks, see base.instrumentation
+        recorder = StageRecorder(blk, "modular")
 
         for k in blk.values():
             # Deactivate the constraints specific for outlet block i.e.
@@ -161,18 +243,36 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
         else:
             # When state vars are fixed, check that DoF is 0
             for k in blk.values():
-                if degrees_of_freedom(k) != 0:
+                dof = degrees_of_freedom(k)
+                if dof != 0:
                     k.display()
                     # PYLINT-TODO
                     # pylint: disable-next=broad-exception-raised
                     raise Exception(
                         "State vars fixed but degrees of "
-                        "freedom for state block is " + str(degrees_of_freedom(k)) +
+                        "freedom for state block is " + str(dof) +
                         " during initialization. "
                     )
 
-        # Create solver
-        opt = get_solver(solver, optarg)
+        # Create solver, or reuse it from an earlier initialization
+        opt = get_initialization_solver(solver, optarg)
+
+        # Blocks that are clearly single phase skip the bubble/dew and phase
+        # equilibrium solves, these are then converged in the final solve
+        if fast_path is None:
+            fast_path = next(iter(blk.values())).params.config.initialize_fast_path
+        single_phase = {}
+        if fast_path:
+            for idx, k in blk.items():
+                phase = estimate_single_phase(k)
+                if phase is not None:
+                    single_phase[idx] = phase
+            if single_phase:
+                init_log.info(
+                    f"Fast path: {len(single_phase)} of {len(blk)} blocks are single phase."
+                )
+        blk.initialization_fast_path = single_phase
+        recorder.end_stage("fix_state_vars")
 
         # ---------------------------------------------------------------------
         # If present, initialize bubble, dew , and critical point calculations
@@ -226,7 +326,7 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
             for c in k.component_objects(Constraint):
                 # Deactivate all constraints not associated with bubble, dew,
                 # or critical points
-                if c.local_name not in cons_list:
+                if c.local_name not in cons_list or k.index() in single_phase:
                     c.deactivate()
 
         # If StateBlock has active constraints (i.e. has bubble, dew, or critical
@@ -243,12 +343,13 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
                     f"initialization at bubble, dew, and critical point step: {dof}."
                 )
             with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-                res = solve_indexed_blocks(opt, [blk], tee=slc.tee)
+                res = recorder.solve(opt, tee=slc.tee)
             init_log.info(
                 "Bubble, dew, and critical point initialization: {}.".format(
                     idaeslog.condition(res)
                 )
             )
+        recorder.end_stage("bubble_dew")
         # ---------------------------------------------------------------------
         # Calculate _teq if required
         # Using iterator k outside of for loop - this should be OK as we just need
@@ -329,6 +430,7 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
 
         if outlvl > 0:  # TODO: Update to use logger Enum
             init_log.info("State variable initialization completed.")
+        recorder.end_stage("state_initialization")
 
         # ---------------------------------------------------------------------
         n_cons = 0
@@ -336,6 +438,9 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
         skip = False
         Tfix = {}  # In enth based state defs, need to also fix T until later
         for k, b in blk.items():
+            if k in single_phase:
+                # Phase split is already set by state_initialization
+                continue
             if b.params.config.phase_equilibrium_state is not None and (
                 not b.config.defined_state or b.always_flash
             ):
@@ -380,8 +485,9 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
                     ].phase_equil_initialization(b, pp)
 
             n_cons += number_activated_constraints(b)
-            dof += degrees_of_freedom(b)
-            if degrees_of_freedom(b) < 0:
+            b_dof = degrees_of_freedom(b)
+            dof += b_dof
+            if b_dof < 0:
                 # Skip solve if DoF < 0 - this is probably due to a
                 # phase-component flow state with flash
                 skip = True
@@ -393,10 +499,11 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
                     f"initialization at phase equilibrium step: {dof}."
                 )
             with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-                res = solve_indexed_blocks(opt, [blk], tee=slc.tee)
+                res = recorder.solve(opt, tee=slc.tee)
             init_log.info(
                 "Phase equilibrium initialization: {}.".format(idaeslog.condition(res))
             )
+        recorder.end_stage("phase_equilibrium")
 
         # ---------------------------------------------------------------------
         # Initialize other properties
@@ -448,12 +555,13 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
         dof = 0
         skip = False
         for k in blk.values():
-            if degrees_of_freedom(k) < 0:
+            k_dof = degrees_of_freedom(k)
+            if k_dof < 0:
                 # Skip solve if DoF < 0 - this is probably due to a
                 # phase-component flow state with flash
                 skip = True
             n_cons += number_activated_constraints(k)
-            dof += degrees_of_freedom(k)
+            dof += k_dof
         if n_cons > 0 and not skip:
             if dof > 0:
                 raise InitializationError(
@@ -461,10 +569,16 @@ class _ExtendedGenericStateBlock(_GenericStateBlock):
                     f"initialization at property initialization step: {dof}."
                 )
             with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-                res = solve_indexed_blocks(opt, [blk], tee=slc.tee)
+                res = recorder.solve(opt, tee=slc.tee)
             init_log.info(
                 "Property initialization: {}.".format(idaeslog.condition(res))
             )
+        recorder.end_stage("properties")
+        recorder.finish()
+        init_log.info(
+            "Initialization timings: "
+            + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in recorder.timings.items())
+        )
 
         # ---------------------------------------------------------------------
         # Return constraints to initial state
@@ -514,6 +628,31 @@ class GenericExtendedStateBlockData(GenericStateBlockData, StateBlockConstraints
 
 @declare_process_block_class("GenericExtendedParameterBlock")
 class GenericExtendedParameterData(GenericParameterData):
+    CONFIG = GenericParameterData.CONFIG()
+    CONFIG.declare(
+        "initialize_fast_path",
+        ConfigValue(
+            default=False,
+            domain=Bool,
+            description="Skip equilibrium initialization solves for single phase states",
+            doc="If True, state blocks with fixed T, P and composition that Wilson "
+            "K-values show to be clearly subcooled or superheated skip the bubble/dew "
+            "and phase equilibrium initialization solves.",
+        ),
+    )
+
     def build(self):
         super().build()
         self._state_block_class = GenericExtendedStateBlock  # noqa: F821
+
+    def batch_flash(self, pressure, mole_frac_comp, temperature=None, enth_mol=None, vapor_frac=None,
+                    solver=None, optarg=None):
+        """
+        Flashes many state points, reusing one state block and warm starting each
+        point from its nearest converged neighbour. See batch_flash.batch_flash.
+
+        Returns:
+            np.recarray: One record per point with the solved state, convergence status and timing.
+        """
+        return batch_flash(self, pressure, mole_frac_comp, temperature=temperature, enth_mol=enth_mol,
+                           vapor_frac=vapor_frac, solver=solver, optarg=optarg)
@@ -0,0 +1,348 @@
+from typing import Any, Dict, List, NamedTuple
+import numpy as np
+from pyomo.environ import units as pyunits
+from idaes.core import PhaseType as PT
+from idaes.models.properties.modular_properties.eos.ceos import Cubic
+from idaes.models.properties.modular_properties.eos.ceos_common import EoS_param, CubicType
+from ahuora_property_packages.types import States
+from .template_builder import build_template
+from .wilson import WILSON
+
+"""
+Evaluates the properties of a cubic (Peng-Robinson) template with NumPy, without
+building a Pyomo model or calling a solver.
+
+Follows the expressions in idaes.models.properties.modular_properties.eos.ceos, so
+values agree with a solved IDAES state block at the same T, P and phase
+compositions. All methods take arrays of state points: T and P of shape (n,)
+and compositions of shape (n, number of components), in SI units (K, Pa, J/mol).
+"""
+
+# IDAES gas constant, J/mol/K
+R = 8.314462618
+
+# Below this molar volume / co-volume ratio a single phase is treated as liquid
+LIQUID_VOLUME_RATIO = 1.75
+
+FW = {
+    CubicType.PR: lambda omega: 0.37464 + 1.54226 * omega - 0.26992 * omega**2,
+    CubicType.SRK: lambda omega: 0.48 + 1.574 * omega - 0.176 * omega**2,
+}
+
+
+class PhaseProperties(NamedTuple):
+    compress_fact: np.ndarray  # (n,)
+    log_fug_coeff: np.ndarray  # (n, nc)
+    enth_mol: np.ndarray  # (n,) J/mol
+    entr_mol: np.ndarray  # (n,) J/mol/K
+    dens_mol: np.ndarray  # (n,) mol/m^3
+
+
+class TPFlashResult(NamedTuple):
+    vapor_frac: np.ndarray  # (n,)
+    mole_frac_liq: np.ndarray  # (n, nc)
+    mole_frac_vap: np.ndarray  # (n, nc)
+    enth_mol: np.ndarray  # (n,) J/mol
+    entr_mol: np.ndarray  # (n,) J/mol/K
+    liq: PhaseProperties
+    vap: PhaseProperties
+    converged: np.ndarray  # (n,) bool
+    iterations: int
+
+
+class PengRobinsonEvaluator:
+
+    def __init__(self, template: Dict[str, Any]):
+        """
+        Args:
+            template (Dict[str, Any]): Serialised cubic template, as returned by build_template.
+        """
+        self.component_list: List[str] = list(template["components"].keys())
+        self.phase_list: List[str] = list(template["phases"].keys())
+
+        cubic_types = {
+            phase["equation_of_state_options"]["type"] if phase["equation_of_state"] is Cubic else None
+            for phase in template["phases"].values()
+        }
+        if None in cubic_types or len(cubic_types) != 1:
+            raise ValueError("PengRobinsonEvaluator requires every phase to use the same cubic equation of state")
+        self.cubic_type = cubic_types.pop()
+        eos = EoS_param[self.cubic_type]
+        self.u, self.w = eos["u"], eos["w"]
+        self.sqrt_disc = np.sqrt(self.u**2 - 4 * self.w)
+
+        self.temperature_ref = _convert(template["temperature_ref"], pyunits.K)
+        self.pressure_ref = _convert(template["pressure_ref"], pyunits.Pa)
+
+        nc = len(self.component_list)
+        self.mw = np.empty(nc)
+        self.temperature_crit = np.empty(nc)
+        self.pressure_crit = np.empty(nc)
+        self.omega = np.empty(nc)
+        self.enth_form = np.empty(nc)
+        self.entr_form = np.empty(nc)
+        self.cp_coeff = np.zeros((nc, 5))  # A + B T + C T^2 + D T^3 + E T^4
+        self.condensable = np.ones(nc, dtype=bool)
+
+        for i, name in enumerate(self.component_list):
+            component = template["components"][name]
+            data = component["parameter_data"]
+            self.mw[i] = _convert(data["mw"], pyunits.kg / pyunits.mol)
+            self.temperature_crit[i] = _convert(data["temperature_crit"], pyunits.K)
+            self.pressure_crit[i] = _convert(data["pressure_crit"], pyunits.Pa)
+            self.omega[i] = data["omega"]
+            self.enth_form[i] = _convert(data.get("enth_mol_form_vap_comp_ref", (0, None)), pyunits.J / pyunits.mol)
+            self.entr_form[i] = _convert(data["entr_mol_form_vap_comp_ref"], pyunits.J / pyunits.mol / pyunits.K)
+            for k, key in enumerate("ABCDE"):
+                if key in data["cp_mol_ig_comp_coeff"]:
+                    self.cp_coeff[i, k] = _convert(data["cp_mol_ig_comp_coeff"][key],
+                                                   pyunits.J / pyunits.mol / pyunits.K**(k + 1))
+            # Components that can only be vapor, e.g. supercritical gases
+            if component.get("valid_phase_types", None) == PT.vaporPhase:
+                self.condensable[i] = False
+
+        kappa = template["parameter_data"].get(f"{self.cubic_type.name}_kappa", {})
+        self.kappa = np.array([[kappa.get((i, j), 0.0) for j in self.component_list] for i in self.component_list])
+
+        self.fw = FW[self.cubic_type](self.omega)
+        self.a_crit = eos["omegaA"] * (R * self.temperature_crit) ** 2 / self.pressure_crit
+        self.b = eos["coeff_b"] * R * self.temperature_crit / self.pressure_crit
+
+    @classmethod
+    def from_package(cls, compound_names: List[str], valid_states: List[States] = ["Liq", "Vap"], **kwargs) -> "PengRobinsonEvaluator":
+        """
+        Builds an evaluator from the same template as build_package("peng-robinson", ...).
+        """
+        return cls(build_template("peng-robinson", compound_names, valid_states, **kwargs))
+
+    def phase_properties(self, T, P, x, phase: States) -> PhaseProperties:
+        """
+        Evaluates a phase at the given temperatures, pressures and phase compositions.
+
+        Args:
+            T (array_like): Temperature in K, shape (n,) or scalar.
+            P (array_like): Pressure in Pa, shape (n,) or scalar.
+            x (array_like): Phase mole fractions, shape (n, nc) or (nc,).
+            phase (States): "Liq" or "Vap", selects the smallest or largest root of the cubic.
+        """
+        if phase not in self.phase_list:
+            raise ValueError(f"Phase {phase} is not in this package, phases are {self.phase_list}")
+        T, P, x = self._broadcast(T, P, x)
+        return self._phase_properties(T, P, x, phase == "Liq")
+
+    def compress_fact(self, T, P, x, phase: States) -> np.ndarray:
+        return self.phase_properties(T, P, x, phase).compress_fact
+
+    def fug_coeff(self, T, P, x, phase: States) -> np.ndarray:
+        return np.exp(self.phase_properties(T, P, x, phase).log_fug_coeff)
+
+    def enth_mol(self, T, P, x, phase: States) -> np.ndarray:
+        return self.phase_properties(T, P, x, phase).enth_mol
+
+    def entr_mol(self, T, P, x, phase: States) -> np.ndarray:
+        return self.phase_properties(T, P, x, phase).entr_mol
+
+    def dens_mol(self, T, P, x, phase: States) -> np.ndarray:
+        return self.phase_properties(T, P, x, phase).dens_mol
+
+    def flash_tp(self, T, P, z, max_iter: int = 200, tol: float = 1e-10) -> TPFlashResult:
+        """
+        Isothermal flash of many state points at once.
+
+        Starts from Wilson K-values and uses successive substitution on the fugacity
+        coefficients, solving the Rachford-Rice equation for vapor fraction in [0, 1]
+        at each step. Single phase points keep iterating the incipient phase, so a
+        point only reports as single phase if that phase is stable.
+
+        Args:
+            T (array_like): Temperature in K, shape (n,) or scalar.
+            P (array_like): Pressure in Pa, shape (n,) or scalar.
+            z (array_like): Overall mole fractions, shape (n, nc) or (nc,).
+            max_iter (int): Maximum number of successive substitution steps.
+            tol (float): Convergence tolerance on the change in ln K.
+
+        Returns:
+            TPFlashResult: Phase split, phase compositions and mixture enthalpy and entropy.
+        """
+        T, P, z = self._broadcast(T, P, z)
+        z = z / z.sum(axis=1, keepdims=True)
+        n = T.shape[0]
+
+        if self.phase_list == ["Liq"] or self.phase_list == ["Vap"]:
+            vap = self.phase_list == ["Vap"]
+            props = self._phase_properties(T, P, z, liquid=not vap)
+            V = np.full(n, 1.0 if vap else 0.0)
+            return TPFlashResult(V, z, z, props.enth_mol, props.entr_mol, props, props, np.ones(n, dtype=bool), 0)
+
+        # Wilson correlation, non-condensable components stay in the vapor
+        lnK = np.log(self.pressure_crit / P[:, None]) + WILSON * (1 + self.omega) * (1 - self.temperature_crit / T[:, None])
+        lnK[:, ~self.condensable] = 0.0
+
+        converged = np.zeros(n, dtype=bool)
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            V, x, y = self._rachford_rice(np.exp(lnK), z)
+            liq = self._phase_properties(T, P, x, liquid=True)
+            vap = self._phase_properties(T, P, y, liquid=False)
+            lnK_new = liq.log_fug_coeff - vap.log_fug_coeff
+            lnK_new[:, ~self.condensable] = 0.0
+            step = np.max(np.abs(lnK_new - lnK), axis=1)
+            lnK = np.where(converged[:, None], lnK, lnK_new)
+            converged |= step < tol
+            if converged.all():
+                break
+
+        V, x, y = self._rachford_rice(np.exp(lnK), z)
+
+        # K-values collapsed to 1: a single phase that cannot be split, label it by molar volume
+        trivial = np.max(np.abs(lnK[:, self.condensable]), axis=1, initial=0.0) < 1e-6
+        if trivial.any():
+            single = self._phase_properties(T, P, z, liquid=False)
+            B = (z @ self.b) * P / (R * T)
+            V = np.where(trivial, np.where(single.compress_fact / B < LIQUID_VOLUME_RATIO, 0.0, 1.0), V)
+            x = np.where(trivial[:, None], z, x)
+            y = np.where(trivial[:, None], z, y)
+
+        liq = self._phase_properties(T, P, x, liquid=True)
+        vap = self._phase_properties(T, P, y, liquid=False)
+        enth = (1 - V) * liq.enth_mol + V * vap.enth_mol
+        entr = (1 - V) * liq.entr_mol + V * vap.entr_mol
+        return TPFlashResult(V, x, y, enth, entr, liq, vap, converged, iterations)
+
+    def _broadcast(self, T, P, x):
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        if x.shape[1] != len(self.component_list):
+            raise ValueError(f"Expected {len(self.component_list)} mole fractions per point, got {x.shape[1]}")
+        n = max(x.shape[0], np.size(T), np.size(P))
+        T = np.broadcast_to(np.asarray(T, dtype=float).reshape(-1), (n,))
+        P = np.broadcast_to(np.asarray(P, dtype=float).reshape(-1), (n,))
+        x = np.broadcast_to(x, (n, x.shape[1]))
+        return T, P, x
+
+    def _phase_properties(self, T, P, x, liquid: bool) -> PhaseProperties:
+        u, w, p = self.u, self.w, self.sqrt_disc
+
+        # Component a(T) and its temperature derivative, (n, nc)
+        sqrt_Tr = np.sqrt(T[:, None] / self.temperature_crit)
+        alpha_root = 1 + self.fw * (1 - sqrt_Tr)
+        a = self.a_crit * alpha_root**2
+        da_dT = self.a_crit / self.temperature_crit * (-self.fw / sqrt_Tr) * alpha_root
+
+        # Van der Waals one-fluid mixing, (n, nc, nc)
+        sqrt_a = np.sqrt(a)
+        a_ij = sqrt_a[:, :, None] * sqrt_a[:, None, :] * (1 - self.kappa)
+        am = np.einsum("ni,nij,nj->n", x, a_ij, x)
+        dam_dT = np.einsum("ni,nij,nj->n", x, a_ij * 0.5 * ((da_dT / a)[:, :, None] + (da_dT / a)[:, None, :]), x)
+        bm = x @ self.b
+
+        A = am * P / (R * T) ** 2
+        B = bm * P / (R * T)
+        Z = _cubic_root(
+            -(1 + B - u * B),
+            A + w * B**2 - u * B - u * B**2,
+            -A * B - w * B**2 - w * B**3,
+            liquid,
+        )
+
+        log_term = np.log((2 * Z + B * (u + p)) / (2 * Z + B * (u - p)))
+        log_Z_B = np.log(Z - B)
+
+        # Fugacity coefficients, pg. 145 in Properties of Gases and Liquids
+        delta = 2 * sqrt_a / am[:, None] * np.einsum("nj,nj,ij->ni", x, sqrt_a, 1 - self.kappa)
+        b_bm = self.b / bm[:, None]
+        log_fug_coeff = b_bm * (Z - 1)[:, None] - log_Z_B[:, None] + (A / (B * p))[:, None] * (b_bm - delta) * log_term[:, None]
+
+        # Ideal gas contributions, (n, nc)
+        Tr = self.temperature_ref
+        powers = np.arange(1, 6)
+        enth_ig = (self.cp_coeff / powers * (T[:, None, None] ** powers - Tr**powers)).sum(axis=2) + self.enth_form
+        entr_ig = (
+            self.cp_coeff[:, 0] * np.log(T[:, None] / Tr)
+            + (self.cp_coeff[:, 1:] / powers[:-1] * (T[:, None, None] ** powers[:-1] - Tr ** powers[:-1])).sum(axis=2)
+            + self.entr_form
+        )
+
+        # Departure functions, pg. 120 and pg. 102 in Properties of Gases and Liquids
+        enth = np.einsum("ni,ni->n", x, enth_ig) + R * T * (Z - 1) + (T * dam_dT - am) / (bm * p) * log_term
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_log_x = np.where(x > 0, x * np.log(x), 0.0)
+        entr = (
+            np.einsum("ni,ni->n", x, entr_ig) - R * x_log_x.sum(axis=1)
+            - R * np.log(P / self.pressure_ref)
+            + R * log_Z_B + dam_dT / (bm * p) * log_term
+        )
+
+        return PhaseProperties(Z, log_fug_coeff, enth, entr, P / (Z * R * T))
+
+    def _rachford_rice(self, K, z, iterations: int = 60):
+        """
+        Solves sum(y - x) = 0 for the vapor fraction in [0, 1] by bisection.
+        Non-condensable components (K ignored) only appear in the vapor.
+        """
+        cond = self.condensable
+        z_cond = np.where(cond, z, 0.0)
+        z_noncond = np.where(cond, 0.0, z).sum(axis=1)
+
+        def residual(V):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                noncond = np.where(z_noncond > 0, z_noncond / V, 0.0)
+            return (z_cond * (K - 1) / (1 + V[:, None] * (K - 1))).sum(axis=1) + noncond
+
+        n = z.shape[0]
+        low, high = np.zeros(n), np.ones(n)
+        for _ in range(iterations):
+            mid = 0.5 * (low + high)
+            positive = residual(mid) > 0
+            low = np.where(positive, mid, low)
+            high = np.where(positive, high, mid)
+        V = 0.5 * (low + high)
+
+        # All liquid or all vapor if there is no root inside [0, 1]
+        V = np.where((z_noncond == 0) & (residual(np.zeros(n)) <= 0), 0.0, V)
+        V = np.where(residual(np.ones(n)) >= 0, 1.0, V)
+
+        denominator = 1 + V[:, None] * (K - 1)
+        x = np.where(cond, z / denominator, 0.0)
+        y = np.where(cond, K * x, z / np.maximum(V, 1e-300)[:, None])
+
+        # Incipient phase compositions for single phase points
+        x = np.where((V == 1.0)[:, None], np.where(cond, z / K, 0.0), x)
+        y = np.where((V == 0.0)[:, None], K * z, y)
+        x = x / x.sum(axis=1, keepdims=True)
+        y = y / y.sum(axis=1, keepdims=True)
+        return V, x, y
+
+
+def _cubic_root(c2, c1, c0, smallest: bool) -> np.ndarray:
+    """
+    Smallest or largest real root of Z^3 + c2 Z^2 + c1 Z + c0 = 0, element-wise.
+    """
+    p = c1 - c2**2 / 3
+    q = 2 * c2**3 / 27 - c2 * c1 / 3 + c0
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+
+    # One real root
+    root_disc = np.sqrt(np.maximum(disc, 0))
+    one = np.cbrt(-q / 2 + root_disc) + np.cbrt(-q / 2 - root_disc)
+
+    # Three real roots, trigonometric form
+    p_neg = np.minimum(p, -1e-300)
+    r = 2 * np.sqrt(-p_neg / 3)
+    phi = np.arccos(np.clip(3 * q / (p_neg * r), -1, 1))
+    three = r * np.cos((phi - (4 * np.pi if smallest else 0)) / 3)
+
+    Z = np.where(disc > 0, one, three) - c2 / 3
+
+    # Polish with Newton steps
+    for _ in range(2):
+        f = ((Z + c2) * Z + c1) * Z + c0
+        df = (3 * Z + 2 * c2) * Z + c1
+        Z = Z - np.where(df != 0, f / np.where(df != 0, df, 1), 0)
+    return Z
+
+
+def _convert(quantity, to_units) -> float:
+    value, units = quantity if isinstance(quantity, tuple) else (quantity, None)
+    if units is None:
+        return float(value)
+    return float(pyunits.convert_value(value, from_units=units, to_units=to_units))
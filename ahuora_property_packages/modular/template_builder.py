@@ -1,9 +1,11 @@
 
 from .modular_extended import GenericExtendedParameterBlock
+from .config_cache import config_cache
 from ahuora_compounds.CompoundDB import get_compound
 from .templates.templates import PropertyPackage
 from ahuora_property_packages.types import States
-from typing import List
+from .builder.common_parsers import pr_kappa_parser
+from typing import List, Tuple
 
 """
 Creates an idaes property package, to follow the template found at:
@@ -11,7 +13,41 @@ https://idaes-pse.readthedocs.io/en/stable/explanations/components/property_pack
 
 """
 
-def build_config(property_package_name, compound_names: List[str], valid_states: List[States]) -> dict[str,any]:
+def build_config(property_package_name, compound_names: List[str], valid_states: List[States], use_cache: bool = True,
+                 kappa_temperature_range: Tuple[float, float] = None) -> GenericExtendedParameterBlock:
+  """
+  Builds an IDAES parameter block from the package template, see build_template.
+  """
+  template = build_template(property_package_name, compound_names, valid_states, use_cache, kappa_temperature_range)
+
+  # Building property package and returning
+  return GenericExtendedParameterBlock(**template)
+
+
+def build_peng_robinson_package(compound_list: List[str], valid_states: List[States],
+                                kappa_temperature_range: Tuple[float, float] = None) -> GenericExtendedParameterBlock:
+  """
+  Builds a Peng-Robinson parameter block, see build_config.
+  """
+  return build_config("peng-robinson", compound_list, valid_states, kappa_temperature_range=kappa_temperature_range)
+
+
+def build_template(property_package_name, compound_names: List[str], valid_states: List[States], use_cache: bool = True,
+                   kappa_temperature_range: Tuple[float, float] = None) -> dict[str,any]:
+  """
+  Serialises the package template for the given compounds and states, i.e. the
+  configuration arguments of a GenericExtendedParameterBlock.
+  """
+
+  if kappa_temperature_range is not None:
+    kappa_temperature_range = tuple(kappa_temperature_range)
+
+  # Reuse the serialised template of an identical earlier build
+  if use_cache:
+    cache_key = config_cache.key(property_package_name, compound_names, valid_states, kappa_temperature_range)
+    new_template = config_cache.get(cache_key, compound_names)
+    if new_template is not None:
+      return new_template
 
   # Build list of compound objects
 
@@ -38,9 +74,19 @@ def build_config(property_package_name, compound_names: List[str], valid_states:
   # NOTE: must pass a copy of the template back, do not directly pass template
   new_template = {}
 
+  # Extra keyword arguments for parsers that accept them
+  parser_options = {
+    pr_kappa_parser: {"temperature_range": kappa_temperature_range},
+  }
+
   for key, obj in template.items():
     # Call the parse method on each object and update the template
-    new_template[key] = obj.serialise(compounds, valid_states)
-  
-  # Building property package and returning
-  return GenericExtendedParameterBlock(**new_template)
+    new_template[key] = obj.serialise(compounds, valid_states, **parser_options.get(obj, {}))
+
+  if use_cache:
+    config_cache.put(cache_key, new_template, {
+      name: compound["CompoundID"].value for name, compound in zip(compound_names, compounds)
+    })
+
+  return new_template
+
@@ -0,0 +1,38 @@
+import numpy as np
+from pytest import approx
+from pyomo.environ import ConcreteModel
+from idaes.core import FlowsheetBlock
+from ..template_builder import build_config
+from ..batch_flash import continuation_order
+
+
+def test_continuation_order():
+    points = np.array([[3.0, 0], [0.0, 0], [2.0, 0], [1.0, 0], [10.0, 0]])
+    assert continuation_order(points) == [1, 3, 2, 0, 4]
+
+
+def test_continuation_order_scales_columns():
+    # Without scaling the second column would dominate
+    points = np.array([[0.0, 0], [1.0, 1000], [0.1, 100000]])
+    assert continuation_order(points) == [0, 1, 2]
+
+
+def test_batch_flash_tp():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_config("peng-robinson", ["benzene", "toluene"], ["Liq", "Vap"])
+
+    temperature = [350, 450, 368, 376, 400]
+    results = m.fs.properties.batch_flash(
+        pressure=1e5, mole_frac_comp=[0.5, 0.5], temperature=temperature
+    )
+
+    assert results.converged.all()
+    assert list(results.temperature) == approx(temperature)
+    assert results.vapor_frac[0] == approx(0, abs=1e-4)
+    assert results.vapor_frac[1] == approx(1, abs=1e-4)
+    # Only the first point in the order needs a full initialization
+    assert results.initialized.sum() == 1
+    assert results.warm_start[results.order == 0][0] == -1
+    # The scratch state block is removed
+    assert not hasattr(m.fs, "_batch_flash")
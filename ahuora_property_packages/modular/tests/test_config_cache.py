@@ -0,0 +1,37 @@
+from ahuora_property_packages.modular.template_builder import build_config
+from ahuora_property_packages.modular.config_cache import ConfigCache, config_cache
+
+
+def test_repeated_build_hits_cache():
+    config_cache.clear()
+    build_config("peng-robinson", ["benzene", "toluene"], ["Liq", "Vap"])
+    build_config("peng-robinson", ["toluene", "benzene"], ["Liq", "Vap"])
+    assert config_cache.misses == 1
+    assert config_cache.hits == 1
+
+    build_config("peng-robinson", ["benzene", "toluene"], ["Vap"])
+    assert config_cache.misses == 2
+
+
+def test_cached_template_is_copied_in_request_order():
+    cache = ConfigCache()
+    template = {"components": {"benzene": {"parameter_data": {"mw": (78, None)}}, "toluene": {}}}
+    key = cache.key("peng-robinson", ["benzene", "toluene"], ["Liq"])
+    cache.put(key, template, {"benzene": "benzene", "toluene": "toluene"})
+
+    copy = cache.get(key, ["toluene", "benzene"])
+    assert list(copy["components"]) == ["toluene", "benzene"]
+
+    copy["components"]["benzene"]["parameter_data"]["mw"] = (0, None)
+    template["components"]["benzene"]["parameter_data"].clear()
+    assert cache.get(key, ["benzene", "toluene"])["components"]["benzene"]["parameter_data"]["mw"] == (78, None)
+
+
+def test_lru_eviction():
+    cache = ConfigCache(maxsize=2)
+    keys = [cache.key("peng-robinson", [name], ["Liq"]) for name in ["a", "b", "c"]]
+    for key, name in zip(keys, ["a", "b", "c"]):
+        cache.put(key, {"components": {name: {}}}, {name: name})
+    assert len(cache) == 2
+    assert cache.get(keys[0], ["a"]) is None
+    assert cache.get(keys[2], ["c"]) is not None
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from pytest import approx
+from scipy.optimize import brentq
+from pyomo.environ import ConcreteModel, SolverFactory, value, assert_optimal_termination
+from idaes.core import FlowsheetBlock
+from idaes.models.properties.modular_properties.eos.ceos import cubic_roots_available
+from ..template_builder import build_config
+from ..modular_extended import FAST_PATH_MARGIN, estimate_single_phase
+from ..pr_evaluator import PengRobinsonEvaluator
+from ..wilson import WILSON
+
+
+def state(T, P, fast_path):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_config("peng-robinson", ["benzene", "toluene"], ["Liq", "Vap"])
+    m.fs.properties.config.initialize_fast_path = fast_path
+    m.fs.state = m.fs.properties.build_state_block([0], defined_state=True)
+    sb = m.fs.state[0]
+    sb.flow_mol.fix(1)
+    sb.temperature.fix(T)
+    sb.pressure.fix(P)
+    sb.mole_frac_comp["benzene"].fix(0.5)
+    sb.mole_frac_comp["toluene"].fix(0.5)
+    return m, sb
+
+
+def test_estimate_single_phase():
+    assert estimate_single_phase(state(300, 1e5, True)[1]) == "Liq"
+    assert estimate_single_phase(state(500, 1e5, True)[1]) == "Vap"
+    # Between the bubble (365 K) and dew (371 K) points
+    assert estimate_single_phase(state(368, 1e5, True)[1]) is None
+
+
+def test_estimate_needs_fixed_temperature():
+    _, sb = state(300, 1e5, True)
+    sb.temperature.unfix()
+    assert estimate_single_phase(sb) is None
+
+
+def test_fast_path_matches_full_initialization():
+    for T in [300, 368, 500]:
+        results = []
+        for fast_path in [False, True]:
+            m, sb = state(T, 1e5, fast_path)
+            m.fs.state.initialize()
+            assert set(m.fs.state.initialization_timings) >= {"bubble_dew", "phase_equilibrium", "properties", "total"}
+            assert bool(m.fs.state.initialization_fast_path) == (fast_path and T != 368)
+            assert_optimal_termination(SolverFactory("ipopt").solve(m))
+            results.append((value(sb.vapor_frac), value(sb.enth_mol)))
+        assert results[1] == approx(results[0], abs=1e-6)
+
+
+def wilson_sums(ev, T, P, z):
+    # Same sums as estimate_single_phase
+    K = ev.pressure_crit / P * np.exp(WILSON * (1 + ev.omega) * (1 - ev.temperature_crit / np.asarray(T)[:, None]))
+    return K @ z, (1 / K) @ z
+
+
+@pytest.mark.parametrize("compounds, z, P", [
+    (["benzene", "toluene"], [0.5, 0.5], 1e5),
+    (["benzene", "toluene"], [0.5, 0.5], 1e6),
+    (["methane", "n-decane"], [0.5, 0.5], 1e5),
+    (["methane", "n-decane"], [0.1, 0.9], 1e5),
+    (["methane", "n-decane"], [0.1, 0.9], 1e6),
+    (["methane", "ethane", "propane", "n-butane"], [0.4, 0.3, 0.2, 0.1], 1e5),
+    (["methane", "ethane", "propane", "n-butane"], [0.4, 0.3, 0.2, 0.1], 1e6),
+    (["water", "methanol"], [0.5, 0.5], 1e5),
+    (["water", "methanol"], [0.5, 0.5], 1e6),
+])
+def test_margin_single_phase(compounds, z, P):
+    # Every state the fast path takes to be single phase is single phase in the
+    # Peng-Robinson flash. Wilson K-values cannot predict liquid-liquid splits at
+    # any margin, e.g. of equimolar methane and n-decane at 1 MPa, which are left out.
+    ev = PengRobinsonEvaluator.from_package(compounds)
+    z = np.array(z)
+    T = np.linspace(100, 700, 1201)
+    bubble, dew = wilson_sums(ev, T, P, z)
+    result = ev.flash_tp(T, P, z)
+    liquid = bubble < FAST_PATH_MARGIN
+    vapor = dew < FAST_PATH_MARGIN
+    assert liquid.any() and vapor.any()
+    assert np.all(result.vapor_frac[liquid] == 0)
+    assert np.all(result.vapor_frac[vapor] == 1)
+
+
+@pytest.mark.skipif(not cubic_roots_available(), reason="Cubic functions not available")
+@pytest.mark.skipif(not SolverFactory("ipopt").available(exception_flag=False), reason="IPOPT not available")
+@pytest.mark.parametrize("side", ["Liq", "Vap"])
+def test_fast_path_near_margin(side):
+    ev = PengRobinsonEvaluator.from_package(["benzene", "toluene"])
+    z = np.array([0.5, 0.5])
+    index = 0 if side == "Liq" else 1
+    # Just inside the margin, where the estimate is least certain
+    T = brentq(lambda T: wilson_sums(ev, [T], 1e5, z)[index][0] - 0.99 * FAST_PATH_MARGIN, 250, 600)
+    results = []
+    for fast_path in [False, True]:
+        m, sb = state(T, 1e5, fast_path)
+        m.fs.state.initialize()
+        assert m.fs.state.initialization_fast_path == ({0: side} if fast_path else {})
+        assert_optimal_termination(SolverFactory("ipopt").solve(m))
+        results.append((value(sb.vapor_frac), value(sb.enth_mol)))
+    assert results[1] == approx(results[0], abs=1e-6)
@@ -0,0 +1,51 @@
+import numpy as np
+from ahuora_compounds.CompoundDB import db
+from ahuora_property_packages.modular.builder.common_parsers import pr_kappa_parser
+from ahuora_property_packages.modular.builder.interaction_table import get_interaction_table, parse_temperature_range
+
+# ChemSep LibraryIndex values
+HYDROGEN, NITROGEN, METHANE = 902, 905, 1
+
+
+def test_parse_temperature_range():
+    assert parse_temperature_range("Hydrogen/Nitrogen T=90-113K p210") == (90, 113)
+    assert parse_temperature_range("Hydrogen/Nitrogen T=77.35K p213") == (77.35, 77.35)
+    assert parse_temperature_range("Helium-4/CarbonMonoxide p203") == (None, None)
+
+
+def test_all_entries_kept():
+    table = get_interaction_table()
+    entries = table.entries(NITROGEN, HYDROGEN)
+    assert [entry.kappa for entry in entries] == [0.0711, 0.1196, 0.12]
+    assert entries[0].comment == "Hydrogen/Nitrogen T=90-113K p210"
+    assert table.entries(HYDROGEN, NITROGEN) == entries
+
+
+def test_lookup():
+    table = get_interaction_table()
+    # Last entry in pr.dat wins by default, as before
+    assert table.lookup(HYDROGEN, NITROGEN) == 0.12
+    # Narrowest range covering the window
+    assert table.lookup(HYDROGEN, NITROGEN, (91, 94)) == 0.1196
+    assert table.lookup(HYDROGEN, NITROGEN, (100, 110)) == 0.0711
+    # No entry covers the window
+    assert table.lookup(HYDROGEN, NITROGEN, (200, 300)) == 0.12
+    assert table.lookup(HYDROGEN, 123456) is None
+
+
+def test_matrix_is_symmetric():
+    kappa = get_interaction_table().matrix([HYDROGEN, NITROGEN, METHANE])
+    assert np.allclose(kappa, kappa.T)
+    assert np.all(np.diag(kappa) == 0)
+    assert kappa[0, 1] == 0.12
+
+
+def test_parser_matches_table():
+    compounds = [db.get_compound(name).get_source("chemsep") for name in ["hydrogen", "nitrogen"]]
+    ids = [compound["CompoundID"].value for compound in compounds]
+    kappa = pr_kappa_parser.serialise(compounds, ["Liq", "Vap"])["PR_kappa"]
+    assert kappa[(ids[0], ids[1])] == kappa[(ids[1], ids[0])] == 0.12
+    assert kappa[(ids[0], ids[0])] == 0
+
+    kappa = pr_kappa_parser.serialise(compounds, ["Liq", "Vap"], temperature_range=(91, 94))["PR_kappa"]
+    assert kappa[(ids[0], ids[1])] == 0.1196
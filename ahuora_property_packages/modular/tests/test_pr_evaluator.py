@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+from pytest import approx
+from pyomo.environ import ConcreteModel, SolverFactory, value
+from idaes.core import FlowsheetBlock
+from idaes.models.properties.modular_properties.eos.ceos import cubic_roots_available
+from ahuora_property_packages.build_package import build_package
+from ahuora_property_packages.modular.pr_evaluator import PengRobinsonEvaluator
+
+"""
+The evaluator follows the IDAES cubic expressions, so it is compared with a state
+block of the same package to rel=1e-8 where the cubic external functions are
+available. The reference values of test_bt_pr.py are checked more loosely without
+them: they come from the IDAES benzene-toluene example, whose parameters differ
+from the ChemSep parameters of the package, so they only agree to a few percent.
+"""
+
+
+def assert_approx(value, expected_value, error_margin):
+    assert approx(value, rel=error_margin / 100) == expected_value
+
+
+def get_evaluator():
+    return PengRobinsonEvaluator.from_package(["benzene", "toluene"], ["Liq", "Vap"])
+
+
+def get_state():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.props = build_package("peng-robinson", ["benzene", "toluene"], ["Liq", "Vap"])
+    m.fs.state = m.fs.props.build_state_block([0], defined_state=True)
+    return m, m.fs.state[0]
+
+
+def model_properties(sb, T, P, x, phase):
+    sb.temperature.value = T
+    sb.pressure.value = P
+    for j, x_j in zip(["benzene", "toluene"], x):
+        sb.mole_frac_phase_comp[phase, j].value = x_j
+    return (
+        value(sb.compress_fact_phase[phase]),
+        [value(sb.fug_coeff_phase_comp[phase, j]) for j in ["benzene", "toluene"]],
+        value(sb.enth_mol_phase[phase]),
+        value(sb.entr_mol_phase[phase]),
+    )
+
+
+@pytest.mark.skipif(not cubic_roots_available(), reason="Cubic functions not available")
+@pytest.mark.parametrize("T, P, x, phase", [
+    (350, 1e5, [0.5, 0.5], "Liq"),
+    (350, 1e5, [0.70584, 0.29416], "Vap"),
+    (450, 5e5, [0.2, 0.8], "Liq"),
+    (450, 5e5, [0.9, 0.1], "Vap"),
+])
+def test_phase_properties_match_model(T, P, x, phase):
+    _, sb = get_state()
+    compress_fact, fug_coeff, enth_mol, entr_mol = model_properties(sb, T, P, x, phase)
+    props = get_evaluator().phase_properties(T, P, x, phase)
+
+    assert props.compress_fact[0] == approx(compress_fact, rel=1e-8)
+    np.testing.assert_allclose(np.exp(props.log_fug_coeff[0]), fug_coeff, rtol=1e-8)
+    assert props.enth_mol[0] == approx(enth_mol, rel=1e-8)
+    assert props.entr_mol[0] == approx(entr_mol, rel=1e-8)
+
+
+@pytest.mark.skipif(not cubic_roots_available(), reason="Cubic functions not available")
+@pytest.mark.skipif(not SolverFactory("ipopt").available(exception_flag=False), reason="IPOPT not available")
+@pytest.mark.parametrize("T, z", [(368, [0.5, 0.5]), (376, [0.2, 0.8])])
+def test_flash_matches_model(T, z):
+    m, sb = get_state()
+    sb.flow_mol.fix(100)
+    sb.mole_frac_comp["benzene"].fix(z[0])
+    sb.mole_frac_comp["toluene"].fix(z[1])
+    sb.temperature.fix(T)
+    sb.pressure.fix(1e5)
+    sb.enth_mol_phase
+    m.fs.state.initialize()
+    SolverFactory("ipopt").solve(m)
+    result = get_evaluator().flash_tp(T, 1e5, z)
+
+    # IPOPT stops at its own tolerance (1e-8 on the scaled residuals), so the
+    # solved model is only that close to the exact flash the evaluator converges.
+    assert result.vapor_frac[0] == approx(value(sb.phase_frac["Vap"]), rel=1e-6)
+    assert result.mole_frac_liq[0, 0] == approx(value(sb.mole_frac_phase_comp["Liq", "benzene"]), rel=1e-6)
+    assert result.mole_frac_vap[0, 0] == approx(value(sb.mole_frac_phase_comp["Vap", "benzene"]), rel=1e-6)
+    assert result.enth_mol[0] == approx(value(sb.enth_mol), rel=1e-6)
+
+
+def test_phase_properties_match_idaes_example():
+    ev = get_evaluator()
+    liq = ev.phase_properties(350, 1e5, [0.5, 0.5], "Liq")
+    vap = ev.phase_properties(350, 1e5, [0.70584, 0.29416], "Vap")
+
+    assert_approx(liq.compress_fact[0], 0.0035346, 0.5)
+    assert_approx(vap.compress_fact[0], 0.966749, 0.5)
+    assert_approx(np.exp(liq.log_fug_coeff[0, 0]), 0.894676, 2)
+    assert_approx(np.exp(liq.log_fug_coeff[0, 1]), 0.347566, 0.5)
+    assert_approx(np.exp(vap.log_fug_coeff[0, 0]), 0.971072, 0.5)
+    assert_approx(np.exp(vap.log_fug_coeff[0, 1]), 0.959791, 0.5)
+    assert_approx(liq.enth_mol[0], 38942.8, 5)
+    assert_approx(vap.enth_mol[0], 78048.7, 5)
+    assert_approx(liq.entr_mol[0], -361.794, 5)
+    assert_approx(vap.entr_mol[0], -264.0181, 5)
+
+
+def test_flash_tp():
+    ev = get_evaluator()
+    result = ev.flash_tp([350, 368, 376, 450], 1e5, [[0.5, 0.5], [0.5, 0.5], [0.2, 0.8], [0.5, 0.5]])
+
+    assert result.converged.all()
+    # Subcooled and superheated
+    assert result.vapor_frac[0] == 0
+    assert result.vapor_frac[3] == 1
+    np.testing.assert_allclose(result.mole_frac_liq[0], [0.5, 0.5])
+    # Two phase
+    assert_approx(result.mole_frac_liq[1, 0], 0.4012128, 2)
+    assert_approx(result.mole_frac_vap[1, 0], 0.6141738, 2)
+    assert_approx(result.mole_frac_liq[2, 0], 0.17342, 2)
+    assert_approx(result.mole_frac_vap[2, 0], 0.3267155, 2)
+    assert_approx(result.liq.enth_mol[1], 38235.1, 5)
+    assert_approx(result.vap.enth_mol[1], 77155.4, 5)
+
+    # Mixture enthalpy is the phase fraction weighted sum
+    V = result.vapor_frac
+    np.testing.assert_allclose(result.enth_mol, (1 - V) * result.liq.enth_mol + V * result.vap.enth_mol)
+
+
+def test_flash_mass_balance():
+    ev = get_evaluator()
+    T = np.linspace(300, 500, 200)
+    z = np.column_stack([np.linspace(0.05, 0.95, 200), np.linspace(0.95, 0.05, 200)])
+    result = ev.flash_tp(T, 2e5, z)
+
+    assert result.converged.all()
+    V = result.vapor_frac[:, None]
+    np.testing.assert_allclose((1 - V) * result.mole_frac_liq + V * result.mole_frac_vap, z, atol=1e-8)
+    # Enthalpy increases with temperature through the phase change
+    assert np.all(np.diff(result.enth_mol) > 0)
+
+
+def test_non_condensable_component():
+    ev = PengRobinsonEvaluator.from_package(["carbon dioxide", "benzene"], ["Liq", "Vap"])
+    result = ev.flash_tp(300, 1e5, [0.5, 0.5])
+
+    assert 0 < result.vapor_frac[0] < 1
+    assert result.mole_frac_liq[0, 0] == 0
@@ -0,0 +1,7 @@
+"""
+Wilson K-value correlation, ln K = ln(Pc / P) + WILSON (1 + omega) (1 - Tc / T), for
+estimating the phase split of the cubic packages before solving.
+"""
+
+# Wilson K-value correlation constant
+WILSON = 5.373
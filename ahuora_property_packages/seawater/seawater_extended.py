@@ -1,9 +1,11 @@
 from pyomo.environ import Expression, Constraint, check_optimal_termination
 from watertap.property_models.seawater_prop_pack import SeawaterParameterData, SeawaterStateBlockData, _SeawaterStateBlock
+from ahuora_property_packages.base.instrumentation import StageRecorder
 from ahuora_property_packages.base.state_block_constraints import StateBlockConstraints
+from ahuora_property_packages.base.solvers import get_initialization_solver
 from idaes.core import declare_process_block_class
 from watertap.core.solvers import get_solver
-from idaes.core.util.initialization import fix_state_vars, solve_indexed_blocks
+from idaes.core.util.initialization import fix_state_vars
 from idaes.core.util.model_statistics import degrees_of_freedom, number_unfixed_variables
 from idaes.core.util.exceptions import InitializationError, PropertyPackageError
 import idaes.logger as idaeslog
@@ -56,7 +58,7 @@ def _convert_expression_to_var(expr: ScalarExpression | IndexedExpression):
     block.add_component(f"{expr.local_name}_constraint", constraint)
     return var
 
-def _deactivate_additional_constraints(self: _ExtendedSeawaterStateBlock):
+def _deactivate_additional_constraints(self: "_ExtendedSeawaterStateBlock"):
     # Temporarily deactivate platform constraints added with
     # StateBlockConstraints.constrain()) so they don't interfere with
     # initialization.
@@ -72,11 +74,11 @@ def _deactivate_additional_constraints(self: _ExtendedSeawaterStateBlock):
     
     self.deactivated_vars = deactivated_vars
 
-def _reactivate_additional_constraints(self: _ExtendedSeawaterStateBlock):
+def _reactivate_additional_constraints(self: "_ExtendedSeawaterStateBlock"):
     for var, value in self.deactivated_vars:
         var.fix(value)
 
-def _solve_block(self, solve_log, init_log, opt, step_name):
+def _solve_block(self, solve_log, init_log, opt, step_name, recorder):
     skip_solve = True  # skip solve if only state variables are present
     for k in self.keys():
         if number_unfixed_variables(self[k]) != 0:
@@ -85,7 +87,7 @@ def _solve_block(self, solve_log, init_log, opt, step_name):
     if not skip_solve:
         # Initialize properties
         with idaeslog.solver_log(solve_log, idaeslog.DEBUG) as slc:
-            results = solve_indexed_blocks(opt, [self], tee=slc.tee)
+            results = recorder.solve(opt, tee=slc.tee)
         init_log.info_high(
             f"Property initialization {step_name}: {idaeslog.condition(results)}"
         )
@@ -128,7 +130,8 @@ class _ExtendedSeawaterStateBlock(_SeawaterStateBlock):
                 after initialization and a flags dict is returned so the
                 caller can later call ``release_state``.
             outlvl: IDAES logging output level.
-            solver: Pyomo solver object (default: IDAES default solver).
+            solver: Solver name or Pyomo solver object (default: WaterTAP
+                default solver), see base.solvers.get_initialization_solver.
             optarg (dict, optional): Solver options.
 
         Returns:
@@ -139,8 +142,11 @@ class _ExtendedSeawaterStateBlock(_SeawaterStateBlock):
         init_log = idaeslog.getInitLogger(self.name, outlvl, tag="properties")
         solve_log = idaeslog.getSolveLogger(self.name, outlvl, tag="properties")
 
-        # Set solver and options
-        opt = get_solver(solver, optarg)
+        # Stage timings, and events for any hooks, see base.instrumentation
+        recorder = StageRecorder(self, "seawater")
+
+        # Set solver and options, WaterTAP's IPOPT unless one is given
+        opt = get_initialization_solver(solver, optarg, factory=get_solver)
 
         # Fix state variables
         _deactivate_additional_constraints(self)
@@ -155,14 +161,18 @@ class _ExtendedSeawaterStateBlock(_SeawaterStateBlock):
                     "freedom for state block is not "
                     "zero during initialization."
                 )
+        recorder.end_stage("fix_state_vars")
 
-        _solve_block(self, solve_log, init_log, opt, step_name="Initial solve with state vars fixed")
+        _solve_block(self, solve_log, init_log, opt, step_name="Initial solve with state vars fixed", recorder=recorder)
+        recorder.end_stage("initial_solve")
 
         self.release_state(flags)
         if degrees_of_freedom(self) == 0:
             # We want to solve again, with any constraints reactivated, to ensure that the state variables have the correct values.
             
-            _solve_block(self, solve_log, init_log, opt, step_name="Second solve with constraints reactivated")
+            _solve_block(self, solve_log, init_log, opt, step_name="Second solve with constraints reactivated", recorder=recorder)
+        recorder.end_stage("second_solve")
+        recorder.finish()
 
         if hold_state:
             # Switch back to state vars fixed
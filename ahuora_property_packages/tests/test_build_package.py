@@ -0,0 +1,85 @@
+import subprocess
+import sys
+import typing
+import pytest
+from pyomo.environ import ConcreteModel
+from idaes.core import FlowsheetBlock
+from ahuora_property_packages import build_package as registry
+from ahuora_property_packages.build_package import build_package, get_builder, register_package
+from ahuora_property_packages.combustion.biomass_builder import build_biomass_combustion_reaction_package
+from ahuora_property_packages.types import PackageName
+
+
+def test_import_is_lazy():
+    # In a fresh interpreter, as other tests have already imported the packages
+    code = (
+        "import sys\n"
+        "from ahuora_property_packages.build_package import build_package\n"
+        "assert not [m for m in sys.modules if m.startswith(('idaes', 'pyomo', 'watertap'))]\n"
+        "build_package('milk', ['water', 'milk_solid'])\n"
+        "assert 'ahuora_property_packages.milk.milk_builder' in sys.modules\n"
+        "assert 'ahuora_property_packages.humid_air' not in sys.modules\n"
+        "assert 'ahuora_property_packages.seawater' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_builtin_packages_resolve():
+    for package_name in registry.PACKAGE_BUILDERS:
+        if package_name == "helmholtz":
+            continue  # Needs the Helmholtz external functions to import
+        assert callable(get_builder(package_name)), package_name
+
+
+def test_builder_options():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_package("peng-robinson", ["benzene", "toluene"], kappa_temperature_range=(300, 400))
+    m.fs.reactions = build_package("biomass_combustion_reaction", ["biomass", "oxygen"],
+                                   property_package=m.fs.properties)
+    assert m.fs.reactions.config.property_package is m.fs.properties
+
+
+def test_package_names_typed():
+    names = {name for literal in typing.get_args(PackageName) for name in typing.get_args(literal)}
+    assert set(registry.PACKAGE_BUILDERS) <= names
+
+
+def test_deprecated_pp_argument():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_package("biomass_and_flue", ["biomass", "oxygen"])
+    with pytest.warns(DeprecationWarning, match="property_package"):
+        m.fs.reactions = build_biomass_combustion_reaction_package(["biomass", "oxygen"], pp=m.fs.properties)
+    assert m.fs.reactions.config.property_package is m.fs.properties
+
+
+def test_register_package():
+    calls = []
+
+    def build_test_package(compound_list, valid_states):
+        calls.append((compound_list, valid_states))
+        return "built"
+
+    register_package("test_package", build_test_package)
+    try:
+        assert build_package("test_package", ["water"], ["Liq"]) == "built"
+        assert calls == [(["water"], ["Liq"])]
+    finally:
+        registry._builders.pop("test_package")
+
+    register_package("test_package", "ahuora_property_packages.milk.milk_builder:build_milk_package")
+    try:
+        assert get_builder("test_package").__name__ == "build_milk_package"
+    finally:
+        registry._builders.pop("test_package")
+        registry.PACKAGE_BUILDERS.pop("test_package")
+
+
+def test_invalid_package():
+    with pytest.raises(ValueError):
+        build_package("not_a_package", ["water"])
+    with pytest.raises(NotImplementedError):
+        build_package("genericML", ["water"])
+    with pytest.raises(ValueError):
+        build_package("milk", ["water", "milk_solid"], ["Sol"])
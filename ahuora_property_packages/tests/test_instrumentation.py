@@ -0,0 +1,112 @@
+import pytest
+from pyomo.contrib.pynumero.algorithms.solvers.cyipopt_solver import PyomoCyIpoptSolver
+from pyomo.environ import Block, ConcreteModel, Constraint, Var
+from pyomo.opt import SolverResults, TerminationCondition
+from ahuora_property_packages.base.instrumentation import (
+    INIT_EVENTS_ENV,
+    InitializationCollector,
+    StageRecorder,
+    active_hooks,
+    instrument,
+    read_events,
+)
+
+
+class RecordingSolver:
+    """Solver that leaves the model as it is, and reports an optimal solve."""
+    name = "recording"
+
+    def solve(self, model, **kwargs):
+        res = SolverResults()
+        res.solver.termination_condition = TerminationCondition.optimal
+        return res
+
+
+class CountingSolver(PyomoCyIpoptSolver):
+    """cyipopt solver that calls the intermediate callback for three iterations."""
+
+    def solve(self, model, intermediate_callback=None, **kwargs):
+        for iteration in range(4):
+            assert intermediate_callback(None, 0, iteration, 0.0, 0.0, 0.0, 0.1, 0.0, 0.0, 1.0, 1.0, 0)
+        return RecordingSolver().solve(model)
+
+
+class ReportingSolver(RecordingSolver):
+    """Solver whose results report the iterations."""
+
+    def solve(self, model, **kwargs):
+        res = super().solve(model)
+        res.solver.iterations = 7
+        return res
+
+
+def indexed_block():
+    m = ConcreteModel()
+    m.b = Block([0, 1])
+    for b in m.b.values():
+        b.x = Var(initialize=1)
+        b.y = Var(initialize=1)
+        b.x.fix()
+        b.eq = Constraint(expr=b.y == 2 * b.x)
+    return m.b
+
+
+def test_events():
+    blk = indexed_block()
+    collector = InitializationCollector()
+    with instrument(collector):
+        recorder = StageRecorder(blk, "test")
+        recorder.end_stage("guesses")
+        recorder.solve(RecordingSolver())
+        recorder.end_stage("properties")
+        recorder.finish()
+    assert collector not in active_hooks()
+
+    assert [(e.stage, e.index) for e in collector.events] == [
+        ("guesses", 0), ("guesses", 1), ("properties", 0), ("properties", 1), ("total", 0), ("total", 1)
+    ]
+    guesses, _, properties, _, total, _ = collector.events
+    assert guesses.status is None
+    assert properties.status == "optimal"
+    assert properties.n_cons == 1 and properties.dof == 0 and properties.blocks == 2
+    assert total.status == "optimal"
+    assert total.seconds == pytest.approx(guesses.seconds + properties.seconds)
+    assert set(blk.initialization_timings) == {"guesses", "properties", "total"}
+    assert collector.stage_seconds()["total"] == pytest.approx(total.seconds)
+    assert collector.slowest(1) == [total]
+
+
+@pytest.mark.parametrize("solver, iterations", [
+    (RecordingSolver(), None), (CountingSolver(), 3), (ReportingSolver(), 7),
+])
+def test_iterations(solver, iterations):
+    collector = InitializationCollector()
+    with instrument(collector):
+        recorder = StageRecorder(indexed_block(), "test")
+        recorder.solve(solver)
+        recorder.end_stage("properties")
+    assert [e.iterations for e in collector.events] == [iterations, iterations]
+
+
+def test_json_lines(tmp_path, monkeypatch):
+    path = str(tmp_path / "events.jsonl")
+    monkeypatch.setenv(INIT_EVENTS_ENV, path)
+    recorder = StageRecorder(indexed_block(), "test")
+    recorder.end_stage("guesses")
+    recorder.finish()
+    active_hooks()[-1].close()
+
+    events = read_events(path)
+    assert [(e.block, e.index, e.stage) for e in events] == [
+        ("b", 0, "guesses"), ("b", 1, "guesses"), ("b", 0, "total"), ("b", 1, "total")
+    ]
+
+
+def test_no_hooks(monkeypatch):
+    monkeypatch.delenv(INIT_EVENTS_ENV, raising=False)
+    blk = indexed_block()
+    recorder = StageRecorder(blk, "test")
+    assert recorder.hooks == []
+    recorder.end_stage("guesses")
+    recorder.finish()
+    assert set(blk.initialization_timings) == {"guesses", "total"}
@@ -0,0 +1,53 @@
+import pytest
+from idaes.models.properties.modular_properties.eos import ceos_common
+from ahuora_property_packages.utils.model_size import (
+    CASES,
+    Regression,
+    compare,
+    externals_available,
+    load_baseline,
+    measure_case,
+    without_externals,
+)
+
+baseline = load_baseline()
+
+
+@pytest.mark.parametrize("case", sorted(set(CASES) & set(baseline["models"])))
+def test_model_size(case):
+    if not externals_available(case):
+        pytest.skip(f"{CASES[case].package} external functions not available")
+    regressions = compare(case, measure_case(case), baseline)
+    assert regressions == [], (
+        "State block grew, if this is intended update the baseline with "
+        "python -m ahuora_property_packages.utils.model_size --update"
+    )
+
+
+def test_every_case_has_a_baseline():
+    assert set(baseline["models"]) == set(CASES)
+
+
+def test_without_externals():
+    available = ceos_common.cubic_roots_available
+    with without_externals():
+        assert ceos_common.cubic_roots_available()
+    assert ceos_common.cubic_roots_available is available
+    measured = measure_case("milk", externals=False)
+    assert "nl_bytes" not in measured
+    assert compare("milk", measured, baseline) == []
+
+
+def test_tolerances():
+    baseline = {
+        "tolerances": {"expression_nodes": 0.1},
+        "models": {"a": {"variables": 10, "constraints": 5, "expression_nodes": 100}},
+    }
+    measured = {"variables": 10, "constraints": 4, "expression_nodes": 110, "jacobian_nonzeros": 1, "nl_bytes": 1}
+    # Fewer constraints are not a regression
+    assert compare("a", measured, baseline) == []
+    assert compare("a", {**measured, "variables": 11}, baseline) == [Regression("a", "variables", 10, 11, 10)]
+    assert compare("a", measured, baseline, {"expression_nodes": 0.05}) == [
+        Regression("a", "expression_nodes", 100, 110, pytest.approx(105))
+    ]
+    assert compare("b", measured, baseline) == []
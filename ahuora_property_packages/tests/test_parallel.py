@@ -0,0 +1,105 @@
+import os
+import pytest
+from pyomo.common.errors import ApplicationError
+from pyomo.environ import ConcreteModel, SolverFactory, Var, value
+from idaes.core import FlowsheetBlock
+from idaes.core.base.process_base import ProcessBlockData
+from idaes.core.base.process_block import ProcessBlock, declare_process_block_class
+from idaes.core.util.exceptions import InitializationError
+from ahuora_property_packages.base import parallel
+from ahuora_property_packages.base.parallel import ParallelInitializationError, chunk_indices, initialize_parallel
+from ahuora_property_packages.helmholtz_tabulated.tabulated_builder import build_helmholtz_tabulated_package
+
+
+def test_chunk_indices():
+    assert chunk_indices(range(7), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert chunk_indices(range(2), 4) == [[0], [1]]
+    assert chunk_indices([], 4) == [[]]
+
+
+class _CrashingBlock(ProcessBlock):
+
+    def initialize(blk, **kwargs):
+        # The worker exits, as it would on a segfault in an external function
+        if 2 in blk.keys():
+            os._exit(1)
+        for idx, b in blk.items():
+            b.x.set_value(10 * idx)
+
+
+@declare_process_block_class("CrashingBlock", block_class=_CrashingBlock)
+class CrashingBlockData(ProcessBlockData):
+
+    def build(self):
+        super().build()
+        self.x = Var(initialize=0)
+
+
+@pytest.mark.skipif(parallel._fork_context() is None, reason="Processes cannot be forked")
+def test_worker_exit_fails_its_chunk():
+    m = ConcreteModel()
+    m.b = CrashingBlock(range(4))
+    with pytest.raises(ParallelInitializationError) as e:
+        initialize_parallel(m.b, 2)
+    assert e.value.indices == [2]
+    assert [value(b.x) for b in m.b.values()] == [0, 10, 0, 30]
+
+
+class _NoSolverBlock(ProcessBlock):
+
+    def initialize(blk, **kwargs):
+        raise ApplicationError("No executable found for solver 'ipopt'")
+
+
+@declare_process_block_class("NoSolverBlock", block_class=_NoSolverBlock)
+class NoSolverBlockData(ProcessBlockData):
+
+    def build(self):
+        super().build()
+        self.x = Var(initialize=0)
+
+
+@pytest.mark.skipif(parallel._fork_context() is None, reason="Processes cannot be forked")
+def test_solver_error_raised():
+    m = ConcreteModel()
+    m.b = NoSolverBlock(range(4))
+    # Not reported as failed indices, or retried one index at a time
+    with pytest.raises(ApplicationError, match="No executable"):
+        initialize_parallel(m.b, 2)
+
+
+def test_values_by_name():
+    m = ConcreteModel()
+    m.b = CrashingBlock(range(2))
+    values = parallel._values(m.b[0])
+    assert values == {"x": 0}
+    parallel._set_values(m.b[1], {"x": 5})
+    assert value(m.b[1].x) == 5
+    with pytest.raises(InitializationError, match="y"):
+        parallel._set_values(m.b[1], {"x": 5, "y": 1})
+
+
+@pytest.mark.skipif(parallel._fork_context() is None, reason="Processes cannot be forked")
+@pytest.mark.skipif(not SolverFactory("ipopt").available(exception_flag=False), reason="IPOPT not available")
+def test_failed_index_reported(table_file):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_helmholtz_tabulated_package(["synthetic"], table_file=table_file)
+    m.fs.sb = m.fs.properties.build_state_block(range(6), defined_state=True)
+    for i, sb in m.fs.sb.items():
+        sb.constrain("flow_mol", 1)
+        sb.constrain("pressure", 1e5)
+        if i == 4:
+            sb.constrain("vapor_frac", 0.5)
+        else:
+            sb.constrain("temperature", 300 + 50 * i)
+    # Over specified, so it can only fail
+    m.fs.sb[2].enth_mol.fix(1000)
+
+    with pytest.raises(ParallelInitializationError) as e:
+        m.fs.sb.initialize(parallel=2)
+    # The rest of its chunk succeeds when retried
+    assert e.value.indices == [2]
+    # The vapor fraction constraint is replaced as in the workers
+    assert hasattr(m.fs.sb[4].constraints, "custom_vapor_frac")
+    assert not hasattr(m.fs.sb[4].constraints, "vapor_frac")
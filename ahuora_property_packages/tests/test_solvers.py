@@ -0,0 +1,74 @@
+import pytest
+from pyomo.environ import SolverFactory
+from ahuora_property_packages.base import solvers
+from ahuora_property_packages.base.solvers import SOLVER_BACKEND_ENV, get_initialization_solver
+
+
+@pytest.fixture(autouse=True)
+def clear_solvers(monkeypatch):
+    monkeypatch.setattr(solvers, "_solvers", {})
+
+
+def test_default_follows_idaes_config(monkeypatch):
+    import idaes
+
+    opt = get_initialization_solver(optarg={"max_iter": 50})
+    assert opt.name == "ipopt"
+    assert opt.options["max_iter"] == 50
+    assert get_initialization_solver().options["max_iter"] != 50
+    # A later change to the IDAES default solver options is used
+    monkeypatch.setitem(idaes.cfg.ipopt.options, "tol", 1e-10)
+    assert get_initialization_solver().options["tol"] == 1e-10
+
+
+class RecordingSolver:
+    name = "recording"
+
+    def __init__(self):
+        self.options = {}
+        self.solves = []
+
+    def solve(self, model, **kwds):
+        self.solves.append(kwds)
+
+
+def test_solver_object():
+    opt = SolverFactory("ipopt")
+    assert get_initialization_solver(opt) is opt
+
+    opt = RecordingSolver()
+    with_options = get_initialization_solver(opt, {"tol": 1e-10, "max_iter": 50})
+    assert with_options.name == "recording"
+    with_options.solve(None, tee=True, options={"max_iter": 10})
+    assert opt.solves == [{"tee": True, "options": {"tol": 1e-10, "max_iter": 10}}]
+    # The caller's solver object is left as it was
+    assert opt.options == {}
+
+
+def test_backend(monkeypatch):
+    monkeypatch.setattr(solvers, "in_process_available", lambda: True)
+    # Subprocess unless in process is asked for
+    assert get_initialization_solver("ipopt").name == "ipopt"
+
+    monkeypatch.setenv(SOLVER_BACKEND_ENV, "auto")
+    opt = get_initialization_solver("ipopt", {"max_iter": 50})
+    assert opt.config.options["max_iter"] == 50
+    # IDAES IPOPT defaults are kept
+    assert opt.config.options["nlp_scaling_method"] == "gradient-based"
+    assert get_initialization_solver("ipopt", {"max_iter": 50}) is opt
+    assert get_initialization_solver("ipopt") is not opt
+
+    monkeypatch.setenv(SOLVER_BACKEND_ENV, "in_process")
+    monkeypatch.setattr(solvers, "in_process_available", lambda: False)
+    with pytest.raises(RuntimeError):
+        get_initialization_solver("ipopt")
+
+    monkeypatch.setenv(SOLVER_BACKEND_ENV, "threads")
+    with pytest.raises(ValueError):
+        get_initialization_solver()
+
+
+def test_auto_backend_falls_back(monkeypatch):
+    monkeypatch.setenv(SOLVER_BACKEND_ENV, "auto")
+    monkeypatch.setattr(solvers, "in_process_available", lambda: False)
+    assert get_initialization_solver().name == "ipopt"
@@ -0,0 +1,116 @@
+import pytest
+from pyomo.environ import ConcreteModel, value
+from idaes.core import FlowsheetBlock
+from ahuora_property_packages.base.warm_start import (
+    WARM_START_ENV,
+    WarmStart,
+    WarmStartStats,
+    WarmStartStore,
+    get_warm_start_store,
+)
+from ahuora_property_packages.helmholtz_tabulated.tabulated_builder import build_helmholtz_tabulated_package
+from ahuora_property_packages.utils.fix_state_vars import fix_state_vars
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = WarmStartStore(str(tmp_path / "warm_start.sqlite"), capacity=3)
+    yield store
+    store.close()
+
+
+def test_nearest(store):
+    assert store.lookup("a", [300.0, 1e5]) is None
+    store.store("a", [300.0, 1e5], {"x": 1.0})
+    store.store("a", [400.0, 1e5], {"x": 2.0})
+    store.store("b", [350.0, 1e5], {"x": 3.0})
+    assert store.lookup("a", [340.0, 1.1e5]) == {"x": 1.0}
+    assert store.lookup("a", [390.0, 1e5]) == {"x": 2.0}
+    # Same specification replaces the entry
+    store.store("a", [400.0, 1e5], {"x": 4.0})
+    assert store.lookup("a", [400.0, 1e5]) == {"x": 4.0}
+    assert len(store) == 3
+    assert store.stats == WarmStartStats(hits=3, misses=1, stores=4, evictions=0)
+
+
+def test_many(store):
+    store.store_many([
+        ("a", [300.0, 1e5], {"x": 1.0}),
+        ("a", [400.0, 1e5], {"x": 2.0}),
+        # Replaces the first
+        ("a", [300.0, 1e5], {"x": 3.0}),
+    ])
+    assert len(store) == 2
+    assert store.lookup_many([("a", [310.0, 1e5]), ("b", [310.0, 1e5]), ("a", [390.0, 1e5])]) == [
+        {"x": 3.0}, None, {"x": 2.0}
+    ]
+    assert store.stats == WarmStartStats(hits=2, misses=1, stores=3, evictions=0)
+
+
+def test_least_recently_used_evicted(store):
+    for i in range(3):
+        store.store("a", [float(i)], {"x": float(i)})
+    store.lookup("a", [0.0])
+    store.store("a", [10.0], {"x": 10.0})
+    assert len(store) == 3
+    assert store.stats.evictions == 1
+    # 1 was the least recently used
+    assert store.lookup("a", [1.0]) != {"x": 1.0}
+    assert store.lookup("a", [0.0]) == {"x": 0.0}
+
+
+def test_persisted(tmp_path):
+    path = str(tmp_path / "warm_start.sqlite")
+    WarmStartStore(path).store("a", [1.0], {"x": 1.0})
+    assert WarmStartStore(path).lookup("a", [1.0]) == {"x": 1.0}
+
+
+def test_default_store(tmp_path, monkeypatch, store):
+    monkeypatch.delenv(WARM_START_ENV, raising=False)
+    assert get_warm_start_store() is None
+    assert get_warm_start_store(store) is store
+    monkeypatch.setenv(WARM_START_ENV, str(tmp_path / "default.sqlite"))
+    assert get_warm_start_store() is get_warm_start_store()
+
+
+def state_block(table_file, temperature):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_helmholtz_tabulated_package(["synthetic"], table_file=table_file)
+    m.fs.sb = m.fs.properties.build_state_block([0], defined_state=True)
+    m.fs.sb[0].constrain("flow_mol", 1)
+    m.fs.sb[0].constrain("pressure", 1e5)
+    m.fs.sb[0].constrain("temperature", temperature)
+    return m.fs.sb
+
+
+def test_state_block(table_file, store):
+    blk = state_block(table_file, 450)
+    warm_start = WarmStart(blk, store)
+    fix_state_vars(blk)
+    assert warm_start.restore() == 0
+    blk[0].enth_mol.set_value(12345.0)
+    warm_start.save()
+
+    # A nearby specification starts from the stored enthalpy
+    blk = state_block(table_file, 455)
+    warm_start = WarmStart(blk, store)
+    fix_state_vars(blk)
+    blk[0].enth_mol.set_value(1000.0)
+    assert warm_start.restore() == 1
+    assert value(blk[0].enth_mol) == 12345.0
+    assert value(blk[0].pressure) == 1e5
+
+    # A failed solve goes back to the previous guesses
+    def fail(opt, tee=False):
+        raise ValueError("Solver did not converge")
+
+    assert warm_start.solve(blk, None, solve=fail) is None
+    assert value(blk[0].enth_mol) == 1000.0
+
+    # A different state definition does not
+    blk = state_block(table_file, 450)
+    blk[0].constrain("vapor_frac", 0.5)
+    warm_start = WarmStart(blk, store)
+    fix_state_vars(blk)
+    assert warm_start.restore() == 0
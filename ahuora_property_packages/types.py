@@ -1,4 +1,5 @@
 from typing import Literal
 
-PackageName = Literal["peng-robinson"] | Literal[ "helmholtz"]  | Literal["nrtl"] | Literal["milk"] | Literal["humid_air"]
+PackageName = Literal["peng-robinson"] | Literal[ "helmholtz"]  | Literal["nrtl"] | Literal["milk"] | Literal["humid_air"] \
+    | Literal["helmholtz-tabulated"] | Literal["biomass_and_flue"] | Literal["biomass_combustion_reaction"] | Literal["seawater"]
 States = Literal["Liq"] | Literal["Vap"]
\ No newline at end of file
@@ -0,0 +1,12 @@
+import os
+
+"""
+Directory for files computed at runtime, e.g. property tables and saturation curves.
+The installed package may be read only, so they are written to the user's cache
+directory rather than next to the modules.
+"""
+
+CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "ahuora_property_packages",
+)
@@ -0,0 +1,299 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from pyomo.environ import ConcreteModel, Constraint, Expression
+from pyomo.common.collections import ComponentSet
+from pyomo.common.numeric_types import native_types
+from pyomo.core.expr.visitor import identify_variables
+from idaes.core import FlowsheetBlock
+from idaes.core.util.model_statistics import number_activated_constraints, number_variables
+
+from ahuora_property_packages.build_package import build_package
+
+"""
+Tracks the size of a canonical state block of each property package, so that
+extra variables, constraints and expressions do not land unnoticed.
+
+Each case builds a state block with one index, specifies it and builds the
+properties almost every flowsheet uses, e.g. enthalpy and entropy. The model is
+measured by its variables, active constraints, Jacobian nonzeros (unfixed
+variables of each active constraint), expression nodes (of the constraints and
+named expressions, counting each named expression once) and the size of its NL
+file.
+
+Sizes are compared against the checked-in baseline, model_size_baseline.json,
+which holds the relative tolerance of each metric. Only increases beyond the
+tolerance are regressions. After an intended change, update the baseline with:
+
+    python -m ahuora_property_packages.utils.model_size --update
+
+Peng-Robinson and Helmholtz state blocks need the cubic root and Helmholtz
+external functions to build. Where they are not installed, those cases can be
+measured with --without-externals, which lets them build without the functions.
+Their values are then stand-ins, so the NL file, which holds the initial values,
+is not measured, and their baselines have no nl_bytes:
+
+    python -m ahuora_property_packages.utils.model_size --without-externals --cases peng-robinson-bt --update
+"""
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "model_size_baseline.json")
+
+METRICS = ["variables", "constraints", "jacobian_nonzeros", "expression_nodes", "nl_bytes"]
+
+DEFAULT_TOLERANCES = {
+    "variables": 0.0,
+    "constraints": 0.0,
+    "jacobian_nonzeros": 0.0,
+    "expression_nodes": 0.02,
+    # Varies a little with the Pyomo version
+    "nl_bytes": 0.05,
+}
+
+
+class Case(NamedTuple):
+    package: str
+    compounds: List[str]
+    # "helmholtz", "seawater", or the mole fractions with fixed T and P
+    spec: Union[str, Dict[str, float]]
+    # Properties built on demand that almost every flowsheet uses
+    properties: Tuple[str, ...] = ("enth_mol", "entr_mol")
+    # K, at 101325 Pa
+    temperature: float = 350.0
+
+
+CASES = {
+    "peng-robinson-bt": Case("peng-robinson", ["benzene", "toluene"], {"benzene": 0.5, "toluene": 0.5}),
+    "peng-robinson-asu": Case(
+        "peng-robinson", ["nitrogen", "oxygen", "argon"], {"nitrogen": 0.78, "oxygen": 0.21, "argon": 0.01}
+    ),
+    "helmholtz": Case("helmholtz", ["h2o"], "helmholtz"),
+    "helmholtz-tabulated": Case("helmholtz-tabulated", ["water"], "helmholtz"),
+    "milk": Case("milk", ["water", "milk_solid"], {"water": 0.9, "milk_solid": 0.1}),
+    "humid_air": Case("humid_air", ["water", "air"], {"water": 0.01, "air": 0.99}),
+    "biomass_and_flue": Case(
+        "biomass_and_flue",
+        ["biomass", "water", "carbon dioxide", "oxygen", "carbon monoxide", "nitrogen", "ash"],
+        {"biomass": 0.1, "ash": 0.01, "O2": 0.2, "CO2": 0.05, "CO": 0.01, "H2O": 0.05, "N2": 0.58},
+        # Entropy is not defined for the solid phase
+        properties=("enth_mol",),
+    ),
+    "seawater": Case("seawater", ["H2O", "TDS"], "seawater", temperature=300.0),
+}
+
+
+# Checks for the external functions each package needs to build
+EXTERNALS = {
+    "peng-robinson": "idaes.models.properties.modular_properties.eos.ceos_common:cubic_roots_available",
+    "helmholtz": "idaes.models.properties.general_helmholtz.helmholtz_functions:helmholtz_available",
+}
+
+
+class Regression(NamedTuple):
+    case: str
+    metric: str
+    baseline: int
+    measured: int
+    limit: float
+
+
+def build_case(case: str) -> ConcreteModel:
+    case = CASES[case]
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_package(case.package, case.compounds)
+    m.fs.state = m.fs.properties.build_state_block([0], defined_state=True)
+    sb = m.fs.state[0]
+    specify(sb, case)
+    for prop in case.properties:
+        getattr(sb, prop)
+    return m
+
+
+def specify(sb, case: Case, temperature: Optional[float] = None):
+    """Specifies a state block of case, at temperature or else the case's temperature."""
+    temperature = case.temperature if temperature is None else temperature
+    if case.spec == "helmholtz":
+        sb.constrain("flow_mol", 1)
+        sb.constrain("pressure", 101325)
+        sb.constrain("temperature", temperature)
+    elif case.spec == "seawater":
+        sb.flow_mass_phase_comp["Liq", "H2O"].fix(0.965)
+        sb.flow_mass_phase_comp["Liq", "TDS"].fix(0.035)
+        sb.temperature.fix(temperature)
+        sb.pressure.fix(101325)
+    else:
+        sb.flow_mol.fix(1)
+        sb.temperature.fix(temperature)
+        sb.pressure.fix(101325)
+        for j, x in case.spec.items():
+            sb.mole_frac_comp[j].fix(x)
+
+
+def externals_available(case: str) -> bool:
+    """Returns whether the external functions case needs to build are installed."""
+    check = EXTERNALS.get(CASES[case].package)
+    if check is None:
+        return True
+    module, _, name = check.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+@contextmanager
+def without_externals():
+    """
+    Lets the cases that need external functions build without them. The models
+    only reference the functions, except where a package evaluates one for an
+    initial value, which gets 1.
+    """
+    from pyomo.core.base.external import AMPLExternalFunction
+    from idaes.models.properties.general_helmholtz import helmholtz_functions
+
+    patches = [(importlib.import_module(check.partition(":")[0]), check.partition(":")[2], lambda: True)
+               for check in EXTERNALS.values()]
+    patches.append((helmholtz_functions.HelmholtzParameterBlockData, "available", lambda self: True))
+    patches.append((AMPLExternalFunction, "_evaluate", lambda self, args, fixed, fgh: (1.0, None, None)))
+    originals = [(owner, name, owner.__dict__[name]) for owner, name, _ in patches]
+    try:
+        for owner, name, replacement in patches:
+            setattr(owner, name, replacement)
+        yield
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+
+def measure(m, nl: bool = True) -> Dict[str, int]:
+    """Measures m, without the NL file size if nl is False."""
+    constraints = list(m.component_data_objects(Constraint, active=True, descend_into=True))
+    expressions = list(m.component_data_objects(Expression, active=True, descend_into=True))
+    sizes = {
+        "variables": number_variables(m),
+        "constraints": number_activated_constraints(m),
+        "jacobian_nonzeros": sum(
+            len(ComponentSet(identify_variables(c.body, include_fixed=False))) for c in constraints
+        ),
+        "expression_nodes": sum(_nodes(c.body) for c in constraints)
+        + sum(_nodes(e.expr) for e in expressions),
+    }
+    if nl:
+        sizes["nl_bytes"] = _nl_bytes(m)
+    return sizes
+
+
+def measure_case(case: str, externals: bool = True) -> Dict[str, int]:
+    """Measures case, see without_externals if externals is False."""
+    if externals:
+        return measure(build_case(case))
+    with without_externals():
+        return measure(build_case(case), nl=False)
+
+
+def _nodes(expr) -> int:
+    # Named expressions are leaves, they are counted once on their own
+    count = 0
+    stack = [expr]
+    while stack:
+        e = stack.pop()
+        count += 1
+        if type(e) in native_types or not e.is_expression_type() or e.is_named_expression_type():
+            continue
+        stack.extend(e.args)
+    return count
+
+
+def _nl_bytes(m) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.nl")
+        m.write(path, format="nl", io_options={"symbolic_solver_labels": False})
+        return os.path.getsize(path)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"tolerances": dict(DEFAULT_TOLERANCES), "models": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(baseline: dict, path: str = BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    case: str, measured: Dict[str, int], baseline: dict, tolerances: Optional[Dict[str, float]] = None
+) -> List[Regression]:
+    """Returns the metrics of case that grew beyond their tolerance of the baseline."""
+    tolerances = {**DEFAULT_TOLERANCES, **baseline.get("tolerances", {}), **(tolerances or {})}
+    expected = baseline["models"].get(case)
+    if expected is None:
+        return []
+    regressions = []
+    for metric in METRICS:
+        if metric not in expected or metric not in measured:
+            continue
+        limit = expected[metric] * (1 + tolerances[metric])
+        if measured[metric] > limit:
+            regressions.append(Regression(case, metric, expected[metric], measured[metric], limit))
+    return regressions
+
+
+def _parse_tolerance(text: str):
+    metric, _, tolerance = text.partition("=")
+    if metric not in METRICS:
+        raise argparse.ArgumentTypeError(f"Unknown metric {metric}, expected one of {METRICS}")
+    return metric, float(tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=_parse_tolerance, action="append", default=[],
+                        metavar="METRIC=REL", help="override a relative tolerance, e.g. nl_bytes=0.1")
+    parser.add_argument("--update", action="store_true", help="write the measured sizes to the baseline")
+    parser.add_argument("--without-externals", action="store_true",
+                        help="measure cases that need external functions without them, and without nl_bytes")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    tolerances = dict(args.tolerance)
+    regressions = []
+    print(f"{'case':>20} " + " ".join(f"{metric:>18}" for metric in METRICS))
+    for case in args.cases:
+        try:
+            measured = measure_case(case, externals=not (args.without_externals and EXTERNALS.get(CASES[case].package)))
+        except Exception as e:
+            print(f"{case:>20} failed to build: {type(e).__name__}: {e}")
+            continue
+        expected = baseline["models"].get(case, {})
+        print(f"{case:>20} " + " ".join(
+            f"{'-':>18}" if metric not in measured
+            else f"{measured[metric]:>10} ({measured[metric] - expected[metric]:+d})" if metric in expected
+            else f"{measured[metric]:>18}"
+            for metric in METRICS
+        ))
+        if case not in baseline["models"]:
+            print(f"{'':>20} no baseline")
+        regressions += compare(case, measured, baseline, tolerances)
+        if args.update:
+            baseline["models"][case] = measured
+
+    if args.update:
+        save_baseline(baseline, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return
+    for r in regressions:
+        print(f"{r.case}: {r.metric} grew from {r.baseline} to {r.measured}, above the limit of {r.limit:.0f}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
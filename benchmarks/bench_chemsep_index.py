@@ -0,0 +1,59 @@
+"""
+Compares cold start time of the compound database when the ChemSep
+compounds are loaded from the compiled index versus parsed from XML.
+
+Usage:
+    python -m benchmarks.bench_chemsep_index [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from ahuora_compounds.loaders.chemsep import compile_index
+
+# Each run is a fresh interpreter, so module caches do not skew the results
+COLD_IMPORT = """
+import sys, time
+start = time.perf_counter()
+from ahuora_compounds.loaders import chemsep
+chemsep.INDEX_PATH = sys.argv[1]
+from ahuora_compounds.CompoundDB import db
+db.get_compound_names()
+print(time.perf_counter() - start)
+"""
+
+
+def cold_import(index_path: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", COLD_IMPORT, index_path], text=True)
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, "chemsep.sqlite")
+        compile_index(index_path)
+
+        results = {
+            "xml": cold_import(os.path.join(tmp, "missing.sqlite"), args.runs),
+            "index": cold_import(index_path, args.runs),
+        }
+
+    for name, timings in results.items():
+        print(f"{name:>6}: median {statistics.median(timings) * 1000:8.1f} ms  "
+              f"min {min(timings) * 1000:8.1f} ms  ({len(timings)} runs)")
+    speedup = statistics.median(results["xml"]) / statistics.median(results["index"])
+    print(f"speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
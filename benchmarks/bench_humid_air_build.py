@@ -0,0 +1,64 @@
+"""
+Times building a time indexed humid air state block, where every state block
+builds its surrogate expressions from the PySMO surrogate loaded once by the
+parameter block.
+
+The surrogate used to be loaded from JSON by each state block, so the time that
+took is also reported: loading it once per point, on top of the shared build.
+
+Usage:
+    python -m benchmarks.bench_humid_air_build [--points 1000] [--runs 3]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import statistics
+import time
+
+from pyomo.environ import ConcreteModel, Set
+from idaes.core import FlowsheetBlock
+from idaes.core.surrogate.pysmo_surrogate import PysmoSurrogate
+
+from ahuora_property_packages.humid_air.HumidAirSurrogate import HAirParameterBlock, SURROGATE_PATH
+
+
+def build(points: int) -> float:
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = HAirParameterBlock()
+    m.time_points = Set(initialize=range(points), ordered=True)
+    start = time.perf_counter()
+    m.fs.sb = m.fs.properties.build_state_block(m.time_points)
+    return time.perf_counter() - start
+
+
+def load(points: int) -> float:
+    start = time.perf_counter()
+    for _ in range(points):
+        PysmoSurrogate.load_from_file(SURROGATE_PATH)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    # PySMO prints and logs a summary every time a surrogate is loaded
+    logging.getLogger("idaes").setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        shared = [build(args.points) for _ in range(args.runs)]
+        per_block = [load(args.points) for _ in range(args.runs)]
+
+    shared_time = statistics.median(shared)
+    load_time = statistics.median(per_block)
+    print(f"points: {args.points}")
+    print(f"   shared surrogate build: {shared_time:8.2f} s")
+    print(f" per block surrogate load: {load_time:8.2f} s  ({load_time / args.points * 1000:.2f} ms per point)")
+    print(f"speedup: {(shared_time + load_time) / shared_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compares the PySMO humid air surrogate with the reduced surrogate written by
+surrogate_reduction, and with the grey box mode: expression size, Jacobian
+nonzeros, build time, NL file size, solve time and the largest difference in
+each output.
+
+Errors are reported against the original surrogate as the package evaluates it,
+and against the exact original (with dry air eliminated), as the original is only
+accurate to about 1e-2 in floating point for some outputs.
+
+Solve times need IPOPT, or cyipopt for the grey box, and are skipped if it is
+not available. Grey box models cannot be written to an NL file.
+
+Usage:
+    python -m benchmarks.bench_humid_air_surrogate [--points 100] [--samples 20000]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+from pyomo.environ import ConcreteModel, Constraint, Set, SolverFactory
+from pyomo.core.expr.visitor import identify_variables, sizeof_expression
+from pyomo.contrib.pynumero.interfaces.external_grey_box import ExternalGreyBoxBlock
+from idaes.core import FlowsheetBlock
+
+from ahuora_property_packages.humid_air import surrogate_reduction
+from ahuora_property_packages.humid_air.HumidAirSurrogate import (
+    HAirParameterBlock,
+    REDUCED_SURROGATE_PATH,
+    SURROGATE_PATH,
+    get_surrogate,
+)
+
+
+def build(surrogate_file: str, points: int, surrogate_mode: str = "expression"):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = HAirParameterBlock(surrogate_file=surrogate_file, surrogate_mode=surrogate_mode)
+    m.points = Set(initialize=range(points), ordered=True)
+    start = time.perf_counter()
+    m.fs.sb = m.fs.properties.build_state_block(m.points, defined_state=True)
+    return m, time.perf_counter() - start
+
+
+def model_size(m) -> tuple:
+    nodes = 0
+    nonzeros = 0
+    for sb in m.fs.sb.values():
+        if isinstance(sb.surrogate, ExternalGreyBoxBlock):
+            model = sb.surrogate.get_external_model()
+            nonzeros += model.n_outputs() * model.n_inputs()
+            continue
+        for c in sb.surrogate.component_data_objects(Constraint, active=True):
+            nodes += sizeof_expression(c.body)
+            nonzeros += len(list(identify_variables(c.body, include_fixed=False)))
+    return nodes, nonzeros
+
+
+def nl_size(m):
+    if any(isinstance(sb.surrogate, ExternalGreyBoxBlock) for sb in m.fs.sb.values()):
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.nl")
+        m.write(path, format="nl")
+        return os.path.getsize(path)
+
+
+def solve(m, inputs: np.ndarray, solver_name: str):
+    solver = SolverFactory(solver_name)
+    if not solver.available(exception_flag=False):
+        return None
+    for sb, (temperature, pressure, water, air) in zip(m.fs.sb.values(), inputs):
+        sb.flow_mol.fix(1)
+        sb.temperature.fix(temperature)
+        sb.pressure.fix(pressure)
+        sb.mole_frac_comp["water"].fix(water)
+        sb.mole_frac_comp["air"].fix(air)
+    start = time.perf_counter()
+    solver.solve(m)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100, help="state blocks in the model")
+    parser.add_argument("--samples", type=int, default=20000, help="points for the error estimate")
+    args = parser.parse_args()
+
+    # PySMO prints and logs a summary every time a surrogate is loaded
+    logging.getLogger("idaes").setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        original = get_surrogate(SURROGATE_PATH)
+        reduced = get_surrogate(REDUCED_SURROGATE_PATH)
+        exact = surrogate_reduction.read_eliminated(SURROGATE_PATH)
+        inputs = surrogate_reduction.sample_inputs(exact, args.samples)
+        solve_inputs = surrogate_reduction.sample_inputs(exact, args.points, seed=1)
+
+        rows = []
+        for name, path, mode, solver_name in [
+            ("original", SURROGATE_PATH, "expression", "ipopt"),
+            ("reduced", REDUCED_SURROGATE_PATH, "expression", "ipopt"),
+            ("grey box", SURROGATE_PATH, "grey_box", "cyipopt"),
+        ]:
+            m, build_time = build(path, args.points, mode)
+            nodes, nonzeros = model_size(m)
+            rows.append((name, nodes, nonzeros, build_time, nl_size(m), solve(m, solve_inputs, solver_name)))
+
+    print(f"points: {args.points}")
+    print(f"{'':>10} {'nodes':>8} {'jac nnz':>8} {'build s':>8} {'nl bytes':>9} {'solve s':>8}")
+    for name, nodes, nonzeros, build_time, nl_bytes, solve_time in rows:
+        nl_text = f"{nl_bytes:9d}" if nl_bytes is not None else f"{'n/a':>9}"
+        solve_text = f"{solve_time:8.3f}" if solve_time is not None else f"{'n/a':>8}"
+        print(f"{name:>10} {nodes:8d} {nonzeros:8d} {build_time:8.3f} {nl_text} {solve_text}")
+
+    print(f"\nmax error of the reduced surrogate over {args.samples} samples")
+    against_original = surrogate_reduction.max_errors(original, reduced, inputs)
+    against_exact = surrogate_reduction.max_errors(exact, reduced, inputs)
+    original_noise = surrogate_reduction.max_errors(exact, original, inputs)
+    print(f"{'':>22} {'vs original':>12} {'vs exact':>12} {'original vs exact':>18}")
+    for label in reduced.output_labels():
+        print(f"{label:>22} {against_original[label][0]:12.3g} {against_exact[label][0]:12.3g} "
+              f"{original_noise[label][0]:18.3g}")
+
+
+if __name__ == "__main__":
+    main()
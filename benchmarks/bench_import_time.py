@@ -0,0 +1,73 @@
+"""
+Measures the cold start of building each property package in a fresh
+interpreter: importing build_package and building the package into a flowsheet.
+
+"eager" first imports every builder in PACKAGE_BUILDERS, as build_package did
+when it imported all backends at module import, and "lazy" imports only the
+builder of the package being built.
+
+Usage:
+    python -m benchmarks.bench_import_time [--repeat 3] [--packages peng-robinson milk]
+"""
+import argparse
+import subprocess
+import sys
+
+# Compounds to build each package with
+COMPOUNDS = {
+    "peng-robinson": ["benzene", "toluene"],
+    "helmholtz": ["water"],
+    "milk": ["water", "milk_solid"],
+    "humid_air": ["water", "air"],
+    "biomass_and_flue": ["biomass", "water", "oxygen", "carbon dioxide", "nitrogen"],
+    "seawater": ["H2O", "TDS"],
+}
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+import importlib
+from ahuora_property_packages.build_package import PACKAGE_BUILDERS, build_package
+if {eager}:
+    for target in PACKAGE_BUILDERS.values():
+        importlib.import_module(target.partition(":")[0])
+imported = time.perf_counter()
+from pyomo.environ import ConcreteModel
+from idaes.core import FlowsheetBlock
+m = ConcreteModel()
+m.fs = FlowsheetBlock(dynamic=False)
+m.fs.properties = build_package({package!r}, {compounds!r})
+print(imported - start, time.perf_counter() - start)
+"""
+
+
+def cold_start(package: str, eager: bool, repeat: int):
+    # Best of repeat runs, of the import and of the import and first build
+    times = []
+    for _ in range(repeat):
+        script = SCRIPT.format(eager=eager, package=package, compounds=COMPOUNDS[package])
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        times.append(tuple(float(t) for t in result.stdout.split()[-2:]))
+    return min(t[0] for t in times), min(t[1] for t in times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each package, the best is reported")
+    parser.add_argument("--packages", nargs="+", default=list(COMPOUNDS), choices=list(COMPOUNDS))
+    args = parser.parse_args()
+
+    print(f"{'':>18} {'eager import':>12} {'lazy import':>12} {'eager total':>12} {'lazy total':>12}")
+    for package in args.packages:
+        eager = cold_start(package, True, args.repeat)
+        lazy = cold_start(package, False, args.repeat)
+        if eager is None or lazy is None:
+            print(f"{package:>18} {'failed to build':>12}")
+            continue
+        print(f"{package:>18} {eager[0]:12.2f} {lazy[0]:12.2f} {eager[1]:12.2f} {lazy[1]:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
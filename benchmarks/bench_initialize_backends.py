@@ -0,0 +1,87 @@
+"""
+Times initializing an indexed state block of each extended property package with
+IPOPT in a subprocess and in process through cyipopt (see
+ahuora_property_packages.base.solvers). Every state block is a separate point,
+with temperature and pressure specified.
+
+Usage:
+    python -m benchmarks.bench_initialize_backends [--blocks 500] [--packages peng-robinson helmholtz seawater]
+"""
+import argparse
+import logging
+import os
+import time
+
+from pyomo.environ import ConcreteModel
+from idaes.core import FlowsheetBlock
+
+from ahuora_property_packages.base.solvers import SOLVER_BACKEND_ENV, in_process_available
+from ahuora_property_packages.build_package import build_package
+
+
+def peng_robinson(m, blocks):
+    m.fs.properties = build_package("peng-robinson", ["benzene", "toluene"], ["Liq", "Vap"])
+    m.fs.state = m.fs.properties.build_state_block(range(blocks), defined_state=True)
+    for i, sb in m.fs.state.items():
+        sb.flow_mol.fix(1)
+        sb.temperature.fix(300 + 100 * i / blocks)
+        sb.pressure.fix(101325)
+        sb.mole_frac_comp["benzene"].fix(0.5)
+        sb.mole_frac_comp["toluene"].fix(0.5)
+
+
+def helmholtz(m, blocks):
+    m.fs.properties = build_package("helmholtz", ["h2o"])
+    m.fs.state = m.fs.properties.build_state_block(range(blocks), defined_state=True)
+    for i, sb in m.fs.state.items():
+        sb.constrain("flow_mol", 1)
+        sb.constrain("pressure", 101325)
+        sb.constrain("temperature", 300 + 200 * i / blocks)
+
+
+def seawater(m, blocks):
+    m.fs.properties = build_package("seawater", ["H2O", "TDS"])
+    m.fs.state = m.fs.properties.build_state_block(range(blocks), defined_state=True)
+    for i, sb in m.fs.state.items():
+        sb.flow_mass_phase_comp["Liq", "H2O"].fix(0.965)
+        sb.flow_mass_phase_comp["Liq", "TDS"].fix(0.035 * (0.5 + i / blocks))
+        sb.temperature.fix(290 + 30 * i / blocks)
+        sb.pressure.fix(101325)
+
+
+PACKAGES = {"peng-robinson": peng_robinson, "helmholtz": helmholtz, "seawater": seawater}
+
+
+def run(package, blocks, backend):
+    os.environ[SOLVER_BACKEND_ENV] = backend
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    PACKAGES[package](m, blocks)
+    start = time.perf_counter()
+    m.fs.state.initialize()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=500, help="state blocks per package")
+    parser.add_argument("--packages", nargs="+", choices=list(PACKAGES), default=list(PACKAGES))
+    args = parser.parse_args()
+
+    logging.getLogger("idaes").setLevel(logging.ERROR)
+    backends = ["subprocess"]
+    if in_process_available():
+        backends.append("in_process")
+    else:
+        print("cyipopt is not available, not timing the in_process backend")
+
+    print(f"{'package':>16} " + " ".join(f"{backend + ' s':>14}" for backend in backends))
+    for package in args.packages:
+        times = [run(package, args.blocks, backend) for backend in backends]
+        print(f"{package:>16} " + " ".join(f"{t:14.2f}" for t in times))
+        if len(times) > 1:
+            print(f"{'':>16} in process is {times[0] / times[1]:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
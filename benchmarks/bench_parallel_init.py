@@ -0,0 +1,67 @@
+"""
+Times initializing a Peng-Robinson state block of benzene and toluene with many
+indices, in one process and in chunks across worker processes (see
+ahuora_property_packages.base.parallel). Every index is a separate point, with
+temperature and pressure specified.
+
+Usage:
+    python -m benchmarks.bench_parallel_init [--blocks 2000] [--processes 1 2 4 8]
+"""
+import argparse
+import logging
+import os
+import time
+
+from pyomo.environ import ConcreteModel
+from idaes.core import FlowsheetBlock
+
+from ahuora_property_packages.base.parallel import ParallelInitializationError
+from ahuora_property_packages.build_package import build_package
+
+
+def build(blocks):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_package("peng-robinson", ["benzene", "toluene"], ["Liq", "Vap"])
+    m.fs.state = m.fs.properties.build_state_block(range(blocks), defined_state=True)
+    for i, sb in m.fs.state.items():
+        sb.flow_mol.fix(1)
+        sb.temperature.fix(300 + 100 * i / blocks)
+        sb.pressure.fix(101325 * (1 + i % 10))
+        sb.mole_frac_comp["benzene"].fix(0.1 + 0.8 * (i % 7) / 6)
+        sb.mole_frac_comp["toluene"].fix(0.9 - 0.8 * (i % 7) / 6)
+    return m
+
+
+def run(blocks, processes):
+    m = build(blocks)
+    start = time.perf_counter()
+    failed = 0
+    try:
+        if processes == 1:
+            m.fs.state.initialize()
+        else:
+            m.fs.state.initialize(parallel=processes)
+    except ParallelInitializationError as e:
+        failed = len(e.indices)
+    return time.perf_counter() - start, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=2000, help="indices of the state block")
+    parser.add_argument("--processes", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help="process counts to time")
+    args = parser.parse_args()
+
+    logging.getLogger("idaes").setLevel(logging.ERROR)
+    print(f"{'processes':>10} {'time s':>10} {'speedup':>8} {'failed':>7}")
+    serial = None
+    for processes in args.processes:
+        t, failed = run(args.blocks, processes)
+        serial = serial or t
+        print(f"{processes:>10} {t:10.2f} {serial / t:8.2f} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
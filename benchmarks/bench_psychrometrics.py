@@ -0,0 +1,63 @@
+"""
+Times HumidAirEvaluator on a psychrometric chart grid: evaluating every property,
+and solving for the water mole fraction at each value of the surrogate
+relative_humidity output and for the temperature at each enthalpy.
+
+Usage:
+    python -m benchmarks.bench_psychrometrics [--temperatures 200] [--curves 50] [--repeat 5]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import time
+
+import numpy as np
+
+from ahuora_property_packages.humid_air.psychrometrics import HumidAirEvaluator
+
+
+def best_time(function, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--temperatures", type=int, default=200, help="temperatures on each curve")
+    parser.add_argument("--curves", type=int, default=50, help="curves on the chart")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs, the best is reported")
+    args = parser.parse_args()
+
+    # PySMO prints and logs a summary every time a surrogate is loaded
+    logging.getLogger("idaes").setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ev = HumidAirEvaluator.from_package()
+
+    T = np.linspace(280, 360, args.temperatures)[:, None]
+    targets = np.linspace(0.005, 0.15, args.curves)[None, :]
+    props_time, _ = best_time(lambda: ev.properties(T, 101325, targets / 5), args.repeat)
+    solve_time, result = best_time(lambda: ev.solve("relative_humidity", targets, 101325, T=T), args.repeat)
+    enthalpy = result.properties.enth_mol
+    inverse_time, inverse = best_time(
+        lambda: ev.solve("enth_mol", enthalpy, 101325, mole_frac_water=result.value), args.repeat
+    )
+
+    print(f"points: {T.size * targets.size}")
+    print(f"{'':>28} {'ms':>8} {'iterations':>10} {'converged':>10}")
+    print(f"{'properties':>28} {props_time * 1e3:8.2f}")
+    for name, seconds, r in [
+        ("mole_frac_water at target", solve_time, result),
+        ("temperature at enth_mol", inverse_time, inverse),
+    ]:
+        print(f"{name:>28} {seconds * 1e3:8.2f} {r.iterations:10d} {r.converged.mean():10.1%}")
+    error = np.nanmax(np.abs(inverse.value - np.broadcast_to(T, inverse.value.shape)))
+    print(f"\nlargest temperature round trip error: {error:.3g} K")
+
+
+if __name__ == "__main__":
+    main()
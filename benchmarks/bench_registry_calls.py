@@ -0,0 +1,65 @@
+"""
+Measures the per-call cost of registry queries, comparing the current
+build-once registry against the previous behaviour, where a
+__getattribute__ hook called _build on every method access.
+
+Usage:
+    python -m benchmarks.bench_registry_calls [--number 20000]
+"""
+import argparse
+import timeit
+
+from ahuora_compounds.CompoundRegistry import CompoundRegistry
+from ahuora_compounds.RegistrySearch import RegistrySearch
+
+
+class HookedRegistry(CompoundRegistry):
+    """CompoundRegistry with the removed per-call build hook, for comparison."""
+
+
+def _build_hook(self, attr):
+    attr = super(HookedRegistry, self).__getattribute__(attr)
+    if callable(attr):
+        if not attr.__name__ == '_discover_loaders':
+            super(HookedRegistry, self).__getattribute__('_build')()
+    return attr
+
+
+QUERIES = {
+    "get_compound": lambda db: db.get_compound("benzene"),
+    "get_compound_names": lambda db: db.get_compound_names(),
+    "get_supported_packages": lambda db: db.get_supported_packages(["benzene", "toluene"]),
+    "get_supported_compounds": lambda db: db.get_supported_compounds(["biomass_and_flue", "milk"]),
+    "search_compounds": lambda db: db.search_compounds("ane", package_filters=["peng-robinson"]),
+}
+
+
+def make_db(registry_class):
+    registry = registry_class()
+    registry._discover_loaders()
+    db = RegistrySearch(registry)
+    db.get_compound_names()  # build outside of the timings
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    before = make_db(HookedRegistry)
+    # Installed after the build, as the build lock is not re-entrant
+    HookedRegistry.__getattribute__ = _build_hook
+    after = make_db(CompoundRegistry)
+
+    print(f"{'query':<26}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, query in QUERIES.items():
+        # Fewer repetitions for the queries that scan every compound
+        number = args.number if name in ("get_compound", "get_supported_packages") else max(args.number // 20, 1)
+        t_before = min(timeit.repeat(lambda: query(before), number=number, repeat=5)) / number
+        t_after = min(timeit.repeat(lambda: query(after), number=number, repeat=5)) / number
+        print(f"{name:<26}{t_before * 1e6:>14.2f}{t_after * 1e6:>14.2f}{t_before / t_after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Counts IPOPT iterations for Helmholtz state blocks specified by vapor fraction,
+{P, x} and {T, x}, starting from the default state and from the saturation
+curve guesses that initialization sets.
+
+Usage:
+    python -m benchmarks.bench_vapor_frac_init [--compound h2o] [--points 5]
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+from pyomo.environ import ConcreteModel, SolverFactory, check_optimal_termination
+from idaes.core import FlowsheetBlock
+
+from ahuora_property_packages.helmholtz.helmholtz_builder import build_helmholtz_package
+from ahuora_property_packages.helmholtz.helmholtz_extended import set_vapor_frac_guesses
+from ahuora_property_packages.helmholtz.saturation import get_saturation_curve
+
+
+def solve(compound, spec, value, vapor_frac, saturation_guesses):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = build_helmholtz_package([compound])
+    m.fs.state = m.fs.properties.build_state_block([0], defined_state=True)
+    sb = m.fs.state[0]
+    sb.constrain("flow_mol", 1)
+    sb.constrain(spec, value)
+    sb.constrain("vapor_frac", vapor_frac)
+    set_vapor_frac_guesses(m.fs.state, saturation_guesses=saturation_guesses)
+
+    with tempfile.TemporaryDirectory() as directory:
+        logfile = os.path.join(directory, "ipopt.log")
+        result = SolverFactory("ipopt").solve(m, logfile=logfile)
+        with open(logfile) as f:
+            match = re.search(r"Number of Iterations\.+:\s*(\d+)", f.read())
+    iterations = int(match.group(1)) if match else -1
+    return iterations, check_optimal_termination(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compound", default="h2o", help="Helmholtz component")
+    parser.add_argument("--points", type=int, default=5, help="pressures or temperatures")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    curve = get_saturation_curve(args.compound)
+    print(f"saturation curve: {(time.perf_counter() - start) * 1e3:.1f} ms")
+    pressures = np.geomspace(curve.pressure_range[0] * 2, curve.pressure_range[1] * 0.8, args.points)
+    temperatures = curve(pressures)["temperature"]
+
+    print(f"{'spec':>6} {'value':>12} {'x':>5} {'before':>12} {'after':>12}")
+    totals = {False: [0, 0], True: [0, 0]}
+    for spec, values in (("pressure", pressures), ("temperature", temperatures)):
+        for value in values:
+            for vapor_frac in (0.0, 0.5, 1.0):
+                cells = []
+                for saturation_guesses in (False, True):
+                    iterations, optimal = solve(args.compound, spec, float(value), vapor_frac, saturation_guesses)
+                    totals[saturation_guesses][0] += iterations
+                    totals[saturation_guesses][1] += not optimal
+                    cells.append(f"{iterations}{'' if optimal else ' failed'}")
+                print(f"{spec[0].upper():>6} {value:12.6g} {vapor_frac:5.2f} {cells[0]:>12} {cells[1]:>12}")
+    for saturation_guesses, name in ((False, "before"), (True, "after")):
+        iterations, failed = totals[saturation_guesses]
+        print(f"{name}: {iterations} iterations, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Benchmark suite of every property package. Each package is timed at each scale in
+a fresh interpreter, through the phases:
+
+    import       importing pyomo, idaes and build_package
+    build        build_package
+    state_block  building an indexed state block of that many indices
+    initialize   initializing the state block
+    solve        solving the model with IPOPT
+
+Each package's state block has the composition of its model size case (see
+ahuora_property_packages.utils.model_size), with the temperature spread over the
+package's range. After each phase the model size and the peak resident memory of
+the interpreter are recorded. A phase that fails is reported with its error and
+the later phases of that run are skipped.
+
+Results are written as JSON with the commit they were run on, and two result
+files can be compared:
+
+Usage:
+    python -m benchmarks.suite run [--scales 1 100 1000] [--packages peng-robinson seawater] [--output results.json]
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 1.2]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+PHASES = ["import", "build", "state_block", "initialize", "solve"]
+
+# Model size case of each package, which gives its compounds and composition
+CASES = {
+    "peng-robinson": "peng-robinson-bt",
+    "helmholtz": "helmholtz",
+    "helmholtz-tabulated": "helmholtz-tabulated",
+    "milk": "milk",
+    "humid_air": "humid_air",
+    "biomass_and_flue": "biomass_and_flue",
+    "seawater": "seawater",
+}
+
+# Phases that do no work for a package, so are not timed
+NOT_APPLICABLE = {
+    # The properties are explicit expressions, initialize only fixes the state variables
+    ("humid_air", "initialize"),
+}
+
+# Temperature range of the points of each package, K
+TEMPERATURES = {
+    "peng-robinson": (300, 400),
+    "helmholtz": (300, 500),
+    "helmholtz-tabulated": (300, 500),
+    "milk": (300, 360),
+    "humid_air": (280, 340),
+    "biomass_and_flue": (400, 1200),
+    "seawater": (290, 320),
+}
+
+
+def temperature(package, fraction):
+    """Temperature at fraction (0 to 1) along the package's temperature range, K."""
+    low, high = TEMPERATURES[package]
+    return low + (high - low) * fraction
+
+
+def _peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _model_size(m):
+    from idaes.core.util.model_statistics import number_activated_constraints, number_variables
+
+    return {"variables": number_variables(m), "constraints": number_activated_constraints(m)}
+
+
+def worker(package, scale):
+    """Runs the phases of one package and scale in this interpreter, printing the results as JSON."""
+    results = []
+    state = {}
+
+    def phase_import():
+        from pyomo.environ import ConcreteModel
+        from idaes.core import FlowsheetBlock
+        from ahuora_property_packages.build_package import build_package
+        from ahuora_property_packages.utils import model_size
+
+        state["build_package"] = build_package
+        state["model_size"] = model_size
+        state["m"] = m = ConcreteModel()
+        m.fs = FlowsheetBlock(dynamic=False)
+
+    def phase_build():
+        state["case"] = case = state["model_size"].CASES[CASES[package]]
+        state["m"].fs.properties = state["build_package"](case.package, case.compounds)
+
+    def phase_state_block():
+        fs = state["m"].fs
+        fs.state = fs.properties.build_state_block(range(scale), defined_state=True)
+        for i, sb in fs.state.items():
+            state["model_size"].specify(sb, state["case"], temperature(package, i / max(scale - 1, 1)))
+            # Built on demand, otherwise some packages have nothing to initialize
+            for prop in state["case"].properties:
+                getattr(sb, prop)
+
+    def phase_initialize():
+        state["m"].fs.state.initialize()
+
+    def phase_solve():
+        from pyomo.environ import check_optimal_termination
+        from idaes.core.solvers import get_solver
+
+        res = get_solver("ipopt").solve(state["m"])
+        if not check_optimal_termination(res):
+            raise RuntimeError(f"solve terminated with {res.solver.termination_condition}")
+
+    steps = [phase_import, phase_build, phase_state_block, phase_initialize, phase_solve]
+    failed = False
+    for name, step in zip(PHASES, steps):
+        result = {"package": package, "scale": scale, "phase": name, "seconds": None, "status": "skipped"}
+        if (package, name) in NOT_APPLICABLE:
+            result["status"] = "not applicable"
+        elif not failed:
+            start = time.perf_counter()
+            try:
+                step()
+                result["status"] = "ok"
+            except Exception as e:
+                result["status"] = f"{type(e).__name__}: {e}"
+                failed = True
+            result["seconds"] = time.perf_counter() - start
+            result["peak_memory_mb"] = _peak_memory_mb()
+            if "m" in state:
+                result.update(_model_size(state["m"]))
+        results.append(result)
+    print(json.dumps(results))
+
+
+def run_case(package, scale, timeout):
+    command = [sys.executable, "-m", "benchmarks.suite", "worker", package, str(scale)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        error = f"timed out after {timeout} s"
+    else:
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode == 0 and lines:
+            return json.loads(lines[-1])
+        error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+    return [{"package": package, "scale": scale, "phase": name, "seconds": None, "status": error} for name in PHASES]
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = []
+    for package in args.packages:
+        for scale in args.scales:
+            case = run_case(package, scale, args.timeout)
+            results.extend(case)
+            for r in case:
+                seconds = "" if r["seconds"] is None else f"{r['seconds']:.3f}"
+                print(f"{package:>20} {scale:>6} {r['phase']:>12} {seconds:>10}  {r['status']}")
+    report = {
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {args.output}")
+
+
+def compare(args):
+    """Prints the ratio of each phase's time to the baseline. Exits with 1 if any is above the threshold."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        current = json.load(f)
+    key = lambda r: (r["package"], r["scale"], r["phase"])
+    before = {key(r): r for r in baseline["results"]}
+
+    print(f"{baseline['commit']} -> {current['commit']}")
+    regressions = 0
+    for r in current["results"]:
+        old = before.get(key(r))
+        if old is None or old["status"] != "ok" or r["status"] != "ok":
+            continue
+        ratio = r["seconds"] / max(old["seconds"], 1e-9)
+        flag = ""
+        if ratio > args.threshold and r["seconds"] - old["seconds"] > args.min_seconds:
+            flag = "  regression"
+            regressions += 1
+        print(f"{r['package']:>20} {r['scale']:>6} {r['phase']:>12} {old['seconds']:10.3f} {r['seconds']:10.3f} {ratio:6.2f}x{flag}")
+        if old.get("constraints") != r.get("constraints"):
+            print(f"{'':>41} constraints {old.get('constraints')} -> {r.get('constraints')}")
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 1000], help="state block indices")
+    run_parser.add_argument("--packages", nargs="+", choices=list(CASES), default=list(CASES))
+    run_parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write")
+    run_parser.add_argument("--timeout", type=float, default=3600, help="seconds allowed for each package and scale")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio to report")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore slowdowns smaller than this")
+
+    worker_parser = commands.add_parser("worker", help=argparse.SUPPRESS)
+    worker_parser.add_argument("package", choices=list(CASES))
+    worker_parser.add_argument("scale", type=int)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        compare(args)
+    else:
+        worker(args.package, args.scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+"""
+Compiles the ChemSep index into the wheel, so that installed packages do not
+parse the ChemSep XML files on import. The index is written to a temporary
+directory, not the source tree, and is trusted by the installed loader.
+"""
+
+INDEX_TARGET = "ahuora_compounds/loaders/data/chemsep.sqlite"
+
+
+class CustomBuildHook(BuildHookInterface):
+
+    def initialize(self, version, build_data):
+        sys.path.insert(0, self.root)
+        try:
+            from ahuora_compounds.loaders import chemsep
+
+            self._index_dir = tempfile.mkdtemp(prefix="ahuora-chemsep-")
+            index_path = os.path.join(self._index_dir, "chemsep.sqlite")
+            count = chemsep.compile_index(index_path, trusted=True)
+        finally:
+            sys.path.remove(self.root)
+        self.app.display_info(f"Compiled {count} ChemSep compounds into the wheel")
+        build_data["force_include"][index_path] = INDEX_TARGET
+
+    def finalize(self, version, build_data, artifact_path):
+        shutil.rmtree(getattr(self, "_index_dir", ""), ignore_errors=True)